@@ -1,6 +1,6 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
-from .models import AnalyticsEvent, ForumPost, JobListing, User, LearningResource
+from .models import ForumPost, JobListing, User, LearningResource
 
 # Define the admin class for the custom User model
 class CustomUserAdmin(UserAdmin):
@@ -26,5 +26,4 @@ class CustomUserAdmin(UserAdmin):
 admin.site.register(User, CustomUserAdmin)
 admin.site.register(LearningResource)
 admin.site.register(ForumPost)
-admin.site.register(JobListing)
-admin.site.register(AnalyticsEvent)
\ No newline at end of file
+admin.site.register(JobListing)
\ No newline at end of file
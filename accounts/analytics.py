@@ -0,0 +1,171 @@
+import logging
+import time as clock
+from datetime import datetime, time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from ai import rollups
+from . import counters
+from .models import User
+from .serializers import AnalyticsSummarySerializer
+
+logger = logging.getLogger(__name__)
+
+VERSION_KEY = 'analytics_summary:version'
+
+
+def parse_range(params):
+    """``from``/``to`` query parameters as aware datetimes plus the rollup granularity.
+
+    Dates select whole days (``to`` inclusive); datetimes select hours, rounded down.
+    """
+    bounds = {}
+    granularity = 'day'
+    for name in ('from', 'to'):
+        value = params.get(name)
+        if not value:
+            bounds[name] = None
+            continue
+        day = parse_date(value)
+        if day is not None:
+            if name == 'to':
+                day += timezone.timedelta(days=1)
+            bounds[name] = timezone.make_aware(datetime.combine(day, time.min))
+            continue
+        moment = parse_datetime(value)
+        if moment is None:
+            raise ValueError(f"{name} must be an ISO date or datetime")
+        bounds[name] = moment if timezone.is_aware(moment) else timezone.make_aware(moment)
+        granularity = 'hour'
+    if granularity == 'hour':
+        bounds = {name: value and rollups.bucket_start('hour', value) for name, value in bounds.items()}
+    return bounds['from'], bounds['to'], granularity
+
+
+def compute_summary(start, end, granularity):
+    today = timezone.now().date()
+    logger.info(f"Computing analytics summary for {today}")
+
+    # Distinct active users from the Redis HyperLogLogs; login times are the fallback
+    try:
+        active = counters.active_users(today)
+    except Exception as e:
+        logger.error(f"Could not read active user counters: {str(e)}")
+        active = {}
+        for name, days in counters.WINDOWS.items():
+            try:
+                since = timezone.now() - timezone.timedelta(days=days)
+                active[name] = User.objects.filter(last_login_time__gte=since).count()
+            except Exception as db_e:
+                logger.error(f"Database error for {name}: {str(db_e)}")
+                active[name] = 0
+
+    # Event totals come from the hourly/daily rollups, so the cost depends on
+    # the number of buckets in range rather than the number of events
+    try:
+        summary = rollups.summarize(start, end, granularity)
+    except Exception as db_e:
+        logger.error(f"Database error for events: {str(db_e)}")
+        summary = {'event_count': 0, 'event_types': [], 'roles': []}
+    total_resources_viewed = next(
+        (row['count'] for row in summary['event_types'] if row['event_type'] == 'resource_view'), 0
+    )
+
+    serializer = AnalyticsSummarySerializer({
+        **active,
+        'total_resources_viewed': total_resources_viewed,
+        'event_count': summary['event_count'],
+        'event_types': summary['event_types'],
+        'roles': summary['roles'],
+    })
+    # Range the event totals cover; null means unbounded
+    return dict(serializer.data, **{
+        'from': start and start.isoformat(),
+        'to': end and end.isoformat(),
+    })
+
+
+def _version():
+    return cache.get_or_set(VERSION_KEY, 1, timeout=None)
+
+
+def _key(start, end, granularity):
+    # Platform-wide numbers: one entry per range, shared by every user
+    return f"analytics_summary:v{_version()}:{granularity}:{start and start.isoformat()}:{end and end.isoformat()}"
+
+
+def _store(key, data):
+    entry = {'data': data, 'fresh_until': clock.time() + settings.ANALYTICS_SUMMARY_SOFT_TTL}
+    cache.set(key, entry, timeout=settings.ANALYTICS_SUMMARY_HARD_TTL)
+
+
+def refresh_summary(start=None, end=None, granularity='day', key=None, lock_key=None):
+    key = key or _key(start, end, granularity)
+    try:
+        data = compute_summary(start, end, granularity)
+        _store(key, data)
+        return data
+    finally:
+        if lock_key:
+            cache.delete(lock_key)
+
+
+def _refresh_in_background(start, end, granularity, key, lock_key):
+    from .tasks import refresh_analytics_summary
+    try:
+        refresh_analytics_summary.delay(
+            start and start.isoformat(), end and end.isoformat(), granularity, key, lock_key
+        )
+    except Exception as e:
+        logger.error(f"Could not queue analytics summary refresh, refreshing inline: {str(e)}")
+        refresh_summary(start, end, granularity, key, lock_key)
+
+
+def get_summary(start=None, end=None, granularity='day'):
+    """Cached summary for the range, recomputed by at most one worker at a time.
+
+    Past the soft TTL the stale entry is served while one request queues a
+    refresh; only a missing entry makes a request wait for the computation.
+    """
+    try:
+        key = _key(start, end, granularity)
+        lock_key = f"{key}:lock"
+        entry = cache.get(key)
+    except Exception as cache_e:
+        logger.error(f"Cache connection failed: {str(cache_e)}")
+        return compute_summary(start, end, granularity)
+
+    if entry is not None:
+        if entry['fresh_until'] < clock.time() and cache.add(lock_key, 1, timeout=settings.ANALYTICS_SUMMARY_LOCK_TIMEOUT):
+            _refresh_in_background(start, end, granularity, key, lock_key)
+        return entry['data']
+
+    if cache.add(lock_key, 1, timeout=settings.ANALYTICS_SUMMARY_LOCK_TIMEOUT):
+        # The previous holder may have stored it between our get and add
+        entry = cache.get(key)
+        if entry is not None:
+            cache.delete(lock_key)
+            return entry['data']
+        return refresh_summary(start, end, granularity, key, lock_key)
+
+    # Another worker is computing it; wait for its result rather than piling on
+    deadline = clock.monotonic() + settings.ANALYTICS_SUMMARY_LOCK_TIMEOUT
+    while clock.monotonic() < deadline:
+        clock.sleep(0.05)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry['data']
+    logger.warning(f"Timed out waiting for analytics summary {key}, computing it here")
+    return compute_summary(start, end, granularity)
+
+
+def invalidate_summary():
+    """Drop every cached summary; the next request recomputes (single-flight)."""
+    try:
+        # Any unused version works; one SET needs no existence check or server-side script
+        cache.set(VERSION_KEY, clock.time_ns(), timeout=None)
+    except Exception as e:
+        logger.error(f"Could not invalidate analytics summaries: {str(e)}")
@@ -1,4 +1,5 @@
 from celery import Celery
+from celery.signals import worker_process_init
 
 # Use the project name as the app name
 app = Celery('adlm_skillhub_backend')
@@ -6,8 +7,17 @@ app = Celery('adlm_skillhub_backend')
 # Load configuration from settings.py
 app.config_from_object('core.settings', namespace='CELERY')
 
-# Auto-discover tasks in the accounts app
-app.autodiscover_tasks(['accounts'], force=True)
+# Auto-discover tasks in the accounts and ai apps once Django's apps are loaded;
+# core/__init__.py imports this module while settings are still being read
+app.autodiscover_tasks(['accounts', 'ai'])
+
+
+@worker_process_init.connect
+def preload_ai_models(**kwargs):
+    # Each forked worker process keeps its own copy of the models
+    from ai.registry import preload_configured_models
+    preload_configured_models()
+
 
 # Optional: Log setup for debugging
 import logging
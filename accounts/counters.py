@@ -0,0 +1,85 @@
+import logging
+from datetime import timezone as dt_timezone
+
+from django.db.models import Case, F, IntegerField, Value, When
+from django.utils import timezone
+from django_redis import get_redis_connection
+
+from .models import User
+
+logger = logging.getLogger(__name__)
+
+# One HyperLogLog of user ids per UTC day; WAU/MAU are unions of the daily ones
+ACTIVE_KEY = 'counters:active:{day}'
+ACTIVE_TTL = 60 * 60 * 24 * 40
+# Resource views per user not yet added to User.resources_viewed
+VIEWS_KEY = 'counters:resource_views'
+WINDOWS = {'daily_active_users': 1, 'weekly_active_users': 7, 'monthly_active_users': 30}
+
+
+def _redis():
+    return get_redis_connection('default')
+
+
+def _day(when):
+    return timezone.localtime(when, dt_timezone.utc).date()
+
+
+def record(events, pipe=None):
+    """Count ``(user_id, event_type, timestamp)`` activity: every event marks its user
+    active for the day and resource views add to the user's view count.
+
+    With ``pipe`` the commands are only queued, for the caller to execute.
+    """
+    execute = pipe is None
+    pipe = pipe or _redis().pipeline(transaction=False)
+    for user_id, event_type, when in events:
+        key = ACTIVE_KEY.format(day=_day(when or timezone.now()))
+        pipe.pfadd(key, user_id)
+        pipe.expire(key, ACTIVE_TTL)
+        if event_type == 'resource_view':
+            pipe.hincrby(VIEWS_KEY, user_id, 1)
+    if execute:
+        pipe.execute()
+
+
+def mark_active(user_id, when=None):
+    try:
+        record([(user_id, None, when)])
+    except Exception as e:
+        logger.error(f"Could not count active user {user_id}: {str(e)}")
+
+
+def active_users(today=None):
+    """Approximate distinct active users over the last 1, 7 and 30 days (±0.81%)."""
+    today = today or _day(timezone.now())
+    pipe = _redis().pipeline(transaction=False)
+    for days in WINDOWS.values():
+        pipe.pfcount(*[ACTIVE_KEY.format(day=today - timezone.timedelta(days=i)) for i in range(days)])
+    return dict(zip(WINDOWS, pipe.execute()))
+
+
+def reconcile(chunk_size=500):
+    """Add the buffered view counts to User.resources_viewed; returns views written."""
+    redis = _redis()
+    pipe = redis.pipeline(transaction=True)
+    pipe.hgetall(VIEWS_KEY)
+    pipe.delete(VIEWS_KEY)
+    counts = {int(pk): int(count) for pk, count in pipe.execute()[0].items()}
+    pks = sorted(counts)
+    try:
+        for i in range(0, len(pks), chunk_size):
+            chunk = pks[i:i + chunk_size]
+            User.objects.filter(pk__in=chunk).update(resources_viewed=F('resources_viewed') + Case(
+                *[When(pk=pk, then=Value(counts[pk])) for pk in chunk], output_field=IntegerField(),
+            ))
+    except Exception:
+        pipe = redis.pipeline(transaction=True)
+        for pk in pks[i:]:
+            pipe.hincrby(VIEWS_KEY, pk, counts[pk])
+        pipe.execute()
+        raise
+    total = sum(counts.values())
+    if total:
+        logger.info(f"Reconciled {total} resource views for {len(pks)} users")
+    return total
@@ -0,0 +1,105 @@
+import asyncio
+import functools
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from .models import User, password_hasher, preverified_password, verify_password
+
+
+class HashPoolFull(Exception):
+    pass
+
+
+class HashPool:
+    """Runs Argon2 hashing off the event loop and off Django's request threads.
+
+    argon2-cffi releases the GIL while hashing, so a small thread pool gives real
+    parallelism; its size also caps Argon2's memory use. Calls beyond ``max_pending``
+    (running plus queued) are rejected rather than queued without bound.
+    """
+
+    def __init__(self, workers, max_pending):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._lock = threading.Lock()
+        self._executor = None
+        self._pid = None
+        self.pending = 0
+        self.running = 0
+        self.max_queued = 0
+        self.completed = 0
+        self.rejected = 0
+        self.wait_total_ms = 0.0
+
+    def _get_executor(self):
+        # Celery/gunicorn fork after import; threads don't survive a fork
+        if self._executor is None or self._pid != os.getpid():
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='password-hash')
+            self._pid = os.getpid()
+        return self._executor
+
+    def _call(self, fn, queued_at):
+        with self._lock:
+            self.running += 1
+            self.wait_total_ms += (time.monotonic() - queued_at) * 1000
+        try:
+            return fn()
+        finally:
+            with self._lock:
+                self.running -= 1
+                self.completed += 1
+
+    async def run(self, fn, *args, **kwargs):
+        with self._lock:
+            if self.pending >= self.max_pending:
+                self.rejected += 1
+                raise HashPoolFull(f"{self.pending} password hashes already pending")
+            self.pending += 1
+            self.max_queued = max(self.max_queued, self.pending - self.running)
+            executor = self._get_executor()
+        try:
+            future = executor.submit(self._call, functools.partial(fn, *args, **kwargs), time.monotonic())
+            return await asyncio.wrap_future(future)
+        finally:
+            with self._lock:
+                self.pending -= 1
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'workers': self.workers,
+                'max_pending': self.max_pending,
+                'running': self.running,
+                'queued': self.pending - self.running,
+                'max_queued': self.max_queued,
+                'completed': self.completed,
+                'rejected': self.rejected,
+                'avg_queue_wait_ms': round(self.wait_total_ms / self.completed, 2) if self.completed else 0,
+            }
+
+
+hash_pool = HashPool(settings.PASSWORD_HASH_WORKERS, settings.PASSWORD_HASH_MAX_PENDING)
+
+
+async def hash_password(raw_password):
+    return await hash_pool.run(lambda: password_hasher().hash(raw_password))
+
+
+async def preverify_password(email, raw_password):
+    """Check the password for ``email`` in the pool so authenticate() reuses the result.
+
+    Returns False when there is no such user, after hashing anyway so the response
+    takes as long as a wrong password.
+    """
+    user = await sync_to_async(User._default_manager.filter(**{User.USERNAME_FIELD: email}).first)()
+    if user is None:
+        await hash_password(raw_password)
+        return False
+    result = await hash_pool.run(verify_password, user.password, raw_password)
+    preverified_password.set(((user.password, raw_password), result))
+    return True
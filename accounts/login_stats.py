@@ -0,0 +1,75 @@
+import logging
+
+from django.conf import settings
+from django.db.models import Case, F, IntegerField, Value, When
+from django.db.models.functions import Greatest
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django_redis import get_redis_connection
+
+from . import counters
+from .models import User
+
+logger = logging.getLogger(__name__)
+
+# Per-user login counts and latest login times waiting for flush()
+COUNTS_KEY = 'login_stats:counts'
+LAST_KEY = 'login_stats:last'
+
+
+def record_login(user, when=None):
+    """Count a login for ``user``, buffered in Redis when LOGIN_STATS_BATCHING is on."""
+    when = when or timezone.now()
+    counters.mark_active(user.pk, when)
+    if settings.LOGIN_STATS_BATCHING:
+        try:
+            pipe = get_redis_connection('default').pipeline(transaction=True)
+            pipe.hincrby(COUNTS_KEY, user.pk, 1)
+            pipe.hset(LAST_KEY, user.pk, when.isoformat())
+            pipe.execute()
+            return
+        except Exception as e:
+            logger.error(f"Could not buffer login stats, writing directly: {str(e)}")
+    user.update_login_stats(when)
+
+
+def _pop(redis):
+    pipe = redis.pipeline(transaction=True)
+    pipe.hgetall(COUNTS_KEY)
+    pipe.hgetall(LAST_KEY)
+    pipe.delete(COUNTS_KEY, LAST_KEY)
+    counts, last, _ = pipe.execute()
+    return (
+        {int(pk): int(count) for pk, count in counts.items()},
+        {int(pk): parse_datetime(value.decode()) for pk, value in last.items()},
+    )
+
+
+def flush(chunk_size=500):
+    """Apply buffered logins with one UPDATE per chunk of users; returns logins written."""
+    redis = get_redis_connection('default')
+    counts, last = _pop(redis)
+    pks = sorted(counts)
+    try:
+        for i in range(0, len(pks), chunk_size):
+            chunk = pks[i:i + chunk_size]
+            User.objects.filter(pk__in=chunk).update(
+                login_count=F('login_count') + Case(
+                    *[When(pk=pk, then=Value(counts[pk])) for pk in chunk], output_field=IntegerField(),
+                ),
+                last_login_time=Greatest(
+                    F('last_login_time'), Case(*[When(pk=pk, then=Value(last[pk])) for pk in chunk]),
+                ),
+            )
+    except Exception:
+        # Merge the unwritten counts back so the next flush retries them
+        pipe = redis.pipeline(transaction=True)
+        for pk in pks[i:]:
+            pipe.hincrby(COUNTS_KEY, pk, counts[pk])
+            pipe.hset(LAST_KEY, pk, last[pk].isoformat())
+        pipe.execute()
+        raise
+    total = sum(counts.values())
+    if total:
+        logger.info(f"Flushed {total} logins for {len(pks)} users")
+    return total
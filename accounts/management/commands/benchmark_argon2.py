@@ -0,0 +1,44 @@
+import itertools
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from accounts.models import _hasher
+
+
+def int_list(value):
+    return [int(part) for part in value.split(',')]
+
+
+class Command(BaseCommand):
+    help = "Measure Argon2 password hashes per second per core for candidate parameters"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--time-cost', type=int_list, help="Comma-separated iteration counts (default: current setting)")
+        parser.add_argument('--memory-cost', type=int_list, help="Comma-separated memory sizes in KiB (default: current setting)")
+        parser.add_argument('--parallelism', type=int_list, help="Comma-separated lane counts (default: current setting)")
+        parser.add_argument('--iterations', type=int, default=20, help="Hashes per candidate")
+
+    def handle(self, *args, **options):
+        candidates = itertools.product(
+            options['time_cost'] or [settings.ARGON2_TIME_COST],
+            options['memory_cost'] or [settings.ARGON2_MEMORY_COST],
+            options['parallelism'] or [settings.ARGON2_PARALLELISM],
+        )
+        current = (settings.ARGON2_TIME_COST, settings.ARGON2_MEMORY_COST, settings.ARGON2_PARALLELISM)
+        self.stdout.write(f"{'time':>5} {'memory KiB':>10} {'lanes':>5} {'ms/hash':>8} {'hashes/s/core':>14}")
+        for params in candidates:
+            hasher = _hasher(*params)
+            hasher.hash('warm-up')
+            wall, cpu = time.perf_counter(), time.process_time()
+            for i in range(options['iterations']):
+                hasher.hash(f'benchmark-password-{i}')
+            wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+            # CPU time includes every lane's thread, so this is the per-core capacity
+            per_core = options['iterations'] / cpu if cpu else float('inf')
+            marker = '  (current)' if params == current else ''
+            self.stdout.write(
+                f"{params[0]:>5} {params[1]:>10} {params[2]:>5} "
+                f"{1000 * wall / options['iterations']:>8.1f} {per_core:>14.1f}{marker}"
+            )
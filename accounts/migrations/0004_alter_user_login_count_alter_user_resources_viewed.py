@@ -0,0 +1,23 @@
+# Generated by Django 5.2.5 on 2026-10-18 10:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_user_last_login_time_user_login_count_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='user',
+            name='login_count',
+            field=models.PositiveIntegerField(db_index=True, default=0),
+        ),
+        migrations.AlterField(
+            model_name='user',
+            name='resources_viewed',
+            field=models.PositiveIntegerField(db_index=True, default=0),
+        ),
+    ]
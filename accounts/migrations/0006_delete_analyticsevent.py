@@ -0,0 +1,16 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0005_search_gin_indexes'),
+        # Its rows are copied into ai.AnalyticsEvent first
+        ('ai', '0009_analyticsevent_event_type_code'),
+    ]
+
+    operations = [
+        migrations.DeleteModel(
+            name='AnalyticsEvent',
+        ),
+    ]
@@ -1,10 +1,56 @@
+import logging
+
 from django.db import models
+from django.db.models import F
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager, PermissionsMixin
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector
 from django.utils import timezone
+from django.conf import settings
 from argon2 import PasswordHasher
+from argon2.exceptions import InvalidHashError, VerificationError, VerifyMismatchError
+from contextvars import ContextVar
+from functools import lru_cache
+
+logger = logging.getLogger(__name__)
+
+
+@lru_cache
+def _hasher(time_cost, memory_cost, parallelism):
+    return PasswordHasher(time_cost=time_cost, memory_cost=memory_cost, parallelism=parallelism)
+
+
+def password_hasher():
+    # Built from settings on each call (cached per parameter set) so changes take effect
+    return _hasher(settings.ARGON2_TIME_COST, settings.ARGON2_MEMORY_COST, settings.ARGON2_PARALLELISM)
+
 
+def verify_password(encoded, raw_password):
+    """``(valid, new_hash)``; ``new_hash`` is set when ``encoded`` used other parameters."""
+    hasher = password_hasher()
+    try:
+        hasher.verify(encoded, raw_password)
+    except (VerifyMismatchError, InvalidHashError):
+        # Wrong password, or an unusable/empty one
+        return False, None
+    except VerificationError as e:
+        # A corrupted hash that still parses; the login fails rather than erroring
+        logger.warning(f"Argon2 verification failed on a malformed hash: {str(e)}")
+        return False, None
+    return True, hasher.hash(raw_password) if hasher.check_needs_rehash(encoded) else None
 
-ph = PasswordHasher()
+
+# ((encoded, raw_password), verify_password result) computed ahead of check_password
+preverified_password = ContextVar('preverified_password', default=None)
+
+
+def search_vector(title_field, body_field):
+    # Shared by the GIN indexes below and the hybrid search queries; they must match
+    # exactly for Postgres to use the index
+    return (
+        SearchVector(title_field, weight='A', config='english')
+        + SearchVector(body_field, weight='B', config='english')
+    )
 
 class UserManager(BaseUserManager):
     def create_user(self, email, password=None, **extra_fields):
@@ -46,18 +92,29 @@ class User(AbstractBaseUser, PermissionsMixin):
     REQUIRED_FIELDS = []
 
     def set_password(self, raw_password):
-        self.password = ph.hash(raw_password)
+        self.password = password_hasher().hash(raw_password)
 
     def check_password(self, raw_password):
-        try:
-            return ph.verify(self.password, raw_password)
-        except:
-            return False
+        verified = preverified_password.get()
+        if verified and verified[0] == (self.password, raw_password):
+            # Already checked off the request thread (accounts.hashing)
+            valid, rehashed = verified[1]
+        else:
+            valid, rehashed = verify_password(self.password, raw_password)
+        # Upgrade hashes made with older parameters while we have the raw password
+        if rehashed:
+            self.password = rehashed
+            if self.pk:
+                User.objects.filter(pk=self.pk).update(password=self.password)
+        return valid
         
-    def update_login_stats(self):
+    def update_login_stats(self, when=None):
+        # One UPDATE of just these columns; the increment happens in the database
+        # so concurrent logins don't overwrite each other
+        when = when or timezone.now()
+        User.objects.filter(pk=self.pk).update(login_count=F('login_count') + 1, last_login_time=when)
         self.login_count += 1
-        self.last_login_time = timezone.now()
-        self.save()
+        self.last_login_time = when
         
 class LearningResource(models.Model):
     title = models.CharField(max_length=255)
@@ -70,6 +127,9 @@ class LearningResource(models.Model):
     def __str__(self):
         return self.title
 
+    class Meta:
+        indexes = [GinIndex(search_vector('title', 'content'), name='learningresource_search_idx')]
+
 # Phase 2 Models
 class ForumPost(models.Model):
     title = models.CharField(max_length=200)
@@ -80,6 +140,9 @@ class ForumPost(models.Model):
 
     def __str__(self):
         return self.title
+
+    class Meta:
+        indexes = [GinIndex(search_vector('title', 'content'), name='forumpost_search_idx')]
     
 class JobListing(models.Model):
     title = models.CharField(max_length=200)
@@ -90,12 +153,6 @@ class JobListing(models.Model):
 
     def __str__(self):
         return f"{self.title} at {self.company}"
-    
-class AnalyticsEvent(models.Model):
-    user = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True)
-    event_type = models.CharField(max_length=50)  # e.g., 'login', 'resource_view'
-    timestamp = models.DateTimeField(auto_now_add=True)
-    details = models.JSONField(default=dict)
 
-    def __str__(self):
-        return f"{self.event_type} at {self.timestamp}"
\ No newline at end of file
+    class Meta:
+        indexes = [GinIndex(search_vector('title', 'description'), name='joblisting_search_idx')]
@@ -1,12 +1,14 @@
 from django.db import IntegrityError
 from rest_framework import serializers
-from .models import AnalyticsEvent, ForumPost, JobListing, LearningResource, User
+from ai.models import AnalyticsEvent
+from .models import ForumPost, JobListing, LearningResource, User
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 from django.contrib.auth.tokens import default_token_generator
 from django.utils.http import urlsafe_base64_encode, urlsafe_base64_decode
 from django.utils.encoding import force_bytes
 from django.core.mail import send_mail
 from celery import shared_task
+from kombu.exceptions import OperationalError
 from .tasks import send_verification_email
 import logging
 import os
@@ -35,14 +37,18 @@ class RegisterSerializer(serializers.ModelSerializer):
 
         try:
             password = validated_data.pop('password')
+            # Hashed ahead of time by RegisterView (save(password_hash=...)) to keep it off the request thread
+            password_hash = validated_data.pop('password_hash', None)
             skills = validated_data.pop('skills', [])
             progress = validated_data.pop('progress', 0.0)
             user = User.objects.create_user(
                 email=email,
-                password=password,
+                password=None if password_hash else password,
                 role=validated_data.get('role', 'Learner'),
                 is_verified=False
             )
+            if password_hash:
+                user.password = password_hash
             user.skills = skills
             user.progress = progress
             user.save()
@@ -128,6 +134,9 @@ class LearningResourceSerializer(serializers.ModelSerializer):
 
 class AnalyticsSummarySerializer(serializers.Serializer):
     daily_active_users = serializers.IntegerField(read_only=True)
+    weekly_active_users = serializers.IntegerField(read_only=True)
+    monthly_active_users = serializers.IntegerField(read_only=True)
     total_resources_viewed = serializers.IntegerField(read_only=True)
     event_count = serializers.IntegerField(read_only=True)
-    event_types = serializers.ListField(child=serializers.DictField(), read_only=True)
\ No newline at end of file
+    event_types = serializers.ListField(child=serializers.DictField(), read_only=True)
+    roles = serializers.ListField(child=serializers.DictField(), read_only=True)
\ No newline at end of file
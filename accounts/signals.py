@@ -0,0 +1,11 @@
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+from .analytics import invalidate_summary
+from .models import User
+
+
+@receiver(post_delete, sender=User)
+def invalidate_analytics_summary(sender, instance, **kwargs):
+    # The user's events went with them; totals cached before the delete are wrong
+    invalidate_summary()
@@ -18,4 +18,20 @@ def send_verification_email(email, verification_link):
         )
         logger.info(f"Verification email sent to {email}")
     except Exception as e:
-        logger.error(f"Error sending verification email: {str(e)}")
\ No newline at end of file
+        logger.error(f"Error sending verification email: {str(e)}")
+
+@shared_task
+def refresh_analytics_summary(start, end, granularity, key, lock_key):
+    from django.utils.dateparse import parse_datetime
+    from .analytics import refresh_summary
+    refresh_summary(start and parse_datetime(start), end and parse_datetime(end), granularity, key, lock_key)
+
+@shared_task
+def flush_login_stats():
+    from .login_stats import flush
+    return flush()
+
+@shared_task
+def reconcile_counters():
+    from .counters import reconcile
+    return reconcile()
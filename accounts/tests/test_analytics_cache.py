@@ -0,0 +1,70 @@
+import threading
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from accounts import analytics
+from accounts.models import User
+
+
+class AnalyticsSummaryCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.users = [User.objects.create_user(email=f"u{i}@ex.com", password="pass", role="Learner") for i in range(3)]
+
+    def test_one_entry_shared_by_all_users(self):
+        client = APIClient()
+        with mock.patch('accounts.analytics.compute_summary', wraps=analytics.compute_summary) as compute:
+            for user in self.users:
+                client.force_authenticate(user=user)
+                self.assertEqual(client.get(reverse('analytics-summary')).status_code, 200)
+        self.assertEqual(compute.call_count, 1)
+
+    @override_settings(ANALYTICS_SUMMARY_SOFT_TTL=-1)
+    def test_stale_entry_served_while_one_refresh_queued(self):
+        analytics.get_summary()
+        with mock.patch('accounts.tasks.refresh_analytics_summary.delay') as delay:
+            first = analytics.get_summary()
+            analytics.get_summary()
+        self.assertIn('event_count', first)
+        # The refresh lock is held until the queued task finishes
+        self.assertEqual(delay.call_count, 1)
+
+    def test_invalidate(self):
+        analytics.get_summary()
+        analytics.invalidate_summary()
+        with mock.patch('accounts.analytics.compute_summary', return_value={'event_count': 7}) as compute:
+            self.assertEqual(analytics.get_summary(), {'event_count': 7})
+        compute.assert_called_once()
+
+
+class SingleFlightTest(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def tearDown(self):
+        # Don't leave the mocked summary behind for other tests
+        cache.clear()
+
+    def test_concurrent_misses_compute_once(self):
+        calls = []
+        release = threading.Event()
+
+        def slow_compute(start, end, granularity):
+            calls.append(1)
+            release.wait(5)
+            return {'event_count': 1}
+
+        results = []
+        with mock.patch('accounts.analytics.compute_summary', side_effect=slow_compute):
+            threads = [threading.Thread(target=lambda: results.append(analytics.get_summary())) for _ in range(5)]
+            for thread in threads:
+                thread.start()
+            release.set()
+            for thread in threads:
+                thread.join()
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [{'event_count': 1}] * 5)
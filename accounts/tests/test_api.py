@@ -12,7 +12,7 @@ class AuthApiTest(APITestCase):
         data = {"email": "api@ex.com", "password": "apipass", "role": "Learner"}
         response = self.client.post(url, data, format='json')
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
-        self.assertIn("message", response.data)
+        self.assertIn("message", response.json())
 
     def test_token_api(self):
         User.objects.create_user(email="token@ex.com", password="tokenpass", role="Learner")
@@ -0,0 +1,42 @@
+from unittest import mock
+
+from django.test import TestCase
+from django.utils import timezone
+from django_redis import get_redis_connection
+
+from accounts import analytics, counters
+from accounts.models import User
+
+
+class CountersTest(TestCase):
+    def setUp(self):
+        redis = get_redis_connection('default')
+        redis.delete(counters.VIEWS_KEY, *redis.keys('counters:active:*'))
+        self.users = [User.objects.create_user(email=f"c{i}@ex.com", password="pass", role="Learner") for i in range(3)]
+
+    def test_active_user_windows(self):
+        now = timezone.now()
+        counters.record([
+            (self.users[0].pk, 'login', now),
+            (self.users[0].pk, 'resource_view', now),
+            (self.users[1].pk, 'login', now - timezone.timedelta(days=3)),
+            (self.users[2].pk, 'login', now - timezone.timedelta(days=20)),
+        ])
+        self.assertEqual(counters.active_users(), {
+            'daily_active_users': 1, 'weekly_active_users': 2, 'monthly_active_users': 3,
+        })
+
+    def test_reconcile_adds_views(self):
+        user = self.users[0]
+        counters.record([(user.pk, 'resource_view', None)] * 3 + [(user.pk, 'login', None)])
+        self.assertEqual(counters.reconcile(), 3)
+        user.refresh_from_db()
+        self.assertEqual(user.resources_viewed, 3)
+        self.assertEqual(counters.reconcile(), 0)
+
+    def test_summary_falls_back_to_login_times(self):
+        self.users[0].update_login_stats()
+        with mock.patch('accounts.counters.active_users', side_effect=ConnectionError):
+            summary = analytics.compute_summary(None, None, 'day')
+        self.assertEqual(summary['daily_active_users'], 1)
+        self.assertEqual(summary['monthly_active_users'], 1)
@@ -0,0 +1,47 @@
+import asyncio
+import threading
+
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework.test import APIClient
+
+from accounts.hashing import HashPool, HashPoolFull
+from accounts.models import User
+
+
+class HashPoolTest(SimpleTestCase):
+    def test_rejects_beyond_max_pending(self):
+        pool = HashPool(workers=1, max_pending=2)
+        release = threading.Event()
+
+        async def burst():
+            calls = [asyncio.ensure_future(pool.run(release.wait, 5)) for _ in range(3)]
+            await asyncio.sleep(0.05)
+            self.assertEqual(pool.snapshot()['queued'], 1)
+            release.set()
+            return await asyncio.gather(*calls, return_exceptions=True)
+
+        results = asyncio.run(burst())
+        self.assertIsInstance(results[2], HashPoolFull)
+        self.assertEqual(results[:2], [True, True])
+        snapshot = pool.snapshot()
+        self.assertEqual((snapshot['completed'], snapshot['rejected'], snapshot['queued']), (2, 1, 0))
+
+
+@override_settings(ARGON2_TIME_COST=1, ARGON2_MEMORY_COST=1024, ARGON2_PARALLELISM=1)
+class AsyncAuthViewTest(TestCase):
+    def test_register_and_login(self):
+        client = APIClient()
+        response = client.post('/auth/register/', {'email': 'async@ex.com', 'password': 'secret', 'role': 'Learner'}, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(User.objects.get(email='async@ex.com').check_password('secret'))
+
+        response = client.post('/auth/token/', {'email': 'async@ex.com', 'password': 'secret'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('access', response.json())
+        response = client.post('/auth/token/', {'email': 'async@ex.com', 'password': 'wrong'}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_register_validation_error(self):
+        response = APIClient().post('/auth/register/', {'password': 'secret'}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('email', response.json())
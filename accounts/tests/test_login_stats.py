@@ -0,0 +1,42 @@
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from django_redis import get_redis_connection
+from rest_framework.test import APIClient
+
+from accounts import login_stats
+from accounts.models import User
+
+
+class LoginStatsTest(TestCase):
+    def setUp(self):
+        get_redis_connection('default').delete(login_stats.COUNTS_KEY, login_stats.LAST_KEY)
+        self.user = User.objects.create_user(email="stats@ex.com", password="pass", role="Learner", is_verified=True)
+
+    def test_update_is_atomic_increment(self):
+        stale = User.objects.get(pk=self.user.pk)
+        self.user.update_login_stats()
+        stale.update_login_stats()
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.login_count, 2)
+        self.assertIsNotNone(self.user.last_login_time)
+
+    def test_login_view_counts_login(self):
+        response = APIClient().post('/auth/token/', {'email': 'stats@ex.com', 'password': 'pass'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.login_count, 1)
+
+    @override_settings(LOGIN_STATS_BATCHING=True)
+    def test_batched_logins_applied_on_flush(self):
+        first = timezone.now() - timezone.timedelta(minutes=5)
+        latest = timezone.now()
+        login_stats.record_login(self.user, first)
+        login_stats.record_login(self.user, latest)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.login_count, 0)
+
+        self.assertEqual(login_stats.flush(), 2)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.login_count, 2)
+        self.assertEqual(self.user.last_login_time, latest)
+        self.assertEqual(login_stats.flush(), 0)
@@ -0,0 +1,29 @@
+from django.test import TestCase, override_settings
+
+from accounts.models import User, password_hasher
+
+
+@override_settings(ARGON2_TIME_COST=1, ARGON2_MEMORY_COST=1024, ARGON2_PARALLELISM=1)
+class PasswordHashingTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email="hash@ex.com", password="secret", role="Learner")
+
+    def test_hash_uses_settings(self):
+        self.assertIn('m=1024,t=1,p=1', self.user.password)
+
+    def test_wrong_or_unusable_password(self):
+        self.assertFalse(self.user.check_password("nope"))
+        self.user.set_unusable_password()
+        self.assertFalse(self.user.check_password("secret"))
+
+    def test_malformed_hash_fails_login(self):
+        self.user.password = self.user.password[:-4] + "!!!!"
+        with self.assertLogs('accounts.models', level='WARNING'):
+            self.assertFalse(self.user.check_password("secret"))
+
+    def test_rehash_on_login_after_parameter_change(self):
+        with override_settings(ARGON2_MEMORY_COST=2048):
+            self.assertTrue(self.user.check_password("secret"))
+            stored = User.objects.get(pk=self.user.pk).password
+            self.assertIn('m=2048', stored)
+            self.assertFalse(password_hasher().check_needs_rehash(stored))
@@ -1,3 +1,6 @@
+import json
+
+from asgiref.sync import async_to_sync
 from django.test import TestCase, RequestFactory
 from accounts.models import User
 from accounts.views import AnalyticsSummary, ProfileView, RegisterView
@@ -14,15 +17,15 @@ class RegisterViewTest(TestCase):
     def test_register_success(self):
         data = {"email": "new@ex.com", "password": "newpass", "role": "Learner"}
         request = self.factory.post("/auth/register/", data, format="json")
-        response = self.view(request)
+        response = async_to_sync(self.view)(request)
         self.assertEqual(response.status_code, 201)
-        self.assertIn("message", response.data)
+        self.assertIn("message", json.loads(response.content))
 
     def test_register_duplicate_email(self):
         User.objects.create_user(email="dup@ex.com", password="pass", role="Learner")
         data = {"email": "dup@ex.com", "password": "newpass", "role": "Learner"}
         request = self.factory.post("/auth/register/", data, format="json")
-        response = self.view(request)
+        response = async_to_sync(self.view)(request)
         self.assertEqual(response.status_code, 400)
 
 
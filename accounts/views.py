@@ -1,3 +1,4 @@
+import json
 import os
 
 from django.contrib.sessions.models import Session
@@ -6,40 +7,64 @@ from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework_simplejwt.tokens import UntypedToken
-from django.utils import timezone
-from django.db.models import Count, Sum
-from rest_framework_simplejwt.views import TokenObtainPairView
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse
+from django.utils.decorators import method_decorator
+from django.utils.module_loading import import_string
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
 from .models import ForumPost, JobListing, User
-from .serializers import ForumPostSerializer, JobListingSerializer, AnalyticsEventSerializer, UserSerializer, RegisterSerializer, CustomTokenObtainPairSerializer, LearningResourceSerializer, AnalyticsSummarySerializer
+from .serializers import ForumPostSerializer, JobListingSerializer, AnalyticsEventSerializer, UserSerializer, RegisterSerializer, CustomTokenObtainPairSerializer, LearningResourceSerializer
 from rest_framework.pagination import PageNumberPagination
-from ai.models import AnalyticsEvent
+from .analytics import get_summary, parse_range
+from .hashing import HashPoolFull, hash_password, preverify_password
+from .login_stats import record_login
 from django.contrib.auth.tokens import default_token_generator
 from django.utils.http import urlsafe_base64_decode
 from django.utils.encoding import force_bytes
 import traceback
 import logging
-from django.utils.decorators import method_decorator
-from django.views.decorators.cache import cache_page
-from django.core.cache import cache
 
 
 logger = logging.getLogger(__name__)
 
-class RegisterView(APIView):
-    permission_classes = [AllowAny]
-    def post(self, request):
-        serializer = RegisterSerializer(data=request.data)
-        if serializer.is_valid():
+def request_data(request):
+    if request.content_type == 'application/json':
+        return json.loads(request.body or b'{}')
+    return request.POST
+
+
+def hash_pool_full_response():
+    response = JsonResponse({'error': 'Too many sign-ins in progress, retry shortly'}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+    response['Retry-After'] = '1'
+    return response
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class RegisterView(View):
+    """Async so the Argon2 hash runs in ``hash_pool`` rather than a request thread (see core/asgi.py)."""
+
+    async def post(self, request):
+        try:
+            serializer = RegisterSerializer(data=request_data(request))
+        except ValueError:
+            return JsonResponse({'error': 'Invalid JSON'}, status=status.HTTP_400_BAD_REQUEST)
+        if await sync_to_async(serializer.is_valid)():
             try:
-                user = serializer.save()
+                password_hash = await hash_password(serializer.validated_data['password'])
+                user = await sync_to_async(serializer.save)(password_hash=password_hash)
                 logger.info(f"User registered: {user.email}")
-                return Response({'message': 'User registered, check email'}, status=status.HTTP_201_CREATED)
+                return JsonResponse({'message': 'User registered, check email'}, status=status.HTTP_201_CREATED)
+            except HashPoolFull:
+                return hash_pool_full_response()
             except Exception as e:
                 logger.error(f"Registration error: {str(e)}")
-                logger.error(f"Request data: {request.data}\n{traceback.format_exc()}")
-                return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+                logger.error(f"Request data: {serializer.initial_data}\n{traceback.format_exc()}")
+                return JsonResponse({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
         logger.warning(f"Validation errors: {serializer.errors}")
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        return JsonResponse(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     
 class VerifyEmailView(APIView):
     permission_classes = [AllowAny]
@@ -127,81 +152,35 @@ class JobListingRetrieveUpdateDestroy(generics.RetrieveUpdateDestroyAPIView):
 class AnalyticsSummary(APIView):
     permission_classes = [IsAuthenticated]
 
-    @method_decorator(cache_page(60 * 5))  # Cache for 5 minutes
     def get(self, request):
         try:
-            # Check cache first with error handling
-            cache_key = f"analytics_summary_{request.user.id}"
-            cached_data = None
-            try:
-                cached_data = cache.get(cache_key)
-            except Exception as cache_e:
-                logger.error(f"Cache connection failed: {str(cache_e)}")
-            if cached_data is not None:
-                logger.info(f"Cache hit for user {request.user.id}")
-                return Response(cached_data)
-
-            today = timezone.now().date()
-            logger.info(f"Fetching analytics for date: {today}")
-
-            # Database queries with error handling
-            try:
-                daily_logins = User.objects.filter(last_login__date=today).count()
-                logger.info(f"Daily logins count: {daily_logins}")
-            except Exception as db_e:
-                logger.error(f"Database error for daily logins: {str(db_e)}")
-                daily_logins = 0
-
-            try:
-                total_resources_query = User.objects.aggregate(total_resources=Sum('resources_viewed'))
-                total_resources_viewed = total_resources_query['total_resources'] if total_resources_query['total_resources'] is not None else 0
-                logger.info(f"Total resources viewed: {total_resources_viewed}")
-            except Exception as db_e:
-                logger.error(f"Database error for resources viewed: {str(db_e)}")
-                total_resources_viewed = 0
-
-            try:
-                event_types = AnalyticsEvent.objects.values('event_type').annotate(count=Count('id'))
-                event_count = AnalyticsEvent.objects.count()
-                logger.info(f"Event count: {event_count}, Event types: {list(event_types)}")
-            except Exception as db_e:
-                logger.error(f"Database error for events: {str(db_e)}")
-                event_types = []
-                event_count = 0
-
-            data = {
-                'daily_active_users': daily_logins,
-                'total_resources_viewed': total_resources_viewed,
-                'event_count': event_count,
-                'event_types': list(event_types),
-            }
-            serializer = AnalyticsSummarySerializer(data)
-            response_data = serializer.data
-
-            # Cache the result per user, handle failure
-            try:
-                cache.set(cache_key, response_data, timeout=60 * 5)
-                logger.info(f"Cache set for user {request.user.id}")
-            except Exception as cache_e:
-                logger.error(f"Cache error: {str(cache_e)}")
-
-            return Response(response_data)
+            start, end, granularity = parse_range(request.query_params)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            # Platform-wide numbers, so every user shares one cached entry per range
+            return Response(get_summary(start, end, granularity))
         except Exception as e:
             logger.error(f"Analytics summary error: {str(e)}", exc_info=True)
             return Response({"error": "Failed to retrieve analytics"}, status=500)
     
-class LoginView(TokenObtainPairView):
-    def post(self, request, *args, **kwargs):
-        serializer = self.get_serializer(data=request.data)
+@method_decorator(csrf_exempt, name='dispatch')
+class LoginView(View):
+    """Async TokenObtainPairView; the password is checked in ``hash_pool`` before authenticate() runs."""
+
+    async def post(self, request):
         try:
-            serializer.is_valid(raise_exception=True)
-            # Get the user from validated data
-            user_data = serializer.validated_data
-            user_id = user_data.get('user_id')  # Adjust based on your CustomTokenObtainPairSerializer
-            user = User.objects.get(id=user_id) if user_id else None
-            if user:
-                user.update_login_stats()  # Update login stats for the authenticated user
-            response = Response(serializer.validated_data, status=status.HTTP_200_OK)
+            serializer_class = import_string(jwt_settings.TOKEN_OBTAIN_SERIALIZER)
+            data = request_data(request)
+            serializer = serializer_class(data=data, context={'request': request})
+            if data.get('email') and data.get('password') and not await preverify_password(data['email'], data['password']):
+                raise AuthenticationFailed(serializer.error_messages['no_active_account'])
+            await sync_to_async(serializer.is_valid)(raise_exception=True)
+            # The serializer already authenticated the user; no need to fetch it again
+            await sync_to_async(record_login)(serializer.user)
+            response = JsonResponse(serializer.validated_data, status=status.HTTP_200_OK)
+        except HashPoolFull:
+            return hash_pool_full_response()
         except Exception as e:
-            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
-        return response
\ No newline at end of file
+            return JsonResponse({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return response
@@ -1,3 +1,12 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import AnalyticsEvent
+
+
+@admin.register(AnalyticsEvent)
+class AnalyticsEventAdmin(admin.ModelAdmin):
+    list_display = ('event_type', 'user', 'timestamp')
+    list_filter = ('event_type',)
+    raw_id_fields = ('user',)
+    # Newest first here only; the model has no default ordering
+    ordering = ('-timestamp',)
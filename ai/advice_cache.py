@@ -0,0 +1,104 @@
+import hashlib
+import json
+import logging
+import re
+import threading
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+
+from .embedding_cache import encode_cached
+
+logger = logging.getLogger(__name__)
+
+# Parameters the cached text was generated with; part of every key so changing
+# the model or generation length never serves stale advice
+GENERATION_PARAMS = {'max_length': 200, 'num_return_sequences': 1, 'return_full_text': False}
+
+SIMILARITY_INDEX_KEY = 'career_advice:similarity_index'
+
+_counters = {'exact_hits': 0, 'similar_hits': 0, 'misses': 0, 'bypassed': 0, 'errors': 0}
+_counters_lock = threading.Lock()
+
+
+def _count(name):
+    with _counters_lock:
+        _counters[name] += 1
+
+
+def normalize_query(query):
+    query = re.sub(r'\s+', ' ', query.casefold()).strip()
+    return query.rstrip('?!. ')
+
+
+def _params_digest():
+    params = dict(GENERATION_PARAMS, model=settings.AI_TEXT_GENERATION_MODEL)
+    return hashlib.sha256(json.dumps(params, sort_keys=True).encode()).hexdigest()[:12]
+
+
+def _key(normalized):
+    digest = hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+    return f"career_advice:{_params_digest()}:{digest}"
+
+
+def _similar_key(normalized):
+    """Key of the most similar cached query above the configured threshold, if any."""
+    threshold = settings.AI_ADVICE_CACHE_SIMILARITY
+    if not threshold:
+        return None
+    index = cache.get(SIMILARITY_INDEX_KEY) or []
+    entries = [(key, vector) for key, vector in index if key.startswith(f"career_advice:{_params_digest()}:")]
+    if not entries:
+        return None
+    matrix = np.vstack([np.frombuffer(vector, dtype='<f2').astype(np.float32) for _, vector in entries])
+    query_vector = encode_cached([normalized])[0]
+    scores = matrix @ query_vector / (np.linalg.norm(matrix, axis=1) * np.linalg.norm(query_vector) + 1e-9)
+    best = int(np.argmax(scores))
+    return entries[best][0] if scores[best] >= threshold else None
+
+
+def get_advice(query):
+    normalized = normalize_query(query)
+    try:
+        entry = cache.get(_key(normalized))
+        if entry is not None:
+            _count('exact_hits')
+            return entry['advice']
+        similar = _similar_key(normalized)
+        entry = cache.get(similar) if similar else None
+        if entry is not None:
+            _count('similar_hits')
+            return entry['advice']
+    except Exception as e:
+        logger.error(f"Advice cache read failed: {str(e)}")
+        _count('errors')
+        return None
+    _count('misses')
+    return None
+
+
+def store_advice(query, advice):
+    normalized = normalize_query(query)
+    key = _key(normalized)
+    timeout = settings.AI_ADVICE_CACHE_TIMEOUT
+    try:
+        cache.set(key, {'advice': advice, 'query': normalized, 'params': GENERATION_PARAMS}, timeout=timeout)
+        if settings.AI_ADVICE_CACHE_SIMILARITY:
+            vector = encode_cached([normalized])[0].astype('<f2').tobytes()
+            # Best-effort bounded list; a lost concurrent update only costs a future similar hit
+            index = [(k, v) for k, v in (cache.get(SIMILARITY_INDEX_KEY) or []) if k != key]
+            index.append((key, vector))
+            cache.set(SIMILARITY_INDEX_KEY, index[-settings.AI_ADVICE_CACHE_INDEX_SIZE:], timeout=timeout)
+    except Exception as e:
+        logger.error(f"Advice cache write failed: {str(e)}")
+        _count('errors')
+
+
+def mark_bypassed():
+    _count('bypassed')
+
+
+def stats():
+    with _counters_lock:
+        return dict(_counters)
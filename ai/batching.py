@@ -0,0 +1,157 @@
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from django.conf import settings
+
+from .registry import get_text_generator
+
+logger = logging.getLogger(__name__)
+
+WAIT_BUCKETS_MS = [5, 10, 25, 50, 100, 250, 500, 1000]
+
+
+class BatchMetrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._clear()
+
+    def reset(self):
+        with self._lock:
+            self._clear()
+
+    def _clear(self):
+        self.batches = 0
+        self.items = 0
+        self.failures = 0
+        self.batch_sizes = {}
+        self.wait_buckets = {str(b): 0 for b in WAIT_BUCKETS_MS + ['inf']}
+        self.wait_total_ms = 0.0
+        self.wait_max_ms = 0.0
+        self.run_total_ms = 0.0
+
+    def record(self, size, waits_ms, run_ms, failed=False):
+        with self._lock:
+            self.batches += 1
+            self.items += size
+            self.failures += int(failed)
+            self.batch_sizes[size] = self.batch_sizes.get(size, 0) + 1
+            self.run_total_ms += run_ms
+            for wait in waits_ms:
+                self.wait_total_ms += wait
+                self.wait_max_ms = max(self.wait_max_ms, wait)
+                bucket = next((str(b) for b in WAIT_BUCKETS_MS if wait <= b), 'inf')
+                self.wait_buckets[bucket] += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'batches': self.batches,
+                'items': self.items,
+                'failures': self.failures,
+                'avg_batch_size': round(self.items / self.batches, 2) if self.batches else 0,
+                'batch_size_histogram': dict(sorted(self.batch_sizes.items())),
+                'queue_wait_ms_histogram': dict(self.wait_buckets),
+                'avg_queue_wait_ms': round(self.wait_total_ms / self.items, 2) if self.items else 0,
+                'max_queue_wait_ms': round(self.wait_max_ms, 2),
+                'avg_batch_run_ms': round(self.run_total_ms / self.batches, 2) if self.batches else 0,
+            }
+
+
+class InferenceQueue:
+    """Coalesces concurrent calls into one batched call run by a background thread.
+
+    ``run_batch`` receives a list of inputs and must return one result per input.
+    """
+
+    def __init__(self, run_batch, max_batch_size=8, max_wait=0.02, name='inference'):
+        self.run_batch = run_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.name = name
+        self.metrics = BatchMetrics()
+        self._queue = queue.Queue()
+        self._worker = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def _ensure_worker(self):
+        # Threads do not survive a fork, so each worker process starts its own
+        if self._worker is not None and self._worker.is_alive() and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive() or self._pid != os.getpid():
+                self._queue = queue.Queue()
+                self._pid = os.getpid()
+                self._worker = threading.Thread(target=self._run, name=f"{self.name}-batcher", daemon=True)
+                self._worker.start()
+
+    def submit(self, item, timeout=None):
+        self._ensure_worker()
+        future = Future()
+        self._queue.put((item, future, time.perf_counter()))
+        return future.result(timeout=timeout)
+
+    def pending(self):
+        return self._queue.qsize()
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            started = time.perf_counter()
+            waits_ms = [(started - enqueued) * 1000 for _, _, enqueued in batch]
+            items = [item for item, _, _ in batch]
+            results, error = None, None
+            try:
+                results = list(self.run_batch(items))
+                if len(results) != len(batch):
+                    # zip() would leave the unmatched callers waiting until their timeout
+                    raise ValueError(f"run_batch returned {len(results)} results for {len(batch)} inputs")
+            except Exception as e:
+                logger.error(f"{self.name} batch of {len(batch)} failed: {str(e)}")
+                error = e
+            self.metrics.record(len(batch), waits_ms, (time.perf_counter() - started) * 1000, error is not None)
+            if error is not None:
+                for _, future, _ in batch:
+                    future.set_exception(error)
+            else:
+                for (_, future, _), result in zip(batch, results):
+                    future.set_result(result)
+
+
+def generate_advice_batch(prompts):
+    generator = get_text_generator()
+    outputs = generator(
+        prompts,
+        batch_size=len(prompts),
+        max_length=200,  # Increase to allow more text
+        num_return_sequences=1,
+        return_full_text=False,  # Only the continuation; the prompt carries the asker's wording
+        truncation=True,  # Explicitly enable truncation
+        pad_token_id=generator.tokenizer.eos_token_id  # Ensure proper padding
+    )
+    return [output[0]['generated_text'] for output in outputs]
+
+
+career_coach_queue = InferenceQueue(
+    generate_advice_batch,
+    max_batch_size=settings.AI_BATCH_MAX_SIZE,
+    max_wait=settings.AI_BATCH_MAX_WAIT_MS / 1000,
+    name='career-coach',
+)
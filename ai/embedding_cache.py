@@ -0,0 +1,109 @@
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+
+from .registry import get_sentence_model
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingCache:
+    """Query embeddings cached in a per-process LRU, backed by the shared Redis cache.
+
+    Redis holds float16 bytes (half the memory, well within cosine/L2 tolerance);
+    the local tier keeps the decoded float32 vectors.
+    """
+
+    def __init__(self, max_entries, timeout):
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self._local = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {'local_hits': 0, 'redis_hits': 0, 'misses': 0, 'redis_errors': 0}
+
+    def _key(self, text):
+        digest = hashlib.sha256(text.encode('utf-8')).hexdigest()
+        # int8 vectors drift slightly from torch ones, so backends do not share entries
+        return f"embedding:{settings.AI_EMBEDDING_MODEL}:{settings.AI_EMBEDDING_BACKEND}:{digest}"
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self._counters[name] += amount
+
+    def _remember(self, key, vector):
+        with self._lock:
+            self._local[key] = vector
+            self._local.move_to_end(key)
+            while len(self._local) > self.max_entries:
+                self._local.popitem(last=False)
+
+    def encode(self, texts):
+        """Same contract as ``SentenceTransformer.encode`` for a list: one float32 row per text."""
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32)
+        keys = [self._key(text) for text in texts]
+        vectors = {}
+        with self._lock:
+            for key in keys:
+                if key in self._local:
+                    self._local.move_to_end(key)
+                    vectors[key] = self._local[key]
+        self._count('local_hits', len(vectors))
+
+        remote_keys = [key for key in dict.fromkeys(keys) if key not in vectors]
+        if remote_keys:
+            try:
+                found = cache.get_many(remote_keys)
+            except Exception as e:
+                logger.error(f"Embedding cache read failed: {str(e)}")
+                self._count('redis_errors')
+                found = {}
+            for key, raw in found.items():
+                vectors[key] = np.frombuffer(raw, dtype='<f2').astype(np.float32)
+                self._remember(key, vectors[key])
+            self._count('redis_hits', len(found))
+
+        missing = {key: text for key, text in zip(keys, texts) if key not in vectors}
+        if missing:
+            self._count('misses', len(missing))
+            encoded = np.asarray(get_sentence_model().encode(list(missing.values())), dtype=np.float32)
+            to_store = {}
+            for key, vector in zip(missing, encoded):
+                vectors[key] = vector
+                self._remember(key, vector)
+                to_store[key] = vector.astype('<f2').tobytes()
+            try:
+                cache.set_many(to_store, timeout=self.timeout)
+            except Exception as e:
+                logger.error(f"Embedding cache write failed: {str(e)}")
+                self._count('redis_errors')
+        return np.vstack([vectors[key] for key in keys])
+
+    def clear_local(self):
+        with self._lock:
+            self._local.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self._counters['local_hits'] + self._counters['redis_hits'] + self._counters['misses']
+            hits = self._counters['local_hits'] + self._counters['redis_hits']
+            return dict(
+                self._counters,
+                local_entries=len(self._local),
+                hit_rate=round(hits / lookups, 3) if lookups else 0,
+            )
+
+
+embedding_cache = EmbeddingCache(
+    max_entries=settings.AI_EMBEDDING_CACHE_SIZE,
+    timeout=settings.AI_EMBEDDING_CACHE_TIMEOUT,
+)
+
+
+def encode_cached(texts):
+    return embedding_cache.encode(texts)
@@ -0,0 +1,108 @@
+import hashlib
+import logging
+import threading
+
+import numpy as np
+from django.db.models import Count, Max
+
+from .models import ResourceEmbedding
+from .registry import embedding_version, get_sentence_model
+
+logger = logging.getLogger(__name__)
+
+
+def content_hash(text):
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def embed_resources(resources, force=False, batch_size=64):
+    """Encode the resources whose stored vector is missing or out of date.
+
+    Returns ``{resource_id: float32 vector}`` for every resource passed in.
+    """
+    resources = list(resources)
+    model_name = embedding_version()
+    stored = {
+        embedding.resource_id: embedding
+        for embedding in ResourceEmbedding.objects.filter(
+            resource__in=[r.id for r in resources], model_name=model_name
+        )
+    }
+    vectors = {}
+    stale = []
+    for resource in resources:
+        embedding = stored.get(resource.id)
+        if not force and embedding is not None and embedding.content_hash == content_hash(resource.content):
+            vectors[resource.id] = embedding.as_array()
+        else:
+            stale.append(resource)
+
+    for start in range(0, len(stale), batch_size):
+        chunk = stale[start:start + batch_size]
+        encoded = get_sentence_model().encode([r.content for r in chunk], batch_size=batch_size)
+        encoded = np.asarray(encoded, dtype='<f4')
+        for resource, vector in zip(chunk, encoded):
+            ResourceEmbedding.objects.update_or_create(
+                resource=resource,
+                model_name=model_name,
+                defaults={
+                    'content_hash': content_hash(resource.content),
+                    'dimensions': vector.shape[0],
+                    'vector': vector.tobytes(),
+                },
+            )
+            vectors[resource.id] = vector
+        logger.info(f"Embedded {len(chunk)} learning resources with {model_name}")
+    return vectors
+
+
+_matrices = {}
+_matrix_lock = threading.Lock()
+
+
+def resource_matrix():
+    """Row-normalised matrix of every stored resource vector, cached per process.
+
+    Rebuilt when the embedding table changes (row count or latest update) or a
+    resource is edited, since the cached types come from the resources.
+    """
+    model_name = embedding_version()
+    embeddings = ResourceEmbedding.objects.filter(model_name=model_name)
+    signature = embeddings.aggregate(
+        count=Count('id'), latest=Max('updated_at'), resources_latest=Max('resource__updated_at'),
+    )
+    cached = _matrices.get(model_name)
+    if cached is not None and cached['signature'] == signature:
+        return cached
+    with _matrix_lock:
+        rows = list(embeddings.values_list('resource_id', 'resource__type', 'vector'))
+        if rows:
+            matrix = np.vstack([np.frombuffer(vector, dtype='<f4') for _, _, vector in rows])
+            norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+            matrix = matrix / np.where(norms == 0, 1, norms)
+        else:
+            # Nothing stored for this backend yet; callers skip semantic ranking until a backfill
+            logger.warning(f"No {model_name} resource embeddings stored; run backfill_resource_embeddings")
+            matrix = np.empty((0, 0), dtype=np.float32)
+        cached = {
+            'signature': signature,
+            'ids': np.array([resource_id for resource_id, _, _ in rows], dtype=np.int64),
+            'types': np.array([resource_type for _, resource_type, _ in rows], dtype=object),
+            'matrix': matrix,
+        }
+        _matrices[model_name] = cached
+    return cached
+
+
+def top_k(query_vector, matrix, k):
+    """Indices of the ``k`` highest cosine scores, best first, and all scores."""
+    if matrix.shape[0] == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+    query_vector = np.asarray(query_vector, dtype=np.float32)
+    norm = np.linalg.norm(query_vector)
+    scores = matrix @ (query_vector / norm if norm else query_vector)
+    k = min(k, scores.shape[0])
+    if k <= 0:
+        return np.empty(0, dtype=np.int64), scores
+    candidates = np.argpartition(-scores, k - 1)[:k]
+    return candidates[np.argsort(-scores[candidates])], scores
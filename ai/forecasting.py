@@ -0,0 +1,168 @@
+import logging
+from datetime import timedelta
+
+import numpy as np
+from django.conf import settings
+from django.db.models import Count
+from django.db.models.functions import TruncDay, TruncHour
+from django.utils import timezone
+
+from accounts.models import User
+from .models import LEGACY_EVENT_TYPE, AnalyticsEvent, Forecast
+
+logger = logging.getLogger(__name__)
+
+EVENT_TYPES = [choice for choice, _ in AnalyticsEvent._meta.get_field('event_type').choices if choice != LEGACY_EVENT_TYPE]
+ROLES = [choice for choice, _ in User._meta.get_field('role').choices]
+
+# (event type, role, granularity, model) served live from the EventTrend sums the
+# signals and ingest maintain, so no Forecast row is stored for it
+TREND_SERIES = ('login', '', 'day', 'linear')
+
+
+def granularities():
+    return {
+        'day': {
+            'trunc': TruncDay,
+            'step': timedelta(days=1),
+            'season': 7,
+            'history': settings.AI_FORECAST_HISTORY_DAYS,
+            'horizon': settings.AI_FORECAST_HORIZON_DAYS,
+        },
+        'hour': {
+            'trunc': TruncHour,
+            'step': timedelta(hours=1),
+            'season': 24,
+            'history': settings.AI_FORECAST_HISTORY_HOURS,
+            'horizon': settings.AI_FORECAST_HORIZON_HOURS,
+        },
+    }
+
+
+# Every model maps counts of shape (series, periods) to forecasts of shape
+# (series, horizon), fitting all series at once.
+
+def linear_trend(y, horizon, season_length):
+    x = np.arange(y.shape[1])
+    if len(x) < 2:
+        return np.repeat(y.sum(axis=1, keepdims=True), horizon, axis=1)
+    slope, intercept = np.polyfit(x, y.T, 1)
+    future = np.arange(len(x), len(x) + horizon)
+    return intercept[:, None] + slope[:, None] * future
+
+
+def seasonal_naive(y, horizon, season_length):
+    """Repeat the last full season: next Monday is forecast as last Monday."""
+    if y.shape[1] < season_length:
+        return linear_trend(y, horizon, season_length)
+    return y[:, -season_length:][:, np.arange(horizon) % season_length]
+
+
+def _holt_winters_pass(y, season_length, alpha, beta, gamma):
+    n = y.shape[1]
+    level = y[:, :season_length].mean(axis=1)
+    trend = (y[:, season_length:2 * season_length].mean(axis=1) - level) / season_length
+    season = y[:, :season_length] - level[:, None]
+    sse = np.zeros(len(y))
+    for t in range(n):
+        i = t % season_length
+        error = y[:, t] - (level + trend + season[:, i])
+        sse += error ** 2
+        previous = level
+        level = alpha * (y[:, t] - season[:, i]) + (1 - alpha) * (level + trend)
+        trend = beta * (level - previous) + (1 - beta) * trend
+        season[:, i] = gamma * (y[:, t] - level) + (1 - gamma) * season[:, i]
+    return sse, level, trend, season
+
+
+def holt_winters(y, horizon, season_length, grid=((0.1, 0.3, 0.5), (0.01, 0.1), (0.1, 0.3))):
+    """Additive Holt-Winters; smoothing parameters picked per series by one-step SSE."""
+    if y.shape[1] < 2 * season_length:
+        return seasonal_naive(y, horizon, season_length)
+    n = y.shape[1]
+    steps = np.arange(1, horizon + 1)
+    best_sse = np.full(len(y), np.inf)
+    best = np.zeros((len(y), horizon))
+    for alpha in grid[0]:
+        for beta in grid[1]:
+            for gamma in grid[2]:
+                sse, level, trend, season = _holt_winters_pass(y, season_length, alpha, beta, gamma)
+                forecast = level[:, None] + trend[:, None] * steps + season[:, (n + steps - 1) % season_length]
+                better = sse < best_sse
+                best_sse[better] = sse[better]
+                best[better] = forecast[better]
+    return best
+
+
+FORECAST_MODELS = {
+    'linear': linear_trend,
+    'holt_winters': holt_winters,
+    'seasonal_naive': seasonal_naive,
+}
+
+
+def current_period(granularity, now=None):
+    now = timezone.localtime(now)
+    if granularity == 'hour':
+        return now.replace(minute=0, second=0, microsecond=0)
+    return now.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def load_series(granularity, now=None):
+    """Event counts over the history window, shape (event types, roles, periods).
+
+    Only complete periods are included; the forecast starts at the current one.
+    """
+    config = granularities()[granularity]
+    end = current_period(granularity, now)
+    start = end - config['history'] * config['step']
+    rows = (
+        AnalyticsEvent.objects.filter(timestamp__gte=start, timestamp__lt=end, user__role__in=ROLES)
+        .annotate(bucket=config['trunc']('timestamp'))
+        .values('event_type', 'user__role', 'bucket')
+        .annotate(count=Count('id'))
+        .order_by()
+    )
+    counts = np.zeros((len(EVENT_TYPES), len(ROLES), config['history']))
+    rows = [row for row in rows if row['event_type'] in EVENT_TYPES]
+    if rows:
+        np.add.at(counts, (
+            [EVENT_TYPES.index(row['event_type']) for row in rows],
+            [ROLES.index(row['user__role']) for row in rows],
+            [round((row['bucket'] - start) / config['step']) for row in rows],
+        ), [row['count'] for row in rows])
+    return end, counts
+
+
+def refresh_forecasts(granularity, now=None):
+    """Fit every model to every (event type, role) series and store the forecasts."""
+    config = granularities()[granularity]
+    start, counts = load_series(granularity, now)
+    keys, series = [], []
+    for e, event_type in enumerate(EVENT_TYPES):
+        keys.append((event_type, ''))
+        series.append(counts[e].sum(axis=0))
+        for r, role in enumerate(ROLES):
+            keys.append((event_type, role))
+            series.append(counts[e, r])
+    series = np.vstack(series)
+
+    rows = []
+    for model_name, model in FORECAST_MODELS.items():
+        values = np.clip(model(series, config['horizon'], config['season']), 0, None)
+        rows.extend(
+            Forecast(
+                event_type=event_type, role=role, granularity=granularity, model_name=model_name,
+                start=start, values=[round(float(v), 3) for v in forecast],
+            )
+            for (event_type, role), forecast in zip(keys, values)
+            if (event_type, role, granularity, model_name) != TREND_SERIES
+        )
+    Forecast.objects.bulk_create(
+        rows,
+        update_conflicts=True,
+        unique_fields=['event_type', 'role', 'granularity', 'model_name'],
+        update_fields=['start', 'values', 'generated_at'],
+    )
+    logger.info(f"Stored {len(rows)} {granularity} forecasts starting {start.isoformat()}")
+    return len(rows)
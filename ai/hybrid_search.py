@@ -0,0 +1,120 @@
+import logging
+
+import numpy as np
+from django.conf import settings
+from django.contrib.postgres.search import SearchQuery, SearchRank
+
+from accounts.models import ForumPost, JobListing, LearningResource, search_vector
+from .embedding_cache import encode_cached
+from .embeddings import resource_matrix, top_k
+from .search_index import forum_index, job_index
+
+logger = logging.getLogger(__name__)
+
+
+def _resource_semantic_ids(query_vector, limit):
+    # Empty after a backend switch until backfill_resource_embeddings runs, leaving lexical hits
+    cached = resource_matrix()
+    order, _ = top_k(query_vector, cached['matrix'], limit)
+    return cached['ids'][order].tolist()
+
+
+def _index_semantic_ids(index):
+    def ranking(query_vector, limit):
+        return index.search(query_vector.reshape(1, -1), k=limit)[1]
+    return ranking
+
+
+# Per content type: the lexical queryset, the two fields in its GIN search vector,
+# how to rank it semantically, and how to render a hit
+CONTENT_TYPES = {
+    'forum_post': {
+        'queryset': lambda: ForumPost.objects.all(),
+        'fields': ('title', 'content'),
+        'semantic': _index_semantic_ids(forum_index),
+        'only': ('id', 'title', 'content', 'created_at'),
+        'render': lambda post: {"title": post.title, "snippet": post.content[:200], "created_at": post.created_at.isoformat()},
+    },
+    'job_listing': {
+        'queryset': lambda: JobListing.objects.filter(is_active=True),
+        'fields': ('title', 'description'),
+        'semantic': _index_semantic_ids(job_index),
+        'only': ('id', 'title', 'description', 'company', 'posted_at'),
+        'render': lambda job: {"title": job.title, "snippet": job.description[:200], "company": job.company, "created_at": job.posted_at.isoformat()},
+    },
+    'learning_resource': {
+        'queryset': lambda: LearningResource.objects.all(),
+        'fields': ('title', 'content'),
+        'semantic': _resource_semantic_ids,
+        'only': ('id', 'title', 'type', 'content', 'created_at'),
+        'render': lambda resource: {"title": resource.title, "snippet": resource.content[:200], "resource_type": resource.type, "created_at": resource.created_at.isoformat()},
+    },
+}
+
+
+def lexical_ids(content_type, query, limit, phrase=False):
+    config = CONTENT_TYPES[content_type]
+    search_query = SearchQuery(query, config='english', search_type='phrase' if phrase else 'websearch')
+    # Same expression as the model's GinIndex so Postgres can use it
+    vector = search_vector(*config['fields'])
+    return list(
+        config['queryset']()
+        .annotate(search=vector)
+        .filter(search=search_query)
+        .annotate(rank=SearchRank(vector, search_query))
+        .order_by('-rank', '-pk')
+        .values_list('pk', flat=True)[:limit]
+    )
+
+
+def reciprocal_rank_fusion(rankings, k=60):
+    """Fuse ranked lists of keys: score(d) = sum over lists of 1 / (k + rank)."""
+    scores = {}
+    for ranking in rankings:
+        for rank, key in enumerate(ranking, start=1):
+            scores[key] = scores.get(key, 0.0) + 1.0 / (k + rank)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+
+def hybrid_search(query, content_types, limit, mode='hybrid'):
+    """Ranks ``content_types`` for ``query`` and returns up to ``limit`` rendered hits.
+
+    A query wrapped in double quotes is an exact phrase: it is matched lexically
+    only, so the embedding model and ANN indexes are skipped.
+    """
+    phrase = len(query) > 2 and query.startswith('"') and query.endswith('"')
+    if phrase:
+        query, mode = query[1:-1], 'lexical'
+    candidates = settings.AI_HYBRID_CANDIDATES
+    query_vector = None
+    if mode != 'lexical':
+        query_vector = np.asarray(encode_cached([query])[0], dtype=np.float32)
+
+    rankings = []
+    for content_type in content_types:
+        if mode != 'semantic':
+            rankings.append([(content_type, pk) for pk in lexical_ids(content_type, query, candidates, phrase)])
+        if mode != 'lexical':
+            semantic = CONTENT_TYPES[content_type]['semantic'](query_vector, candidates)
+            rankings.append([(content_type, pk) for pk in semantic])
+
+    fused = reciprocal_rank_fusion(rankings, k=settings.AI_HYBRID_RRF_K)[:limit]
+    rows = {}
+    for content_type in content_types:
+        pks = [pk for hit_type, pk in (key for key, _ in fused) if hit_type == content_type]
+        if pks:
+            config = CONTENT_TYPES[content_type]
+            rows[content_type] = config['queryset']().only(*config['only']).in_bulk(pks)
+
+    results = []
+    for (content_type, pk), score in fused:
+        obj = rows.get(content_type, {}).get(pk)
+        if obj is None:
+            continue  # deleted or deactivated since it was indexed
+        results.append(dict(
+            CONTENT_TYPES[content_type]['render'](obj),
+            type=content_type,
+            id=pk,
+            score=round(score, 6),
+        ))
+    return results
@@ -0,0 +1,227 @@
+import json
+import logging
+import re
+from collections import Counter
+
+from django.conf import settings
+from django.db import DataError, IntegrityError, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django_redis import get_redis_connection
+
+from accounts import counters
+from accounts.models import User
+from . import rollups, trends
+from .models import LEGACY_EVENT_TYPE, AnalyticsEvent
+
+logger = logging.getLogger(__name__)
+
+BUFFER_KEY = 'analytics:events:buffer'
+# Events Postgres refused, or that kept failing, wait here for inspection instead of blocking the buffer
+DEAD_LETTER_KEY = 'analytics:events:dead'
+COUNTER_KEYS = {name: f"analytics:events:{name}" for name in ('buffered', 'dropped', 'flushed', 'invalid')}
+EVENT_TYPES = {choice for choice, _ in AnalyticsEvent._meta.get_field('event_type').choices} - {LEGACY_EVENT_TYPE}
+
+# Used when Redis itself is unreachable, so drops are still visible per process
+_local_dropped = 0
+
+# A JSON \\u0000 escape that is not itself an escaped backslash
+NUL_ESCAPE = re.compile(r'(?<!\\)(?:\\\\)*\\u0000')
+
+
+def _redis():
+    return get_redis_connection('default')
+
+
+def validate_details(details):
+    """Reject details the ``jsonb`` column would refuse at flush time; returns them unchanged."""
+    if not isinstance(details, dict):
+        raise ValueError("details must be an object")
+    try:
+        encoded = json.dumps(details)
+    except (TypeError, ValueError):
+        raise ValueError("details must be JSON serialisable")
+    if NUL_ESCAPE.search(encoded):
+        raise ValueError("details must not contain NUL characters")
+    return details
+
+
+def _encode(user_id, event_type, details=None, timestamp=None):
+    if event_type not in EVENT_TYPES:
+        raise ValueError(f"event_type must be one of {sorted(EVENT_TYPES)}")
+    return json.dumps({
+        'user_id': user_id,
+        'event_type': event_type,
+        'details': validate_details(details or {}),
+        'timestamp': (timestamp or timezone.now()).isoformat(),
+    })
+
+
+def track_many(events):
+    """Buffer ``(user_id, event_type, details, timestamp)`` tuples for the next flush.
+
+    Returns how many were accepted. When the buffer is full or Redis is down the
+    events are dropped and counted rather than written synchronously.
+    """
+    global _local_dropped
+    # Read twice below (payloads and live counters), so generators are materialised
+    events = list(events)
+    payloads = [_encode(*event) for event in events]
+    if not payloads:
+        return 0
+    try:
+        redis = _redis()
+        if redis.llen(BUFFER_KEY) + len(payloads) > settings.ANALYTICS_BUFFER_MAX_LENGTH:
+            redis.incrby(COUNTER_KEYS['dropped'], len(payloads))
+            logger.warning(f"Analytics buffer full, dropped {len(payloads)} events")
+            return 0
+        pipe = redis.pipeline(transaction=False)
+        pipe.rpush(BUFFER_KEY, *payloads)
+        pipe.incrby(COUNTER_KEYS['buffered'], len(payloads))
+        # Active-user and view counters are live; the events reach Postgres at the next flush
+        counters.record([(user_id, event_type, timestamp) for user_id, event_type, _, timestamp in events], pipe)
+        pipe.execute()
+    except Exception as e:
+        _local_dropped += len(payloads)
+        logger.error(f"Could not buffer {len(payloads)} analytics events: {str(e)}")
+        return 0
+    return len(payloads)
+
+
+def track(user_id, event_type, details=None, timestamp=None):
+    """Record one event without touching the database; True if it was buffered."""
+    return track_many([(user_id, event_type, details, timestamp)]) == 1
+
+
+def _pop(redis, count):
+    pipe = redis.pipeline(transaction=True)
+    pipe.lrange(BUFFER_KEY, 0, count - 1)
+    pipe.ltrim(BUFFER_KEY, count, -1)
+    return pipe.execute()[0]
+
+
+def _decode(payloads):
+    """``(payload, event)`` pairs for the payloads that parse, and how many did not."""
+    pairs, invalid = [], 0
+    for payload in payloads:
+        try:
+            data = json.loads(payload)
+            timestamp = parse_datetime(data['timestamp'])
+            if data['event_type'] not in EVENT_TYPES or timestamp is None:
+                raise ValueError(data['event_type'])
+            pairs.append((payload, AnalyticsEvent(
+                user_id=data['user_id'], event_type=data['event_type'],
+                details=validate_details(data['details']), timestamp=timestamp,
+            )))
+        except (ValueError, KeyError, TypeError):
+            invalid += 1
+    return pairs, invalid
+
+
+def _write(events):
+    """bulk_create skips the post_save signals, so trends and rollups are updated here."""
+    roles = dict(User.objects.filter(pk__in={e.user_id for e in events}).values_list('pk', 'role'))
+    events = [e for e in events if e.user_id in roles]
+    with transaction.atomic():
+        AnalyticsEvent.objects.bulk_create(events, batch_size=settings.ANALYTICS_FLUSH_BATCH_SIZE)
+        trends.record_counts(Counter((e.event_type, rollups.bucket_start('day', e.timestamp)) for e in events))
+        per_bucket = Counter(
+            (e.event_type, roles[e.user_id], rollups.bucket_start('hour', e.timestamp)) for e in events
+        )
+        for (event_type, role, bucket), count in per_bucket.items():
+            rollups.record(event_type, role, bucket, delta=count)
+    return len(events)
+
+
+def _write_isolating(pairs):
+    """Write ``(payload, event)`` pairs, halving the batch on data errors until the
+    events Postgres refuses are isolated. Returns ``(stored, rejected payloads)``.
+    """
+    try:
+        return _write([event for _, event in pairs]), []
+    except (DataError, IntegrityError) as e:
+        if len(pairs) == 1:
+            logger.error(f"Analytics event rejected by the database: {str(e)}")
+            return 0, [pairs[0][0]]
+    middle = len(pairs) // 2
+    stored, rejected = _write_isolating(pairs[:middle])
+    stored_rest, rejected_rest = _write_isolating(pairs[middle:])
+    return stored + stored_rest, rejected + rejected_rest
+
+
+def _requeue(redis, payloads):
+    """Put a failed batch back at the head of the buffer; events past the retry cap are dead-lettered."""
+    retry, dead = [], []
+    for payload in payloads:
+        data = json.loads(payload)
+        data['attempts'] = data.get('attempts', 0) + 1
+        if data['attempts'] >= settings.ANALYTICS_FLUSH_MAX_ATTEMPTS:
+            dead.append(payload)
+        else:
+            retry.append(json.dumps(data))
+    pipe = redis.pipeline(transaction=False)
+    if retry:
+        pipe.lpush(BUFFER_KEY, *reversed(retry))
+    _dead_letter(pipe, dead)
+    pipe.execute()
+    return len(retry)
+
+
+def _dead_letter(pipe, payloads):
+    if payloads:
+        pipe.rpush(DEAD_LETTER_KEY, *payloads)
+        pipe.ltrim(DEAD_LETTER_KEY, -settings.ANALYTICS_BUFFER_MAX_LENGTH, -1)
+        pipe.incrby(COUNTER_KEYS['invalid'], len(payloads))
+
+
+def flush(batch_size=None, max_batches=None):
+    """Move buffered events into Postgres in ``bulk_create`` batches; returns rows written.
+
+    Events Postgres refuses are split out of their batch and dead-lettered; other
+    failures requeue the batch, up to ``ANALYTICS_FLUSH_MAX_ATTEMPTS`` times.
+    """
+    batch_size = batch_size or settings.ANALYTICS_FLUSH_BATCH_SIZE
+    redis = _redis()
+    written = 0
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        payloads = _pop(redis, batch_size)
+        if not payloads:
+            break
+        batches += 1
+        pairs, invalid = _decode(payloads)
+        try:
+            stored, rejected = _write_isolating(pairs)
+        except Exception as e:
+            # Most likely Postgres is unreachable; retry the batch on the next run
+            requeued = _requeue(redis, [payload for payload, _ in pairs])
+            logger.error(f"Analytics flush failed, {requeued} of {len(pairs)} events requeued: {str(e)}")
+            raise
+        # Events for deleted users are skipped by _write and counted as invalid too
+        invalid += len(pairs) - stored - len(rejected)
+        pipe = redis.pipeline(transaction=False)
+        pipe.incrby(COUNTER_KEYS['flushed'], stored)
+        if invalid:
+            pipe.incrby(COUNTER_KEYS['invalid'], invalid)
+        _dead_letter(pipe, rejected)
+        pipe.execute()
+        written += stored
+    if written:
+        logger.info(f"Flushed {written} analytics events in {batches} batches")
+    return written
+
+
+def stats():
+    try:
+        redis = _redis()
+        pipe = redis.pipeline(transaction=False)
+        pipe.llen(BUFFER_KEY)
+        pipe.llen(DEAD_LETTER_KEY)
+        for key in COUNTER_KEYS.values():
+            pipe.get(key)
+        pending, dead_lettered, *counters = pipe.execute()
+    except Exception as e:
+        logger.error(f"Could not read analytics ingest stats: {str(e)}")
+        return {'redis_unavailable': True, 'local_dropped': _local_dropped}
+    data = {name: int(value or 0) for name, value in zip(COUNTER_KEYS, counters)}
+    return dict(data, pending=pending, dead_lettered=dead_lettered, local_dropped=_local_dropped, max_pending=settings.ANALYTICS_BUFFER_MAX_LENGTH)
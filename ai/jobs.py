@@ -0,0 +1,41 @@
+import logging
+import uuid
+
+from celery.result import AsyncResult
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+# Celery states that will not change again
+FINISHED_STATES = ('SUCCESS', 'FAILURE', 'REVOKED')
+
+
+def _key(job_id):
+    return f"ai_job:{job_id}"
+
+
+def submit_job(kind, params, user):
+    """Queue an inference job on the ``ai`` workers and return its id."""
+    from .tasks import run_ai_job
+
+    job_id = str(uuid.uuid4())
+    # Ownership is recorded before the task can finish so a fast result is never orphaned
+    cache.set(_key(job_id), {'kind': kind, 'user_id': user.id}, timeout=settings.AI_JOB_RESULT_TIMEOUT)
+    run_ai_job.apply_async(args=(kind, params, user.id), task_id=job_id, queue=settings.AI_CELERY_QUEUE)
+    logger.info(f"Queued {kind} job {job_id} for user {user.id}")
+    return job_id
+
+
+def get_job(job_id, user):
+    """Status of ``job_id`` as a dict, or ``None`` if it is unknown or belongs to someone else."""
+    meta = cache.get(_key(job_id))
+    if meta is None or meta['user_id'] != user.id:
+        return None
+    result = AsyncResult(job_id)
+    job = {'id': job_id, 'kind': meta['kind'], 'status': result.state.lower()}
+    if result.state == 'SUCCESS':
+        job['result'] = result.result
+    elif result.state in ('FAILURE', 'REVOKED'):
+        job['error'] = f"{meta['kind']} job failed"
+    return job
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from accounts.models import LearningResource
+from ai.embeddings import embed_resources
+
+
+class Command(BaseCommand):
+    help = "Compute and store sentence embeddings for learning resources that are missing or stale"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=256)
+        parser.add_argument('--force', action='store_true', help="Re-encode every resource")
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        queryset = LearningResource.objects.order_by('id').only('id', 'content')
+        total = 0
+        last_id = 0
+        while True:
+            chunk = list(queryset.filter(id__gt=last_id)[:batch_size])
+            if not chunk:
+                break
+            embed_resources(chunk, force=options['force'], batch_size=batch_size)
+            total += len(chunk)
+            last_id = chunk[-1].id
+            self.stdout.write(f"Processed {total} resources")
+        self.stdout.write(self.style.SUCCESS(f"Embeddings up to date for {total} resources"))
@@ -0,0 +1,88 @@
+import time
+
+import faiss
+import numpy as np
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from ai.search_index import forum_index, index_description, search_parameters
+
+
+class Command(BaseCommand):
+    help = "Measure recall@k and query latency of IVF-PQ and HNSW forum indexes against exact flat search"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--k', type=int, default=10)
+        parser.add_argument('--queries', type=int, default=200)
+        parser.add_argument('--synthetic', type=int, default=0,
+                            help="Extra random vectors (matched to the real mean/std) to simulate a larger forum")
+        parser.add_argument('--types', nargs='+', choices=['ivfpq', 'hnsw'], default=['ivfpq', 'hnsw'])
+        parser.add_argument('--nprobe', type=int, nargs='+', default=[1, 4, 16, 64])
+        parser.add_argument('--ef-search', type=int, nargs='+', default=[16, 64, 256])
+        parser.add_argument('--batch-size', type=int, default=256)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        rng = np.random.default_rng(options['seed'])
+        vectors = self.load_vectors(options['batch_size'])
+        if options['synthetic']:
+            noise = rng.normal(vectors.mean(axis=0), vectors.std(axis=0) + 1e-6,
+                               size=(options['synthetic'], vectors.shape[1]))
+            vectors = np.vstack([vectors, noise.astype(np.float32)])
+        if len(vectors) < 2:
+            raise CommandError("Need at least two forum posts (seed data or --synthetic) to benchmark")
+        dimensions = vectors.shape[1]
+        k = min(options['k'], len(vectors))
+
+        # Queries are perturbed copies of indexed vectors, like paraphrased searches
+        picks = rng.choice(len(vectors), size=min(options['queries'], len(vectors)), replace=False)
+        queries = vectors[picks] + rng.normal(0, vectors.std() * 0.1, size=(len(picks), dimensions)).astype(np.float32)
+
+        flat = faiss.IndexFlatL2(dimensions)
+        flat.add(vectors)
+        flat_latencies, truth = self.run_queries(flat, queries, k, None)
+        self.stdout.write(f"{len(vectors)} vectors, {len(queries)} queries, k={k}")
+        self.report('flat', '-', 1.0, flat_latencies, 0.0)
+
+        for index_type in options['types']:
+            n_train = min(len(vectors), settings.AI_INDEX_TRAIN_SAMPLE)
+            description = index_description(index_type, dimensions, n_train)
+            started = time.perf_counter()
+            index = faiss.index_factory(dimensions, description)
+            if not index.is_trained:
+                index.train(vectors[rng.choice(len(vectors), size=n_train, replace=False)])
+            index.add(vectors)
+            build_seconds = time.perf_counter() - started
+            values = options['ef_search'] if index_type == 'hnsw' else options['nprobe']
+            for value in values:
+                if index_type == 'hnsw':
+                    params = search_parameters(index, ef_search=value)
+                else:
+                    params = search_parameters(index, nprobe=value)
+                latencies, found = self.run_queries(index, queries, k, params)
+                recall = np.mean([len(set(a) & set(b)) / k for a, b in zip(found, truth)])
+                self.report(description, value, recall, latencies, build_seconds)
+
+    def load_vectors(self, batch_size):
+        texts = list(forum_index.get_queryset().values_list('content', flat=True))
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32)
+        return np.vstack([
+            forum_index.encode_texts(texts[start:start + batch_size]) for start in range(0, len(texts), batch_size)
+        ])
+
+    def run_queries(self, index, queries, k, params):
+        latencies, results = [], []
+        for query in queries:
+            started = time.perf_counter()
+            _, ids = index.search(query.reshape(1, -1), k, params=params)
+            latencies.append((time.perf_counter() - started) * 1000)
+            results.append(ids[0].tolist())
+        return np.array(latencies), results
+
+    def report(self, description, param, recall, latencies, build_seconds):
+        self.stdout.write(
+            f"{description:<16} param={param!s:<5} recall@k={recall:.3f} "
+            f"p50={np.percentile(latencies, 50):.3f}ms p99={np.percentile(latencies, 99):.3f}ms "
+            f"build={build_seconds:.2f}s"
+        )
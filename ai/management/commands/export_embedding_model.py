@@ -0,0 +1,17 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from ai.onnx_embedding import export_model
+
+
+class Command(BaseCommand):
+    help = "Export the sentence embedding model to ONNX (fp32 and dynamic int8) for AI_EMBEDDING_BACKEND=onnx/onnx-int8"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--model', default=settings.AI_EMBEDDING_MODEL)
+        parser.add_argument('--output', help="Directory to write to (default: AI_ONNX_DIR/<model>)")
+        parser.add_argument('--no-quantize', action='store_true', help="Skip the int8 copy")
+
+    def handle(self, *args, **options):
+        output_dir = export_model(options['model'], options['output'], quantize=not options['no_quantize'])
+        self.stdout.write(self.style.SUCCESS(f"Exported {options['model']} to {output_dir}"))
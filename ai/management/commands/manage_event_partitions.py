@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from ai import partitions
+
+
+class Command(BaseCommand):
+    help = "Create upcoming monthly AnalyticsEvent partitions and retire those past retention"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--ahead', type=int, help="Months of future partitions to keep created")
+        parser.add_argument('--retention-months', type=int, help="Retire partitions older than this (0 keeps everything)")
+        parser.add_argument('--detach', action='store_true', help="Detach old partitions for archiving instead of dropping them")
+
+    def handle(self, *args, **options):
+        result = partitions.maintain(
+            ahead=options['ahead'], retention_months=options['retention_months'], detach=options['detach'],
+        )
+        for month in result['created']:
+            self.stdout.write(self.style.SUCCESS(f"Created {partitions.partition_name(month)}"))
+        for month in result['removed']:
+            action = 'Detached' if options['detach'] else 'Dropped'
+            self.stdout.write(self.style.SUCCESS(f"{action} {partitions.partition_name(month)}"))
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from accounts.analytics import invalidate_summary
+from ai import rollups
+
+
+class Command(BaseCommand):
+    help = "Recount the hourly and daily AnalyticsEvent rollups from the events table"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, help="Only recount the last N days (default: all history)")
+
+    def handle(self, *args, **options):
+        start = timezone.now() - timezone.timedelta(days=options['days']) if options['days'] else None
+        for granularity in rollups.TRUNCATE:
+            total = rollups.rebuild(granularity, start=start)
+            self.stdout.write(self.style.SUCCESS(f"Rebuilt {total} {granularity} rollups"))
+        invalidate_summary()
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from ai import trends
+from ai.models import AnalyticsEvent
+
+
+class Command(BaseCommand):
+    help = "Recompute the running forecast sums from daily AnalyticsEvent counts (after bulk loads or imports)"
+
+    def handle(self, *args, **options):
+        for event_type, _ in AnalyticsEvent._meta.get_field('event_type').choices:
+            trend = trends.rebuild(event_type)
+            self.stdout.write(self.style.SUCCESS(f"{event_type}: {trend.total if trend else 0} events"))
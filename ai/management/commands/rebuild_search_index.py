@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from ai.search_index import INDEX_TYPES, indexes
+
+
+class Command(BaseCommand):
+    help = "Rebuild persisted FAISS search indexes from the database"
+
+    def add_arguments(self, parser):
+        parser.add_argument('names', nargs='*', help=f"Indexes to rebuild (default: all of {', '.join(indexes)})")
+        parser.add_argument('--batch-size', type=int, default=256)
+        parser.add_argument('--type', choices=INDEX_TYPES, help="Index type (default: AI_INDEX_TYPE)")
+
+    def handle(self, *args, **options):
+        names = options['names'] or list(indexes)
+        unknown = [name for name in names if name not in indexes]
+        if unknown:
+            raise CommandError(f"Unknown index: {', '.join(unknown)}")
+        for name in names:
+            total = indexes[name].build(batch_size=options['batch_size'], index_type=options['type'])
+            self.stdout.write(self.style.SUCCESS(f"Rebuilt {name} index with {total} vectors"))
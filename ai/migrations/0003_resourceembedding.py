@@ -0,0 +1,30 @@
+# Generated by Django 5.2.5 on 2026-10-18 10:32
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0004_alter_user_login_count_alter_user_resources_viewed'),
+        ('ai', '0002_analyticsevent'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResourceEmbedding',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model_name', models.CharField(max_length=100)),
+                ('content_hash', models.CharField(max_length=64)),
+                ('dimensions', models.PositiveIntegerField()),
+                ('vector', models.BinaryField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('resource', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='embeddings', to='accounts.learningresource')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('resource', 'model_name'), name='unique_resource_embedding_per_model')],
+            },
+        ),
+    ]
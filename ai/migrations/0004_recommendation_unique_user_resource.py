@@ -0,0 +1,36 @@
+# Generated by Django 5.2.5 on 2026-10-18 10:33
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Max
+
+
+def remove_duplicate_recommendations(apps, schema_editor):
+    # update_or_create had no constraint behind it; keep the newest row per pair
+    Recommendation = apps.get_model('ai', 'Recommendation')
+    duplicates = (
+        Recommendation.objects.values('user_id', 'resource_id')
+        .annotate(keep_id=Max('id'), rows=models.Count('id'))
+        .filter(rows__gt=1)
+    )
+    for duplicate in duplicates:
+        Recommendation.objects.filter(
+            user_id=duplicate['user_id'], resource_id=duplicate['resource_id']
+        ).exclude(id=duplicate['keep_id']).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0004_alter_user_login_count_alter_user_resources_viewed'),
+        ('ai', '0003_resourceembedding'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_recommendations, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='recommendation',
+            constraint=models.UniqueConstraint(fields=('user', 'resource'), name='unique_recommendation_per_user_resource'),
+        ),
+    ]
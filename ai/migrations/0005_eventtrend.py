@@ -0,0 +1,25 @@
+# Generated by Django 5.2.5 on 2026-10-18 10:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai', '0004_recommendation_unique_user_resource'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventTrend',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event_type', models.CharField(max_length=50, unique=True)),
+                ('first_day', models.DateField()),
+                ('last_day', models.DateField()),
+                ('total', models.BigIntegerField(default=0)),
+                ('day_total', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.5 on 2026-10-18 10:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai', '0005_eventtrend'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Forecast',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event_type', models.CharField(max_length=50)),
+                ('role', models.CharField(blank=True, max_length=20)),
+                ('granularity', models.CharField(choices=[('day', 'Day'), ('hour', 'Hour')], max_length=10)),
+                ('model_name', models.CharField(max_length=30)),
+                ('start', models.DateTimeField()),
+                ('values', models.JSONField(default=list)),
+                ('generated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('event_type', 'role', 'granularity', 'model_name'), name='unique_forecast_series')],
+            },
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.5 on 2026-10-18 10:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai', '0006_forecast'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('granularity', models.CharField(choices=[('day', 'Day'), ('hour', 'Hour')], max_length=10)),
+                ('bucket', models.DateTimeField()),
+                ('event_type', models.CharField(max_length=50)),
+                ('role', models.CharField(blank=True, max_length=20)),
+                ('count', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('granularity', 'bucket', 'event_type', 'role'), name='unique_event_rollup')],
+            },
+        ),
+    ]
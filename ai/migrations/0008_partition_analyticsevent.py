@@ -0,0 +1,121 @@
+from datetime import date, datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import migrations, models
+
+import django.db.models.deletion
+
+# Postgres needs the partition key in the primary key, so the table's key becomes
+# (id, timestamp). Django still addresses rows by id, which the sequence keeps unique.
+PARTITION_SQL = """
+ALTER TABLE ai_analyticsevent RENAME TO ai_analyticsevent_unpartitioned;
+ALTER TABLE ai_analyticsevent_unpartitioned ALTER COLUMN id DROP IDENTITY;
+
+CREATE SEQUENCE ai_analyticsevent_id_seq;
+CREATE TABLE ai_analyticsevent (
+    id bigint NOT NULL DEFAULT nextval('ai_analyticsevent_id_seq'),
+    event_type varchar(50) NOT NULL,
+    details jsonb NOT NULL,
+    "timestamp" timestamp with time zone NOT NULL,
+    user_id bigint NOT NULL
+        REFERENCES accounts_user (id) DEFERRABLE INITIALLY DEFERRED,
+    PRIMARY KEY (id, "timestamp")
+) PARTITION BY RANGE ("timestamp");
+ALTER SEQUENCE ai_analyticsevent_id_seq OWNED BY ai_analyticsevent.id;
+CREATE TABLE ai_analyticsevent_default PARTITION OF ai_analyticsevent DEFAULT;
+
+CREATE INDEX analyticsevent_ts_idx ON ai_analyticsevent ("timestamp");
+CREATE INDEX analyticsevent_type_ts_idx ON ai_analyticsevent (event_type, "timestamp");
+CREATE INDEX analyticsevent_user_ts_idx ON ai_analyticsevent (user_id, "timestamp");
+"""
+
+COPY_SQL = """
+INSERT INTO ai_analyticsevent (id, event_type, details, "timestamp", user_id)
+SELECT id, event_type, details, "timestamp", user_id FROM ai_analyticsevent_unpartitioned;
+SELECT setval('ai_analyticsevent_id_seq', COALESCE((SELECT MAX(id) FROM ai_analyticsevent), 0) + 1, false);
+DROP TABLE ai_analyticsevent_unpartitioned;
+"""
+
+UNPARTITION_SQL = """
+CREATE TABLE ai_analyticsevent_unpartitioned (
+    id bigint NOT NULL PRIMARY KEY GENERATED BY DEFAULT AS IDENTITY,
+    event_type varchar(50) NOT NULL,
+    details jsonb NOT NULL,
+    "timestamp" timestamp with time zone NOT NULL,
+    user_id bigint NOT NULL
+        REFERENCES accounts_user (id) DEFERRABLE INITIALLY DEFERRED
+);
+INSERT INTO ai_analyticsevent_unpartitioned (id, event_type, details, "timestamp", user_id)
+OVERRIDING SYSTEM VALUE SELECT id, event_type, details, "timestamp", user_id FROM ai_analyticsevent;
+SELECT setval(pg_get_serial_sequence('ai_analyticsevent_unpartitioned', 'id'), COALESCE((SELECT MAX(id) FROM ai_analyticsevent), 0) + 1, false);
+DROP TABLE ai_analyticsevent;
+ALTER TABLE ai_analyticsevent_unpartitioned RENAME TO ai_analyticsevent;
+CREATE INDEX ai_analyticsevent_user_id_6859f12a ON ai_analyticsevent (user_id);
+"""
+
+
+# Copies of ai.partitions as of this migration, so later changes there cannot alter it
+def add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _bound(month):
+    return datetime(month.year, month.month, 1, tzinfo=dt_timezone.utc)
+
+
+def ensure_partitions(cursor, first_month, last_month):
+    month = first_month
+    while month <= last_month:
+        name, start, end = f'ai_analyticsevent_p{month:%Y_%m}', _bound(month), _bound(add_months(month, 1))
+        cursor.execute(f'CREATE TABLE "{name}" PARTITION OF ai_analyticsevent FOR VALUES FROM (%s) TO (%s)', [start, end])
+        month = add_months(month, 1)
+
+
+def create_monthly_partitions(apps, schema_editor):
+    """One partition per month from the oldest existing event to the configured months ahead."""
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT date_trunc('month', MIN(\"timestamp\") AT TIME ZONE 'UTC'), "
+            "date_trunc('month', now() AT TIME ZONE 'UTC') FROM ai_analyticsevent_unpartitioned"
+        )
+        oldest, current = cursor.fetchone()
+        first = (oldest or current).date()
+        ensure_partitions(cursor, first, add_months(current.date(), settings.ANALYTICS_PARTITIONS_AHEAD))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai', '0007_eventrollup'),
+        ('accounts', '0005_search_gin_indexes'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunSQL(PARTITION_SQL, reverse_sql=migrations.RunSQL.noop),
+                migrations.RunPython(create_monthly_partitions, migrations.RunPython.noop),
+                migrations.RunSQL(COPY_SQL, reverse_sql=UNPARTITION_SQL),
+            ],
+            state_operations=[
+                migrations.AlterField(
+                    model_name='analyticsevent',
+                    name='user',
+                    field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='analytics_events', to=settings.AUTH_USER_MODEL),
+                ),
+                migrations.AddIndex(
+                    model_name='analyticsevent',
+                    index=models.Index(fields=['timestamp'], name='analyticsevent_ts_idx'),
+                ),
+                migrations.AddIndex(
+                    model_name='analyticsevent',
+                    index=models.Index(fields=['event_type', 'timestamp'], name='analyticsevent_type_ts_idx'),
+                ),
+                migrations.AddIndex(
+                    model_name='analyticsevent',
+                    index=models.Index(fields=['user', 'timestamp'], name='analyticsevent_user_ts_idx'),
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,85 @@
+import logging
+
+from django.conf import settings
+from django.db import migrations, models
+
+import ai.models
+import django.db.models.deletion
+
+logger = logging.getLogger(__name__)
+
+TO_CODE_SQL = """
+ALTER TABLE ai_analyticsevent ALTER COLUMN event_type TYPE smallint USING (
+    CASE event_type WHEN 'login' THEN 1 WHEN 'resource_view' THEN 2 WHEN 'forum_post' THEN 3 ELSE 4 END
+);
+ALTER TABLE ai_analyticsevent ALTER COLUMN user_id DROP NOT NULL;
+"""
+
+TO_NAME_SQL = """
+DELETE FROM ai_analyticsevent WHERE user_id IS NULL;
+ALTER TABLE ai_analyticsevent ALTER COLUMN user_id SET NOT NULL;
+ALTER TABLE ai_analyticsevent ALTER COLUMN event_type TYPE varchar(50) USING (
+    CASE event_type WHEN 1 THEN 'login' WHEN 2 THEN 'resource_view' WHEN 3 THEN 'forum_post' ELSE 'other' END
+);
+"""
+
+# Every accounts.AnalyticsEvent row is kept: events without a user stay anonymous, and
+# types without a code become 'other' with their name in details
+MERGE_SQL = """
+INSERT INTO ai_analyticsevent (event_type, details, "timestamp", user_id)
+SELECT CASE event_type WHEN 'login' THEN 1 WHEN 'resource_view' THEN 2 WHEN 'forum_post' THEN 3 ELSE 4 END,
+       CASE WHEN event_type IN ('login', 'resource_view', 'forum_post') THEN details
+            ELSE details || jsonb_build_object('legacy_event_type', event_type) END,
+       "timestamp", user_id
+FROM accounts_analyticsevent
+"""
+
+COUNT_SQL = """
+SELECT COUNT(*) FILTER (WHERE user_id IS NULL),
+       COUNT(*) FILTER (WHERE event_type NOT IN ('login', 'resource_view', 'forum_post'))
+FROM accounts_analyticsevent
+"""
+
+
+def merge_accounts_events(apps, schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(COUNT_SQL)
+        anonymous, other = cursor.fetchone()
+        cursor.execute(MERGE_SQL)
+        merged = cursor.rowcount
+    if merged:
+        logger.warning(
+            f"Merged {merged} accounts analytics events ({anonymous} without a user, {other} stored as 'other');"
+            " run rebuild_event_rollups and rebuild_event_trends to count them"
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai', '0008_partition_analyticsevent'),
+        ('accounts', '0005_search_gin_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='analyticsevent',
+            options={},
+        ),
+        migrations.SeparateDatabaseAndState(
+            database_operations=[migrations.RunSQL(TO_CODE_SQL, reverse_sql=TO_NAME_SQL)],
+            state_operations=[
+                migrations.AlterField(
+                    model_name='analyticsevent',
+                    name='event_type',
+                    field=ai.models.EventTypeField(choices=[('login', 'Login'), ('resource_view', 'Resource View'), ('forum_post', 'Forum Post'), ('other', 'Other')]),
+                ),
+                migrations.AlterField(
+                    model_name='analyticsevent',
+                    name='user',
+                    field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='analytics_events', to=settings.AUTH_USER_MODEL),
+                ),
+            ],
+        ),
+        migrations.RunPython(merge_accounts_events, migrations.RunPython.noop),
+    ]
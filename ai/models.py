@@ -1,6 +1,32 @@
 from django.db import models
 from accounts.models import User, LearningResource
 from django.utils import timezone
+from django.utils.functional import cached_property
+import numpy as np
+
+# Stored codes for AnalyticsEvent.event_type; never renumber, only append
+EVENT_TYPE_CODES = {
+    'login': 1,
+    'resource_view': 2,
+    'forum_post': 3,
+    # Types merged from accounts.AnalyticsEvent with no code of their own; the original
+    # name is kept in details['legacy_event_type']. Not ingested or forecast.
+    'other': 4,
+}
+EVENT_TYPE_NAMES = {code: name for name, code in EVENT_TYPE_CODES.items()}
+LEGACY_EVENT_TYPE = 'other'
+
+
+class RecommendationManager(models.Manager):
+    def upsert_scores(self, user_id, scores):
+        # One INSERT ... ON CONFLICT (user_id, resource_id) DO UPDATE for the whole batch
+        rows = [self.model(user_id=user_id, resource_id=resource_id, score=score) for resource_id, score in scores]
+        return self.bulk_create(
+            rows,
+            update_conflicts=True,
+            unique_fields=['user', 'resource'],
+            update_fields=['score'],
+        )
 
 
 class Recommendation(models.Model):
@@ -8,22 +34,130 @@ class Recommendation(models.Model):
     resource = models.ForeignKey(LearningResource, on_delete=models.CASCADE)
     score = models.FloatField()
 
+    objects = RecommendationManager()
+
     def __str__(self):
         return f"Recommendation for {self.user.email}: {self.resource.title}"
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'resource'], name='unique_recommendation_per_user_resource'),
+        ]
     
 
+class EventTypeField(models.SmallIntegerField):
+    """Event type stored as a smallint code but read, written and filtered by name."""
+
+    @cached_property
+    def validators(self):
+        # The integer range validators would compare against the name
+        return [*self.default_validators, *self._validators]
+
+    def from_db_value(self, value, expression, connection):
+        return EVENT_TYPE_NAMES.get(value, value)
+
+    def to_python(self, value):
+        return EVENT_TYPE_NAMES.get(value, value)
+
+    def get_prep_value(self, value):
+        if isinstance(value, str):
+            if value not in EVENT_TYPE_CODES:
+                raise ValueError(f"Unknown event type {value!r}")
+            value = EVENT_TYPE_CODES[value]
+        return super().get_prep_value(value)
+
+
 class AnalyticsEvent(models.Model):
-    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='analytics_events')
-    event_type = models.CharField(max_length=50, choices=[
+    # Indexed through (user, timestamp) below; only events merged from accounts lack a user
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='analytics_events', db_index=False, null=True, blank=True)
+    event_type = EventTypeField(choices=[
         ('login', 'Login'),
         ('resource_view', 'Resource View'),
         ('forum_post', 'Forum Post'),
+        ('other', 'Other'),
     ])
     details = models.JSONField(default=dict)
     timestamp = models.DateTimeField(default=timezone.now)
 
     def __str__(self):
-        return f"{self.event_type} by {self.user.email} at {self.timestamp}"
+        return f"{self.event_type} by {self.user.email if self.user else 'anonymous'} at {self.timestamp}"
+
+    class Meta:
+        # Partitioned by month on timestamp (migration 0008), see ai.partitions
+        indexes = [
+            models.Index(fields=['timestamp'], name='analyticsevent_ts_idx'),
+            models.Index(fields=['event_type', 'timestamp'], name='analyticsevent_type_ts_idx'),
+            models.Index(fields=['user', 'timestamp'], name='analyticsevent_user_ts_idx'),
+        ]
+
+class ResourceEmbedding(models.Model):
+    resource = models.ForeignKey(LearningResource, on_delete=models.CASCADE, related_name='embeddings')
+    model_name = models.CharField(max_length=100)
+    content_hash = models.CharField(max_length=64)
+    dimensions = models.PositiveIntegerField()
+    vector = models.BinaryField()  # float32, little-endian
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.model_name} embedding for {self.resource_id}"
+
+    def as_array(self):
+        return np.frombuffer(self.vector, dtype='<f4')
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['resource', 'model_name'], name='unique_resource_embedding_per_model'),
+        ]
+
+
+class EventTrend(models.Model):
+    """Running least-squares sums for one event type's daily counts.
+
+    Days are ``date.toordinal()`` values; every day from ``first_day`` to today is a
+    point, so days without events count as zeros without being stored.
+    """
+    event_type = models.CharField(max_length=50, unique=True)
+    first_day = models.DateField()
+    last_day = models.DateField()
+    total = models.BigIntegerField(default=0)  # sum of y
+    day_total = models.BigIntegerField(default=0)  # sum of x * y
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.event_type} trend since {self.first_day}"
+
+
+class Forecast(models.Model):
+    """Precomputed forecast for one series, refreshed by ``ai.tasks.refresh_forecasts``."""
+    event_type = models.CharField(max_length=50)
+    role = models.CharField(max_length=20, blank=True)  # '' = all roles
+    granularity = models.CharField(max_length=10, choices=[('day', 'Day'), ('hour', 'Hour')])
+    model_name = models.CharField(max_length=30)
+    start = models.DateTimeField()  # first forecast period
+    values = models.JSONField(default=list)
+    generated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.model_name} {self.granularity} forecast for {self.event_type}/{self.role or 'all'}"
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['event_type', 'role', 'granularity', 'model_name'], name='unique_forecast_series'),
+        ]
+
+
+class EventRollup(models.Model):
+    """Event counts per hour or day bucket, event type and user role."""
+    granularity = models.CharField(max_length=10, choices=[('day', 'Day'), ('hour', 'Hour')])
+    bucket = models.DateTimeField()  # start of the hour/day in the current time zone
+    event_type = models.CharField(max_length=50)
+    role = models.CharField(max_length=20, blank=True)
+    count = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.event_type}/{self.role} {self.granularity} {self.bucket}: {self.count}"
 
     class Meta:
-        ordering = ['-timestamp']
\ No newline at end of file
+        constraints = [
+            models.UniqueConstraint(fields=['granularity', 'bucket', 'event_type', 'role'], name='unique_event_rollup'),
+        ]
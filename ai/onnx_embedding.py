@@ -0,0 +1,127 @@
+import json
+import logging
+import os
+from pathlib import Path
+
+import numpy as np
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+MODEL_FILE = 'model.onnx'
+QUANTIZED_MODEL_FILE = 'model-int8.onnx'
+CONFIG_FILE = 'encoder.json'
+
+
+def export_dir(model_name=None):
+    model_name = model_name or settings.AI_EMBEDDING_MODEL
+    return Path(settings.AI_ONNX_DIR) / model_name.replace('/', '__')
+
+
+def mean_pool(token_embeddings, attention_mask, normalize=True):
+    """Sentence-transformers mean pooling over non-padding tokens."""
+    mask = attention_mask[..., None].astype(np.float32)
+    summed = (token_embeddings * mask).sum(axis=1)
+    vectors = summed / np.clip(mask.sum(axis=1), 1e-9, None)
+    if normalize:
+        vectors /= np.clip(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12, None)
+    return vectors.astype(np.float32)
+
+
+def export_model(model_name=None, output_dir=None, quantize=True):
+    """Export the sentence model's transformer to ONNX, plus an int8 copy.
+
+    Needs torch, sentence-transformers and onnxruntime; only run where the
+    model is exported, not on every web/worker node.
+    """
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    model_name = model_name or settings.AI_EMBEDDING_MODEL
+    output_dir = Path(output_dir or export_dir(model_name))
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    model = SentenceTransformer(model_name, device='cpu')
+    transformer = model[0]
+    tokenizer = transformer.tokenizer
+    sample = tokenizer(["export sample"], padding=True, return_tensors='pt')
+    input_names = [name for name in ('input_ids', 'attention_mask', 'token_type_ids') if name in sample]
+    dynamic_axes = {name: {0: 'batch', 1: 'sequence'} for name in input_names}
+    dynamic_axes['last_hidden_state'] = {0: 'batch', 1: 'sequence'}
+
+    auto_model = transformer.auto_model.eval()
+    with torch.no_grad():
+        torch.onnx.export(
+            auto_model,
+            tuple(sample[name] for name in input_names),
+            str(output_dir / MODEL_FILE),
+            input_names=input_names,
+            output_names=['last_hidden_state'],
+            dynamic_axes=dynamic_axes,
+            opset_version=14,
+        )
+    tokenizer.save_pretrained(str(output_dir))
+
+    if quantize:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+        # Dynamic quantization: int8 weights, activations quantized per batch at run time
+        quantize_dynamic(str(output_dir / MODEL_FILE), str(output_dir / QUANTIZED_MODEL_FILE), weight_type=QuantType.QInt8)
+
+    config = {
+        'model': model_name,
+        'max_seq_length': model.max_seq_length,
+        'dimensions': model.get_sentence_embedding_dimension(),
+        'normalize': any(type(module).__name__ == 'Normalize' for module in model),
+    }
+    (output_dir / CONFIG_FILE).write_text(json.dumps(config, indent=2))
+    logger.info(f"Exported {model_name} to {output_dir}")
+    return output_dir
+
+
+class OnnxSentenceEncoder:
+    """ONNX Runtime stand-in for ``SentenceTransformer`` as used by this app: ``encode`` only."""
+
+    def __init__(self, model_dir, quantized=True, threads=None):
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+
+        model_dir = Path(model_dir)
+        if not (model_dir / CONFIG_FILE).exists():
+            raise FileNotFoundError(f"No exported model in {model_dir}; run manage.py export_embedding_model")
+        self.config = json.loads((model_dir / CONFIG_FILE).read_text())
+        self.model_path = model_dir / (QUANTIZED_MODEL_FILE if quantized else MODEL_FILE)
+        self.tokenizer = AutoTokenizer.from_pretrained(str(model_dir))
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(str(self.model_path), options, providers=['CPUExecutionProvider'])
+        self.input_names = {node.name for node in self.session.get_inputs()}
+
+    @property
+    def nbytes(self):
+        return os.path.getsize(self.model_path)
+
+    def get_sentence_embedding_dimension(self):
+        return self.config['dimensions']
+
+    def encode(self, sentences, batch_size=32, **kwargs):
+        single = isinstance(sentences, str)
+        sentences = [sentences] if single else list(sentences)
+        if not sentences:
+            return np.empty((0, self.config['dimensions']), dtype=np.float32)
+        batches = []
+        for start in range(0, len(sentences), batch_size):
+            inputs = self.tokenizer(
+                sentences[start:start + batch_size],
+                padding=True,
+                truncation=True,
+                max_length=self.config['max_seq_length'],
+                return_tensors='np',
+            )
+            feed = {name: value.astype(np.int64) for name, value in inputs.items() if name in self.input_names}
+            token_embeddings = self.session.run(['last_hidden_state'], feed)[0]
+            batches.append(mean_pool(token_embeddings, inputs['attention_mask'], self.config['normalize']))
+        vectors = np.vstack(batches)
+        return vectors[0] if single else vectors
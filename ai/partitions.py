@@ -0,0 +1,118 @@
+import logging
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+# ai_analyticsevent is range-partitioned by month on "timestamp" (migration 0008).
+# Rows outside every monthly partition land in the default partition.
+TABLE = 'ai_analyticsevent'
+DEFAULT_PARTITION = f'{TABLE}_default'
+
+
+def add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month):
+    return f'{TABLE}_p{month:%Y_%m}'
+
+
+def _bound(month):
+    # Partition bounds are UTC month boundaries
+    return datetime(month.year, month.month, 1, tzinfo=dt_timezone.utc)
+
+
+def _current_month():
+    now = timezone.now().astimezone(dt_timezone.utc)
+    return date(now.year, now.month, 1)
+
+
+def retained_since():
+    """First local midnight from which every event is still in the table, or ``None``
+    when ``ANALYTICS_RETENTION_MONTHS`` keeps everything.
+
+    Partitions before it may have been dropped, so rebuilds take earlier days from
+    the daily rollups instead of recounting them as empty.
+    """
+    if not settings.ANALYTICS_RETENTION_MONTHS:
+        return None
+    cutoff = timezone.localtime(_bound(add_months(_current_month(), -settings.ANALYTICS_RETENTION_MONTHS)))
+    midnight = cutoff.replace(hour=0, minute=0, second=0, microsecond=0)
+    return midnight if midnight == cutoff else midnight + timedelta(days=1)
+
+
+def existing_partitions(cursor):
+    """Months with a partition attached, oldest first."""
+    cursor.execute(
+        """
+        SELECT child.relname FROM pg_inherits
+        JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+        JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+        WHERE parent.relname = %s
+        """,
+        [TABLE],
+    )
+    months = []
+    for (name,) in cursor.fetchall():
+        if name.startswith(f'{TABLE}_p'):
+            year, month = name[len(TABLE) + 2:].split('_')
+            months.append(date(int(year), int(month), 1))
+    return sorted(months)
+
+
+def create_partition(cursor, month):
+    """Attach the partition for ``month``, moving any rows the default partition holds for it."""
+    name, start, end = partition_name(month), _bound(month), _bound(add_months(month, 1))
+    cursor.execute(f'CREATE TABLE "{name}" (LIKE "{TABLE}" INCLUDING DEFAULTS INCLUDING CONSTRAINTS)')
+    cursor.execute(
+        f'WITH moved AS (DELETE FROM "{DEFAULT_PARTITION}" WHERE "timestamp" >= %s AND "timestamp" < %s RETURNING *) '
+        f'INSERT INTO "{name}" SELECT * FROM moved',
+        [start, end],
+    )
+    cursor.execute(f'ALTER TABLE "{TABLE}" ATTACH PARTITION "{name}" FOR VALUES FROM (%s) TO (%s)', [start, end])
+    logger.info(f"Created analytics event partition {name}")
+
+
+def ensure_partitions(cursor, first_month, last_month):
+    existing = set(existing_partitions(cursor))
+    created = []
+    month = first_month
+    while month <= last_month:
+        if month not in existing:
+            create_partition(cursor, month)
+            created.append(month)
+        month = add_months(month, 1)
+    return created
+
+
+def maintain(ahead=None, retention_months=None, detach=False):
+    """Create the next ``ahead`` months of partitions and retire those past retention.
+
+    Retired partitions are dropped, or with ``detach`` left as standalone tables
+    for archiving (e.g. ``pg_dump -t``) and removal by hand.
+    """
+    ahead = settings.ANALYTICS_PARTITIONS_AHEAD if ahead is None else ahead
+    retention_months = settings.ANALYTICS_RETENTION_MONTHS if retention_months is None else retention_months
+    current = _current_month()
+    removed = []
+    with transaction.atomic(), connection.cursor() as cursor:
+        created = ensure_partitions(cursor, current, add_months(current, ahead))
+        if retention_months:
+            cutoff = add_months(current, -retention_months)
+            for month in existing_partitions(cursor):
+                if month >= cutoff:
+                    break
+                name = partition_name(month)
+                if detach:
+                    cursor.execute(f'ALTER TABLE "{TABLE}" DETACH PARTITION "{name}"')
+                else:
+                    cursor.execute(f'DROP TABLE "{name}"')
+                removed.append(month)
+                logger.info(f"{'Detached' if detach else 'Dropped'} analytics event partition {name}")
+            cursor.execute(f'DELETE FROM "{DEFAULT_PARTITION}" WHERE "timestamp" < %s', [_bound(cutoff)])
+    return {'created': created, 'removed': removed}
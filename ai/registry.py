@@ -0,0 +1,133 @@
+import logging
+import threading
+import time
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+TEXT_GENERATION = 'text-generation'
+SENTENCE_EMBEDDING = 'sentence-embedding'
+
+
+def _load_text_generator():
+    from transformers import pipeline
+    generator = pipeline("text-generation", model=settings.AI_TEXT_GENERATION_MODEL)
+    # GPT-2 has no pad token; left-pad with EOS so prompts can be batched
+    generator.tokenizer.pad_token = generator.tokenizer.eos_token
+    generator.tokenizer.padding_side = 'left'
+    return generator
+
+
+def embedding_version():
+    """Names the vectors the configured model and backend produce.
+
+    Stored embeddings, cached vectors and FAISS indexes are keyed by it, so switching
+    backends re-embeds instead of mixing torch and int8 vectors. Torch keeps the bare
+    model name so existing rows stay valid.
+    """
+    model_name = settings.AI_EMBEDDING_MODEL
+    backend = settings.AI_EMBEDDING_BACKEND
+    return model_name if backend == 'torch' else f"{model_name}:{backend}"
+
+
+def _load_sentence_model():
+    backend = settings.AI_EMBEDDING_BACKEND
+    if backend in ('onnx', 'onnx-int8'):
+        from .onnx_embedding import OnnxSentenceEncoder, export_dir
+        return OnnxSentenceEncoder(
+            export_dir(), quantized=backend == 'onnx-int8', threads=settings.AI_ONNX_THREADS
+        )
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(settings.AI_EMBEDDING_MODEL)
+
+
+def _model_nbytes(obj):
+    if hasattr(obj, 'nbytes'):
+        return obj.nbytes
+    # Pipelines wrap the torch module, SentenceTransformer is one
+    module = getattr(obj, 'model', obj)
+    try:
+        tensors = list(module.parameters()) + list(module.buffers())
+    except AttributeError:
+        return None
+    return sum(t.numel() * t.element_size() for t in tensors)
+
+
+class ModelRegistry:
+    """Lazily loads each model once per process and hands out the shared instance."""
+
+    def __init__(self):
+        self._loaders = {}
+        self._models = {}
+        self._stats = {}
+        self._locks = {}
+        self._lock = threading.Lock()
+
+    def register(self, name, loader):
+        with self._lock:
+            self._loaders[name] = loader
+            self._locks.setdefault(name, threading.Lock())
+
+    def get(self, name):
+        model = self._models.get(name)
+        if model is not None:
+            return model
+        if name not in self._loaders:
+            raise KeyError(f"Unknown model: {name}")
+        # Only one thread loads a given model; the others wait for it
+        with self._locks[name]:
+            model = self._models.get(name)
+            if model is None:
+                started = time.perf_counter()
+                model = self._loaders[name]()
+                self._stats[name] = {
+                    'load_seconds': round(time.perf_counter() - started, 3),
+                    'bytes': _model_nbytes(model),
+                    'loaded_at': time.time(),
+                }
+                self._models[name] = model
+                logger.info(f"Loaded model {name} in {self._stats[name]['load_seconds']}s")
+        return model
+
+    def is_loaded(self, name):
+        return name in self._models
+
+    def preload(self, names=None):
+        for name in names if names is not None else list(self._loaders):
+            try:
+                self.get(name)
+            except Exception as e:
+                logger.error(f"Preloading model {name} failed: {str(e)}")
+
+    def unload(self, name):
+        with self._locks.get(name, self._lock):
+            self._models.pop(name, None)
+            self._stats.pop(name, None)
+
+    def memory_usage(self):
+        return {name: stats['bytes'] for name, stats in self._stats.items()}
+
+    def stats(self):
+        return {
+            'models': {name: dict(stats) for name, stats in self._stats.items()},
+            'total_bytes': sum(b for b in self.memory_usage().values() if b),
+        }
+
+
+registry = ModelRegistry()
+registry.register(TEXT_GENERATION, _load_text_generator)
+registry.register(SENTENCE_EMBEDDING, _load_sentence_model)
+
+
+def get_text_generator():
+    return registry.get(TEXT_GENERATION)
+
+
+def get_sentence_model():
+    return registry.get(SENTENCE_EMBEDDING)
+
+
+def preload_configured_models():
+    if settings.AI_PRELOAD_MODELS:
+        registry.preload(settings.AI_PRELOAD_MODELS)
@@ -0,0 +1,107 @@
+import logging
+
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDay, TruncHour
+from django.utils import timezone
+
+from . import partitions
+from .models import AnalyticsEvent, EventRollup
+
+logger = logging.getLogger(__name__)
+
+TRUNCATE = {'hour': TruncHour, 'day': TruncDay}
+
+
+def bucket_start(granularity, timestamp):
+    local = timezone.localtime(timestamp)
+    if granularity == 'hour':
+        return local.replace(minute=0, second=0, microsecond=0)
+    return local.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def _increment(granularity, bucket, event_type, role, delta):
+    rows = EventRollup.objects.filter(granularity=granularity, bucket=bucket, event_type=event_type, role=role)
+    if rows.update(count=F('count') + delta) or delta < 0:
+        return
+    try:
+        with transaction.atomic():
+            EventRollup.objects.create(granularity=granularity, bucket=bucket, event_type=event_type, role=role, count=delta)
+    except IntegrityError:
+        # Another request created the bucket first
+        rows.update(count=F('count') + delta)
+
+
+def record(event_type, role, timestamp, delta=1):
+    """Count one ingested (or with ``delta=-1`` deleted) event in its hour and day buckets."""
+    for granularity in TRUNCATE:
+        _increment(granularity, bucket_start(granularity, timestamp), event_type, role or '', delta)
+
+
+def subtract(events, role):
+    """Remove a queryset of one role's events with one UPDATE per bucket."""
+    for granularity, truncate in TRUNCATE.items():
+        rows = (
+            events.annotate(bucket=truncate('timestamp'))
+            .values('event_type', 'bucket')
+            .annotate(count=Count('id'))
+            .order_by()
+        )
+        for row in rows:
+            _increment(granularity, row['bucket'], row['event_type'], role or '', -row['count'])
+
+
+def rebuild(granularity, start=None, end=None):
+    """Recount the closed buckets in ``[start, end)`` from the events table; idempotent.
+
+    The open bucket is left to the live increments, and the table is locked while
+    recounting so a late flush into a closed bucket waits rather than being deleted.
+    Never reaches back past the retention window, whose buckets may count events
+    in partitions that are already dropped.
+    """
+    since = partitions.retained_since()
+    if since is not None and (start is None or start < since):
+        start = since
+    current = bucket_start(granularity, timezone.now())
+    end = current if end is None else min(bucket_start(granularity, end), current)
+    events = AnalyticsEvent.objects.filter(timestamp__lt=end)
+    rollups = EventRollup.objects.filter(granularity=granularity, bucket__lt=end)
+    if start is not None:
+        start = bucket_start(granularity, start)
+        events, rollups = events.filter(timestamp__gte=start), rollups.filter(bucket__gte=start)
+    rows = (
+        events.annotate(bucket=TRUNCATE[granularity]('timestamp'))
+        .values('bucket', 'event_type', 'user__role')
+        .annotate(count=Count('id'))
+        .order_by()
+    )
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            # Blocks _increment's UPDATE/INSERT until the recount commits
+            cursor.execute(f'LOCK TABLE "{EventRollup._meta.db_table}" IN SHARE ROW EXCLUSIVE MODE')
+        rollups.delete()
+        created = EventRollup.objects.bulk_create([
+            EventRollup(
+                granularity=granularity, bucket=row['bucket'], event_type=row['event_type'],
+                role=row['user__role'] or '', count=row['count'],
+            )
+            for row in rows
+        ], batch_size=1000)
+    logger.info(f"Rebuilt {len(created)} {granularity} rollups")
+    return len(created)
+
+
+def summarize(start=None, end=None, granularity='day'):
+    """Counts per event type and per role over ``[start, end)`` read from the rollups."""
+    rollups = EventRollup.objects.filter(granularity=granularity)
+    if start is not None:
+        rollups = rollups.filter(bucket__gte=start)
+    if end is not None:
+        rollups = rollups.filter(bucket__lt=end)
+    by_type = list(rollups.values('event_type').annotate(count=Sum('count')).order_by('event_type'))
+    by_role = list(rollups.values('role').annotate(count=Sum('count')).order_by('role'))
+    return {
+        'event_count': sum(row['count'] for row in by_type),
+        'event_types': by_type,
+        'roles': by_role,
+    }
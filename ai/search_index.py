@@ -0,0 +1,274 @@
+import fcntl
+import logging
+import os
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+import faiss
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+
+from accounts.models import ForumPost, JobListing
+from .registry import get_sentence_model
+
+logger = logging.getLogger(__name__)
+
+INDEX_TYPES = ['flat', 'ivfpq', 'hnsw']
+PQ_MIN_TRAINING_POINTS = 256  # one per centroid of an 8-bit PQ codebook
+# Seconds before a missing index may be queued for building again
+BUILD_REQUEST_TIMEOUT = 600
+
+
+def index_description(index_type, dimensions, n_train=0):
+    """FAISS factory string for ``index_type``; IVF-PQ degrades to Flat without enough training data."""
+    if index_type == 'hnsw':
+        return f"HNSW{settings.AI_INDEX_HNSW_M}"
+    if index_type == 'ivfpq':
+        if n_train < PQ_MIN_TRAINING_POINTS:
+            logger.warning(f"Only {n_train} training vectors for IVF-PQ, falling back to a flat index")
+            return 'Flat'
+        # ~39 points per centroid is the minimum FAISS k-means is happy with
+        nlist = max(1, min(settings.AI_INDEX_IVF_NLIST, n_train // 39))
+        pq_m = max(m for m in range(1, settings.AI_INDEX_PQ_M + 1) if dimensions % m == 0)
+        return f"IVF{nlist},PQ{pq_m}"
+    return 'Flat'
+
+
+def search_parameters(index, nprobe=None, ef_search=None):
+    inner = faiss.downcast_index(index.index) if isinstance(index, faiss.IndexIDMap2) else index
+    if isinstance(inner, faiss.IndexIVF):
+        return faiss.SearchParametersIVF(nprobe=nprobe or settings.AI_INDEX_NPROBE)
+    if isinstance(inner, faiss.IndexHNSW):
+        return faiss.SearchParametersHNSW(efSearch=ef_search or settings.AI_INDEX_EF_SEARCH)
+    return None
+
+
+class VectorIndex:
+    """FAISS index over one model's rows, persisted to disk and keyed by primary key.
+
+    Web workers memory-map the saved file read-only and pick up new versions by
+    inode/mtime; writes (Celery tasks, the rebuild command) load a private copy, apply
+    the change under a file lock and atomically replace the file. Row changes are
+    appended to a pending file and merged in one rewrite by ``merge_search_indexes``.
+    """
+
+    def __init__(self, name, get_queryset, get_text):
+        self.name = name
+        self.get_queryset = get_queryset
+        self.get_text = get_text
+        self._index = None
+        self._version = None
+        self._lock = threading.Lock()
+
+    @property
+    def path(self):
+        # Vectors from different embedding backends are not comparable, so each gets its own file
+        backend = settings.AI_EMBEDDING_BACKEND
+        name = self.name if backend == 'torch' else f"{self.name}-{backend}"
+        return Path(settings.AI_INDEX_DIR) / f"{name}.faiss"
+
+    @property
+    def pending_path(self):
+        return self.path.with_suffix('.pending')
+
+    @contextmanager
+    def _write_lock(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path.with_suffix('.lock'), 'w') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _encode(self, objects):
+        return self.encode_texts([self.get_text(obj) for obj in objects])
+
+    def encode_texts(self, texts):
+        return np.ascontiguousarray(get_sentence_model().encode(texts), dtype=np.float32)
+
+    def _new_index(self, dimensions, index_type, queryset, batch_size):
+        training = None
+        if index_type == 'ivfpq':
+            sample = list(queryset.order_by('?')[:settings.AI_INDEX_TRAIN_SAMPLE])
+            training = np.vstack([
+                self._encode(sample[start:start + batch_size]) for start in range(0, len(sample), batch_size)
+            ])
+        description = index_description(index_type, dimensions, 0 if training is None else len(training))
+        index = faiss.index_factory(dimensions, f"IDMap2,{description}")
+        if not index.is_trained:
+            index.train(training)
+        logger.info(f"Created {self.name} index {description}")
+        return index
+
+    def _save(self, index):
+        tmp_path = self.path.with_suffix('.faiss.tmp')
+        faiss.write_index(index, str(tmp_path))
+        os.replace(tmp_path, self.path)
+
+    def build(self, batch_size=256, index_type=None):
+        index_type = index_type or settings.AI_INDEX_TYPE
+        with self._write_lock():
+            queryset = self.get_queryset().order_by('pk')
+            index = None
+            last_pk = 0
+            while True:
+                chunk = list(queryset.filter(pk__gt=last_pk)[:batch_size])
+                if not chunk:
+                    break
+                vectors = self._encode(chunk)
+                if index is None:
+                    index = self._new_index(vectors.shape[1], index_type, queryset, batch_size)
+                index.add_with_ids(vectors, np.array([obj.pk for obj in chunk], dtype=np.int64))
+                last_pk = chunk[-1].pk
+            if index is None:
+                # Saved empty so readers stop asking for a build; the first merge rebuilds it
+                logger.warning(f"No rows available for the {self.name} index")
+                index = faiss.index_factory(self.encode_texts(['']).shape[1], 'IDMap2,Flat')
+            self._save(index)
+            logger.info(f"Built {self.name} index with {index.ntotal} vectors")
+            return index.ntotal
+
+    def _apply(self, objects, removed_ids):
+        """Replace ``objects`` and drop ``removed_ids`` with one read and one save of the file."""
+        ids = np.array([obj.pk for obj in objects], dtype=np.int64)
+        vectors = self._encode(objects) if objects else None
+        with self._write_lock():
+            index = faiss.read_index(str(self.path))
+            self._remove_ids(index, np.concatenate([ids, np.array(removed_ids, dtype=np.int64)]))
+            if objects:
+                index.add_with_ids(vectors, ids)
+            self._save(index)
+
+    def _is_empty(self):
+        return faiss.read_index(str(self.path), faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY).ntotal == 0
+
+    def upsert(self, objects):
+        objects = list(objects)
+        if not objects:
+            return
+        if not self.path.exists() or self._is_empty():
+            # IVF indexes need training data, so the first write is a full build
+            self.build()
+            return
+        self._apply(objects, [])
+
+    def remove(self, ids):
+        if self.path.exists():
+            self._apply([], ids)
+
+    def mark_changed(self, pks):
+        """Queue rows for the next ``merge``; cheap enough for every save or delete."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.pending_path, 'a') as pending:
+            fcntl.flock(pending, fcntl.LOCK_EX)
+            pending.write(''.join(f"{pk}\n" for pk in pks))
+
+    def _take_pending(self):
+        try:
+            pending = open(self.pending_path, 'r+')
+        except FileNotFoundError:
+            return []
+        with pending:
+            fcntl.flock(pending, fcntl.LOCK_EX)
+            pks = {int(pk) for pk in pending.read().split()}
+            pending.truncate(0)
+        return sorted(pks)
+
+    def merge(self):
+        """Apply the queued row changes in one rewrite of the index; returns how many rows changed."""
+        pks = self._take_pending()
+        if not pks:
+            return 0
+        try:
+            if not self.path.exists() or self._is_empty():
+                self.build()
+            else:
+                # Rows missing from the queryset were deleted (or deactivated)
+                objects = list(self.get_queryset().filter(pk__in=pks))
+                found = {obj.pk for obj in objects}
+                self._apply(objects, [pk for pk in pks if pk not in found])
+        except Exception:
+            self.mark_changed(pks)
+            raise
+        logger.info(f"Merged {len(pks)} changes into the {self.name} index")
+        return len(pks)
+
+    def _request_build(self):
+        # Building reads every row through the model, so it runs on a worker instead of
+        # inside this request; searches find nothing until the file appears
+        key = f"search_index:build:{self.path.name}"
+        if not cache.add(key, True, timeout=BUILD_REQUEST_TIMEOUT):
+            return
+        from .tasks import build_search_index
+        try:
+            build_search_index.delay(self.name)
+            logger.info(f"Queued a build of the missing {self.name} index")
+        except Exception as e:
+            cache.delete(key)
+            logger.error(f"Could not queue a build of the {self.name} index: {str(e)}")
+
+    def _remove_ids(self, index, ids):
+        try:
+            index.remove_ids(ids)
+        except RuntimeError:
+            # HNSW cannot delete; stale vectors are dropped when hits are hydrated
+            # from the database, and disappear on the next rebuild
+            logger.info(f"{self.name} index does not support removal, keeping {len(ids)} stale vectors")
+
+    def _reader(self):
+        try:
+            stat = self.path.stat()
+        except FileNotFoundError:
+            self._request_build()
+            return None
+        # Saves replace the file, so a new inode or mtime means a new version
+        version = (stat.st_ino, stat.st_mtime_ns)
+        if self._index is None or version != self._version:
+            with self._lock:
+                if self._index is None or version != self._version:
+                    self._index = faiss.read_index(str(self.path), faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY)
+                    self._version = version
+                    logger.info(f"Loaded {self.name} index with {self._index.ntotal} vectors")
+        return self._index
+
+    @property
+    def ntotal(self):
+        index = self._reader()
+        return index.ntotal if index is not None else 0
+
+    def search(self, query_vectors, k, nprobe=None, ef_search=None):
+        """Returns ``(distances, ids)`` for the first query, best first, without
+        the -1 padding FAISS uses for misses or repeated ids left by HNSW upserts.
+        """
+        index = self._reader()
+        if index is None or index.ntotal == 0:
+            return [], []
+        distances, ids = index.search(
+            np.ascontiguousarray(query_vectors, dtype=np.float32),
+            min(k, index.ntotal),
+            params=search_parameters(index, nprobe, ef_search),
+        )
+        hits = {}
+        for distance, pk in zip(distances[0].tolist(), ids[0].tolist()):
+            if pk != -1 and pk not in hits:
+                hits[pk] = distance
+        return list(hits.values()), list(hits)
+
+
+forum_index = VectorIndex(
+    'forum_posts',
+    get_queryset=lambda: ForumPost.objects.only('id', 'content'),
+    get_text=lambda post: post.content,
+)
+
+job_index = VectorIndex(
+    'job_listings',
+    # Deactivated listings drop out of the queryset, so their update removes them
+    get_queryset=lambda: JobListing.objects.filter(is_active=True).only('id', 'title', 'description'),
+    get_text=lambda job: f"{job.title}. {job.description}",
+)
+
+indexes = {index.name: index for index in [forum_index, job_index]}
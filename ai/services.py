@@ -0,0 +1,98 @@
+import logging
+
+from django.conf import settings
+
+from accounts.models import ForumPost, LearningResource
+from . import advice_cache
+from .batching import career_coach_queue
+from .embedding_cache import encode_cached
+from .embeddings import resource_matrix, top_k
+from .models import Recommendation
+from .search_index import forum_index
+
+logger = logging.getLogger(__name__)
+
+# Shared by the request/response views and the Celery job tasks in ai.tasks
+
+
+def career_coach_prompt(query):
+    # Use a prompt to guide the model
+    return f"Provide a structured response to the following query about a career path: {query}"
+
+
+def career_advice(query, bypass_cache=False):
+    if bypass_cache:
+        advice_cache.mark_bypassed()
+    else:
+        cached = advice_cache.get_advice(query)
+        if cached is not None:
+            return {"advice": cached, "cached": True}
+
+    # Concurrent requests are coalesced into one padded batch
+    advice = career_coach_queue.submit(career_coach_prompt(query), timeout=settings.AI_BATCH_TIMEOUT)
+    advice_cache.store_advice(query, advice)
+    return {"advice": advice, "cached": False}
+
+
+def recommend_resources(user, limit, offset=0, resource_type=None):
+    # Only resources with a stored vector are ranked; the embedding task and the
+    # backfill_resource_embeddings command keep them current
+    cached = resource_matrix()
+    ids, matrix = cached['ids'], cached['matrix']
+    if resource_type:
+        mask = cached['types'] == resource_type
+        ids, matrix = ids[mask], matrix[mask]
+
+    user_skills = " ".join(user.skills) if user.skills else ""
+    # Unchanged skills hit the embedding cache and skip the transformer
+    user_embedding = encode_cached([user_skills])[0]
+    # One matrix-vector product scores every resource; only the requested page is sorted
+    order, similarities = top_k(user_embedding, matrix, offset + limit)
+    page = order[offset:]
+    resources = LearningResource.objects.only('id', 'title', 'type').in_bulk(ids[page].tolist())
+    scores = []
+    for i in page:
+        resource = resources.get(int(ids[i]))
+        if resource is None:
+            continue
+        scores.append({"id": resource.id, "resource": resource.title, "type": resource.type, "score": float(similarities[i])})
+    store_scores(user, [[item["id"], item["score"]] for item in scores])
+    return scores
+
+
+def store_scores(user, scores):
+    if not scores:
+        return
+    if settings.AI_RECOMMENDATIONS_ASYNC_WRITE:
+        from .tasks import store_recommendations
+        try:
+            store_recommendations.delay(user.id, scores)
+            return
+        except Exception as e:
+            logger.error(f"Could not queue recommendation write for user {user.id}: {str(e)}")
+    Recommendation.objects.upsert_scores(user.id, scores)
+
+
+def search_forum(query, k, page=1, nprobe=None, ef_search=None):
+    """Top forum posts for ``query``, or ``None`` when there is nothing indexed."""
+    # Persisted index, memory-mapped and kept current by post_save/post_delete signals
+    if forum_index.ntotal == 0:
+        return None
+
+    query_embedding = encode_cached([query])
+    logger.info(f"Encoded query: {query}")
+    distances, post_ids = forum_index.search(query_embedding, k=k * page, nprobe=nprobe, ef_search=ef_search)
+    distances, post_ids = distances[k * (page - 1):], post_ids[k * (page - 1):]
+    # The index only holds ids; rows are read fresh so edits show up immediately
+    posts = ForumPost.objects.only('id', 'title', 'content', 'created_at').in_bulk(post_ids)
+    return [
+        {
+            "id": post_id,
+            "title": posts[post_id].title,
+            "content": posts[post_id].content,
+            "created_at": posts[post_id].created_at.isoformat(),
+            "distance": float(distance)
+        }
+        for post_id, distance in zip(post_ids, distances)
+        if post_id in posts
+    ]
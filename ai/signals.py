@@ -0,0 +1,116 @@
+import logging
+
+from django.db import transaction
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from accounts.models import ForumPost, JobListing, LearningResource, User
+from . import rollups, trends
+from .models import AnalyticsEvent
+
+logger = logging.getLogger(__name__)
+
+
+@receiver(post_save, sender=LearningResource)
+def queue_resource_embedding(sender, instance, **kwargs):
+    from .tasks import embed_learning_resource
+
+    def enqueue():
+        try:
+            embed_learning_resource.delay(instance.pk)
+        except Exception as e:
+            # The backfill_resource_embeddings command embeds anything missed here
+            logger.error(f"Could not queue embedding for resource {instance.pk}: {str(e)}")
+
+    transaction.on_commit(enqueue)
+
+
+def _enqueue_index_change(task, index_name, pk):
+    def enqueue():
+        try:
+            task.delay(index_name, pk)
+        except Exception as e:
+            logger.error(f"Could not queue {index_name} index update for {pk}, applying inline: {str(e)}")
+            try:
+                task(index_name, pk)
+            except Exception as inline_e:
+                logger.error(f"Inline {index_name} index update for {pk} failed: {str(inline_e)}")
+
+    transaction.on_commit(enqueue)
+
+
+@receiver(post_save, sender=ForumPost)
+def index_forum_post(sender, instance, **kwargs):
+    from .tasks import update_search_index
+    _enqueue_index_change(update_search_index, 'forum_posts', instance.pk)
+
+
+@receiver(post_delete, sender=ForumPost)
+def unindex_forum_post(sender, instance, **kwargs):
+    from .tasks import remove_from_search_index
+    _enqueue_index_change(remove_from_search_index, 'forum_posts', instance.pk)
+
+
+@receiver(post_save, sender=JobListing)
+def index_job_listing(sender, instance, **kwargs):
+    from .tasks import update_search_index
+    _enqueue_index_change(update_search_index, 'job_listings', instance.pk)
+
+
+@receiver(post_delete, sender=JobListing)
+def unindex_job_listing(sender, instance, **kwargs):
+    from .tasks import remove_from_search_index
+    _enqueue_index_change(remove_from_search_index, 'job_listings', instance.pk)
+
+
+def _role(event):
+    # Events merged from accounts may have no user
+    return event.user.role if event.user_id else None
+
+
+@receiver(pre_save, sender=AnalyticsEvent)
+def remember_counted_event(sender, instance, **kwargs):
+    # Edits move the event between trends and rollup buckets, so keep what was counted
+    if not instance._state.adding:
+        instance._counted = (
+            AnalyticsEvent.objects.filter(pk=instance.pk)
+            .values_list('event_type', 'timestamp', 'user__role')
+            .first()
+        )
+
+
+@receiver(post_save, sender=AnalyticsEvent)
+def count_analytics_event(sender, instance, created, **kwargs):
+    counted = None if created else getattr(instance, '_counted', None)
+    current = (instance.event_type, instance.timestamp, _role(instance))
+    if counted == current:
+        return
+    if counted is not None:
+        event_type, timestamp, role = counted
+        trends.record(event_type, timestamp, delta=-1)
+        rollups.record(event_type, role, timestamp, delta=-1)
+    trends.record(instance.event_type, instance.timestamp)
+    rollups.record(instance.event_type, _role(instance), instance.timestamp)
+
+
+def _deleting_users(origin):
+    return isinstance(origin, User) or (isinstance(origin, QuerySet) and origin.model is User)
+
+
+@receiver(post_delete, sender=AnalyticsEvent)
+def uncount_analytics_event(sender, instance, origin=None, **kwargs):
+    if _deleting_users(origin):
+        # Already subtracted in bulk by uncount_user_events
+        return
+    trends.record(instance.event_type, instance.timestamp, delta=-1)
+    rollups.record(instance.event_type, _role(instance), instance.timestamp, delta=-1)
+
+
+@receiver(pre_delete, sender=User)
+def uncount_user_events(sender, instance, origin=None, **kwargs):
+    # The cascade would otherwise cost a role lookup and three UPDATEs per event
+    if _deleting_users(origin):
+        events = AnalyticsEvent.objects.filter(user=instance)
+        trends.subtract(events)
+        rollups.subtract(events, instance.role)
@@ -0,0 +1,172 @@
+import json
+import logging
+import threading
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from .registry import get_text_generator
+
+logger = logging.getLogger(__name__)
+
+
+class StreamsFull(Exception):
+    pass
+
+
+class StreamMetrics:
+    """Counts one kind of stream and caps how many run at once per process.
+
+    ``max_setting`` names the setting holding the cap (0 for none); streams beyond it
+    are rejected so the view can answer 503 instead of holding another connection.
+    """
+
+    def __init__(self, max_setting):
+        self.max_setting = max_setting
+        self._lock = threading.Lock()
+        self.active = 0
+        self.completed = 0
+        self.cancelled = 0
+        self.failed = 0
+        self.rejected = 0
+
+    def change(self, **deltas):
+        with self._lock:
+            for name, delta in deltas.items():
+                setattr(self, name, getattr(self, name) + delta)
+
+    def open(self, events):
+        """Wrap the ``events`` async generator in a slot, or raise ``StreamsFull``."""
+        max_active = getattr(settings, self.max_setting)
+        with self._lock:
+            if max_active and self.active >= max_active:
+                self.rejected += 1
+                raise StreamsFull(f"{self.active} streams already open")
+            self.active += 1
+        return LimitedStream(events, lambda: self.change(active=-1))
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'max_active': getattr(settings, self.max_setting),
+                'active': self.active,
+                'completed': self.completed,
+                'cancelled': self.cancelled,
+                'failed': self.failed,
+                'rejected': self.rejected,
+            }
+
+
+class LimitedStream:
+    """Async iterator holding a stream slot until it ends, is closed (client gone or
+    ``response.close()``), or is dropped without ever being iterated.
+    """
+
+    def __init__(self, events, release):
+        self._events = events
+        self._release = release
+        self._released = False
+        self._lock = threading.Lock()
+
+    def release(self):
+        with self._lock:
+            if self._released:
+                return
+            self._released = True
+        self._release()
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return await self._events.__anext__()
+        except BaseException:
+            # Finished, failed, or cancelled by a disconnect
+            self.release()
+            raise
+
+    async def aclose(self):
+        try:
+            await self._events.aclose()
+        finally:
+            self.release()
+
+    def close(self):
+        self.release()
+
+    def __del__(self):
+        self.release()
+
+
+stream_metrics = StreamMetrics('AI_STREAM_MAX_ACTIVE')
+job_stream_metrics = StreamMetrics('AI_JOB_STREAM_MAX_ACTIVE')
+
+
+def start_generation(prompt, cancel_event):
+    """Run GPT-2 ``generate`` in a background thread and return a token iterator.
+
+    Generation stops at the next token once ``cancel_event`` is set.
+    """
+    from transformers import StoppingCriteria, StoppingCriteriaList, TextIteratorStreamer
+
+    class Cancelled(StoppingCriteria):
+        def __call__(self, input_ids, scores, **kwargs):
+            return cancel_event.is_set()
+
+    generator = get_text_generator()
+    tokenizer = generator.tokenizer
+    inputs = tokenizer(prompt, return_tensors='pt', truncation=True)
+    streamer = TextIteratorStreamer(
+        tokenizer, skip_prompt=True, skip_special_tokens=True, timeout=settings.AI_STREAM_TOKEN_TIMEOUT
+    )
+    thread = threading.Thread(
+        target=generator.model.generate,
+        kwargs=dict(
+            inputs,
+            streamer=streamer,
+            max_length=200,
+            pad_token_id=tokenizer.eos_token_id,
+            stopping_criteria=StoppingCriteriaList([Cancelled()]),
+        ),
+        name='career-coach-stream',
+        daemon=True,
+    )
+    thread.start()
+    return streamer
+
+
+def sse(data, event=None):
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data)}\n\n"
+
+
+async def stream_advice_events(prompt):
+    """Server-Sent Events for one generation; open it through ``stream_metrics.open``.
+
+    When the client disconnects the ASGI handler cancels this generator; the
+    ``finally`` block then stops the model thread so it does not keep burning CPU.
+    """
+    cancel_event = threading.Event()
+    finished = False
+    try:
+        tokens = iter(await sync_to_async(start_generation, thread_sensitive=False)(prompt, cancel_event))
+        while True:
+            token = await sync_to_async(next, thread_sensitive=False)(tokens, None)
+            if token is None:
+                break
+            if token:
+                yield sse({"token": token})
+        finished = True
+        stream_metrics.change(completed=1)
+        yield sse({}, event='done')
+    except Exception as e:
+        finished = True
+        logger.error(f"Error streaming advice: {str(e)}")
+        stream_metrics.change(failed=1)
+        yield sse({"error": "Failed to generate advice"}, event='error')
+    finally:
+        if not finished:
+            logger.info("Career coach stream closed by client, cancelling generation")
+            stream_metrics.change(cancelled=1)
+        cancel_event.set()
@@ -0,0 +1,106 @@
+from celery import shared_task
+from django.utils import timezone
+import logging
+
+from accounts.models import LearningResource, User
+from . import services
+from .embeddings import embed_resources
+from .hybrid_search import hybrid_search
+from .models import Recommendation
+from .search_index import indexes
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def embed_learning_resource(resource_id):
+    try:
+        resource = LearningResource.objects.get(pk=resource_id)
+    except LearningResource.DoesNotExist:
+        return
+    embed_resources([resource])
+    logger.info(f"Embedding refreshed for learning resource {resource_id}")
+
+
+@shared_task
+def store_recommendations(user_id, scores):
+    Recommendation.objects.upsert_scores(user_id, scores)
+    logger.info(f"Stored {len(scores)} recommendation scores for user {user_id}")
+
+
+@shared_task
+def update_search_index(index_name, pk):
+    # Applied with other changes by merge_search_indexes, rather than rewriting the file per row
+    indexes[index_name].mark_changed([pk])
+    logger.info(f"Search index {index_name} change queued for {pk}")
+
+
+@shared_task
+def remove_from_search_index(index_name, pk):
+    indexes[index_name].mark_changed([pk])
+    logger.info(f"Search index {index_name} removal queued for {pk}")
+
+
+@shared_task
+def merge_search_indexes():
+    return {name: index.merge() for name, index in indexes.items()}
+
+
+@shared_task
+def build_search_index(index_name):
+    return indexes[index_name].build()
+
+
+def _recommendations(user_id, **params):
+    return services.recommend_resources(User.objects.get(pk=user_id), **params)
+
+
+def _search(user_id, **params):
+    results = services.search_forum(**params)
+    if results is None:
+        raise LookupError("No posts available or index failed to initialize")
+    return results
+
+
+# Job kinds accepted by /ai/jobs/; params arrive already validated by the view
+JOB_RUNNERS = {
+    'career_coach': lambda user_id, **params: services.career_advice(**params),
+    'recommendations': _recommendations,
+    'search': _search,
+    'hybrid_search': lambda user_id, **params: hybrid_search(**params),
+}
+
+
+@shared_task
+def run_ai_job(kind, params, user_id):
+    result = JOB_RUNNERS[kind](user_id, **params)
+    logger.info(f"Finished {kind} job for user {user_id}")
+    return result
+
+
+@shared_task
+def refresh_forecasts(granularities=('day', 'hour')):
+    from . import forecasting
+    for granularity in granularities:
+        forecasting.refresh_forecasts(granularity)
+
+
+@shared_task
+def refresh_rollups(hours=2):
+    """Recount recently closed rollup buckets, picking up events inserted without signals."""
+    from . import rollups
+    now = timezone.now()
+    rollups.rebuild('hour', start=now - timezone.timedelta(hours=hours))
+    rollups.rebuild('day', start=now - timezone.timedelta(hours=hours))
+
+
+@shared_task
+def flush_analytics_events(max_batches=50):
+    from . import ingest
+    return ingest.flush(max_batches=max_batches)
+
+
+@shared_task
+def maintain_event_partitions():
+    from . import partitions
+    return {name: [month.isoformat() for month in months] for name, months in partitions.maintain().items()}
@@ -0,0 +1,61 @@
+from types import SimpleNamespace
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from accounts.models import User
+from ai.advice_cache import normalize_query
+from ai.batching import generate_advice_batch
+from ai.tests.tests_api import KeywordSentenceModel
+
+
+class AdviceCacheTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(email="coach@ex.com", password="pass", role="Learner")
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('career-coach')
+        patcher = mock.patch('ai.services.career_coach_queue.submit', side_effect=lambda prompt, timeout: f"advice for {prompt}")
+        self.submit = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_normalize_query(self):
+        self.assertEqual(normalize_query("  How do I become a   Data Scientist? "), "how do i become a data scientist")
+
+    def test_equivalent_queries_share_an_answer(self):
+        first = self.client.post(self.url, {'query': 'How do I become a data scientist?'}, format='json')
+        second = self.client.post(self.url, {'query': 'how do i become a DATA scientist'}, format='json')
+        self.assertFalse(first.data["cached"])
+        self.assertTrue(second.data["cached"])
+        self.assertEqual(first.data["advice"], second.data["advice"])
+        self.assertEqual(self.submit.call_count, 1)
+
+    def test_bypass_flag_regenerates(self):
+        self.client.post(self.url, {'query': 'python careers'}, format='json')
+        response = self.client.post(self.url, {'query': 'python careers', 'bypass_cache': True}, format='json')
+        self.assertFalse(response.data["cached"])
+        self.assertEqual(self.submit.call_count, 2)
+
+    @override_settings(AI_ADVICE_CACHE_SIMILARITY=0.9)
+    def test_similar_query_hit(self):
+        with mock.patch('ai.embedding_cache.get_sentence_model', return_value=KeywordSentenceModel()):
+            self.client.post(self.url, {'query': 'python jobs'}, format='json')
+            response = self.client.post(self.url, {'query': 'which python roles exist'}, format='json')
+        self.assertTrue(response.data["cached"])
+        self.assertEqual(self.submit.call_count, 1)
+
+    def test_cached_advice_excludes_the_prompt(self):
+        def generator(prompts, return_full_text=True, **kwargs):
+            return [[{'generated_text': (prompt if return_full_text else "") + " Learn statistics."}] for prompt in prompts]
+        generator.tokenizer = SimpleNamespace(eos_token_id=0)
+        self.submit.side_effect = lambda prompt, timeout: generate_advice_batch([prompt])[0]
+        with mock.patch('ai.batching.get_text_generator', return_value=generator):
+            first = self.client.post(self.url, {'query': 'How do I become a data scientist?'}, format='json')
+            second = self.client.post(self.url, {'query': 'how do i become a DATA scientist'}, format='json')
+        self.assertTrue(second.data["cached"])
+        self.assertEqual(self.submit.call_count, 1)
+        self.assertEqual(second.data["advice"], first.data["advice"])
+        self.assertNotIn("How do I become a data scientist?", second.data["advice"])
@@ -0,0 +1,59 @@
+import threading
+
+from django.test import SimpleTestCase
+
+from ai.batching import InferenceQueue
+
+
+class InferenceQueueTest(SimpleTestCase):
+    def test_concurrent_submits_are_batched(self):
+        batches = []
+
+        def run_batch(items):
+            batches.append(list(items))
+            return [item.upper() for item in items]
+
+        inference_queue = InferenceQueue(run_batch, max_batch_size=4, max_wait=0.2)
+        results = {}
+
+        def submit(i):
+            results[i] = inference_queue.submit(f"prompt {i}", timeout=5)
+
+        threads = [threading.Thread(target=submit, args=(i,)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(results, {i: f"PROMPT {i}" for i in range(8)})
+        self.assertTrue(all(len(batch) <= 4 for batch in batches))
+        self.assertLess(len(batches), 8)
+        metrics = inference_queue.metrics.snapshot()
+        self.assertEqual(metrics['items'], 8)
+        self.assertEqual(sum(metrics['batch_size_histogram'].values()), len(batches))
+
+    def test_batch_failure_reaches_every_caller(self):
+        def run_batch(items):
+            raise RuntimeError("model crashed")
+
+        inference_queue = InferenceQueue(run_batch, max_batch_size=2, max_wait=0.01)
+        with self.assertRaises(RuntimeError):
+            inference_queue.submit("prompt", timeout=5)
+        self.assertEqual(inference_queue.metrics.snapshot()['failures'], 1)
+
+    def test_short_result_list_fails_every_caller(self):
+        inference_queue = InferenceQueue(lambda items: items[:1], max_batch_size=2, max_wait=1)
+        errors = []
+
+        def submit(i):
+            try:
+                inference_queue.submit(f"prompt {i}", timeout=5)
+            except ValueError as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=submit, args=(i,)) for i in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(errors), 2)
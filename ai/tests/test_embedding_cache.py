@@ -0,0 +1,37 @@
+from unittest import mock
+
+import numpy as np
+from django.core.cache import cache
+from django.test import SimpleTestCase
+
+from ai.embedding_cache import EmbeddingCache
+from ai.tests.tests_api import KeywordSentenceModel
+
+
+class EmbeddingCacheTest(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.model = KeywordSentenceModel()
+        patcher = mock.patch('ai.embedding_cache.get_sentence_model', return_value=self.model)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.embedding_cache = EmbeddingCache(max_entries=2, timeout=60)
+
+    def test_local_then_redis_hits_skip_model(self):
+        first = self.embedding_cache.encode(["learn python"])
+        with mock.patch.object(self.model, 'encode', side_effect=AssertionError("model called")):
+            np.testing.assert_array_equal(self.embedding_cache.encode(["learn python"]), first)
+            self.embedding_cache.clear_local()
+            np.testing.assert_allclose(self.embedding_cache.encode(["learn python"]), first, atol=1e-3)
+        stats = self.embedding_cache.stats()
+        self.assertEqual((stats['misses'], stats['local_hits'], stats['redis_hits']), (1, 1, 1))
+
+    def test_local_tier_is_bounded(self):
+        self.embedding_cache.encode(["python", "django", "design"])
+        self.assertEqual(self.embedding_cache.stats()['local_entries'], 2)
+
+    def test_redis_failure_falls_back_to_model(self):
+        with mock.patch('ai.embedding_cache.cache.get_many', side_effect=ConnectionError("redis down")):
+            vectors = self.embedding_cache.encode(["python"])
+        np.testing.assert_array_equal(vectors, [[1.0, 0.0, 0.0]])
+        self.assertEqual(self.embedding_cache.stats()['redis_errors'], 1)
@@ -0,0 +1,86 @@
+from unittest import mock
+
+import numpy as np
+from django.conf import settings
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from accounts.models import LearningResource
+from ai.embeddings import embed_resources, resource_matrix, top_k
+from ai.models import ResourceEmbedding
+
+
+class FakeSentenceModel:
+    def __init__(self):
+        self.encoded = []
+
+    def encode(self, texts, **kwargs):
+        self.encoded.extend(texts)
+        return np.array([[len(text), 1.0, 0.0] for text in texts], dtype=np.float32)
+
+
+class ResourceEmbeddingTest(TestCase):
+    def setUp(self):
+        self.model = FakeSentenceModel()
+        patcher = mock.patch('ai.embeddings.get_sentence_model', return_value=self.model)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.resource = LearningResource.objects.create(title="Intro to Django", type="Course", content="Django basics")
+
+    def test_embedding_stored_and_reused(self):
+        vectors = embed_resources([self.resource])
+        self.assertEqual(ResourceEmbedding.objects.count(), 1)
+        np.testing.assert_array_equal(vectors[self.resource.id], [13.0, 1.0, 0.0])
+
+        embed_resources([self.resource])
+        self.assertEqual(self.model.encoded, ["Django basics"])
+
+    def test_changed_content_is_reencoded(self):
+        embed_resources([self.resource])
+        self.resource.content = "Advanced Django"
+        self.resource.save()
+        vectors = embed_resources([self.resource])
+        self.assertEqual(self.model.encoded, ["Django basics", "Advanced Django"])
+        self.assertEqual(ResourceEmbedding.objects.count(), 1)
+        np.testing.assert_array_equal(vectors[self.resource.id], [15.0, 1.0, 0.0])
+
+    def test_backend_switch_reencodes(self):
+        embed_resources([self.resource])
+        with override_settings(AI_EMBEDDING_BACKEND='onnx-int8'):
+            embed_resources([self.resource])
+            self.assertEqual(resource_matrix()['matrix'].shape[0], 1)
+        self.assertEqual(self.model.encoded, ["Django basics", "Django basics"])
+        self.assertEqual(
+            set(ResourceEmbedding.objects.values_list('model_name', flat=True)),
+            {settings.AI_EMBEDDING_MODEL, f"{settings.AI_EMBEDDING_MODEL}:onnx-int8"},
+        )
+
+    def test_matrix_never_encodes(self):
+        embed_resources([self.resource])
+        LearningResource.objects.create(title="Flask", type="Course", content="Flask basics")
+        self.assertEqual(list(resource_matrix()['ids']), [self.resource.id])
+        self.assertEqual(self.model.encoded, ["Django basics"])
+
+    def test_type_edit_refreshes_matrix_types(self):
+        embed_resources([self.resource])
+        self.assertEqual(list(resource_matrix()['types']), ["Course"])
+        self.resource.type = "Tutorial"
+        self.resource.save()
+        embed_resources([self.resource])
+        self.assertEqual(list(resource_matrix()['types']), ["Tutorial"])
+        self.assertEqual(self.model.encoded, ["Django basics"])
+
+
+class TopKTest(SimpleTestCase):
+    def test_top_k_matches_full_sort(self):
+        rng = np.random.default_rng(0)
+        matrix = rng.normal(size=(50, 8)).astype(np.float32)
+        matrix /= np.linalg.norm(matrix, axis=1, keepdims=True)
+        query = rng.normal(size=8)
+        order, scores = top_k(query, matrix, 5)
+        expected = np.argsort(-(matrix @ (query / np.linalg.norm(query))))[:5]
+        np.testing.assert_array_equal(order, expected)
+        self.assertEqual(scores.shape, (50,))
+
+    def test_top_k_empty_matrix(self):
+        order, scores = top_k(np.ones(3), np.empty((0, 0), dtype=np.float32), 5)
+        self.assertEqual(len(order), 0)
@@ -0,0 +1,58 @@
+import importlib
+from unittest import mock
+
+from django.db import connection
+from django.db.models import Count
+from django.test import TestCase
+
+from accounts.models import User
+from ai.models import EVENT_TYPE_CODES, AnalyticsEvent
+
+
+class EventTypeCodeTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email="e@ex.com", password="pass", role="Learner")
+        AnalyticsEvent.objects.create(user=self.user, event_type='resource_view')
+        AnalyticsEvent.objects.create(user=self.user, event_type='login')
+
+    def test_stored_as_code(self):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT DISTINCT event_type FROM ai_analyticsevent ORDER BY 1")
+            self.assertEqual([row[0] for row in cursor.fetchall()], [EVENT_TYPE_CODES['login'], EVENT_TYPE_CODES['resource_view']])
+
+    def test_read_and_filtered_by_name(self):
+        self.assertEqual(AnalyticsEvent.objects.get(event_type='login').event_type, 'login')
+        counts = dict(AnalyticsEvent.objects.values_list('event_type').annotate(n=Count('id')))
+        self.assertEqual(counts, {'login': 1, 'resource_view': 1})
+        self.assertEqual(AnalyticsEvent.objects.filter(event_type__in=['login', 'forum_post']).count(), 1)
+
+    def test_unknown_type_rejected(self):
+        with self.assertRaises(ValueError):
+            AnalyticsEvent.objects.filter(event_type='signup').count()
+
+    def test_full_clean_accepts_names(self):
+        event = AnalyticsEvent(user=self.user, event_type='forum_post', details={'post_id': 1})
+        event.full_clean()
+
+
+class AccountsEventMergeTest(TestCase):
+    def test_every_row_is_kept(self):
+        user = User.objects.create_user(email="m@ex.com", password="pass", role="Learner")
+        migration = importlib.import_module('ai.migrations.0009_analyticsevent_event_type_code')
+        with connection.cursor() as cursor:
+            # The accounts table is gone after its own 0006; a stand-in with the same columns
+            cursor.execute(
+                'CREATE TEMPORARY TABLE accounts_analyticsevent '
+                '(event_type varchar(50), details jsonb, "timestamp" timestamptz, user_id bigint)'
+            )
+            cursor.execute(
+                "INSERT INTO accounts_analyticsevent VALUES "
+                "('login', '{}', now(), %s), ('signup', '{\"plan\": \"pro\"}', now(), NULL)",
+                [user.pk],
+            )
+        with self.assertLogs('ai.migrations', level='WARNING') as logs:
+            migration.merge_accounts_events(None, mock.Mock(connection=connection))
+        self.assertIn("1 without a user, 1 stored as 'other'", logs.output[0])
+        self.assertEqual(AnalyticsEvent.objects.get(user=user).event_type, 'login')
+        legacy = AnalyticsEvent.objects.get(user__isnull=True)
+        self.assertEqual((legacy.event_type, legacy.details), ('other', {'plan': 'pro', 'legacy_event_type': 'signup'}))
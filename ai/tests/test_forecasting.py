@@ -0,0 +1,71 @@
+import numpy as np
+from django.test import SimpleTestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from accounts.models import User
+from ai import forecasting, trends
+from ai.models import AnalyticsEvent, Forecast
+
+
+class ForecastModelsTest(SimpleTestCase):
+    def setUp(self):
+        # Two series: a pure trend, and a weekly pattern with a weekend peak
+        days = np.arange(56)
+        self.series = np.vstack([2.0 + 0.5 * days, np.where(days % 7 >= 5, 20.0, 5.0)])
+
+    def test_linear_trend(self):
+        forecast = forecasting.linear_trend(self.series, 3, 7)
+        np.testing.assert_allclose(forecast[0], [30.0, 30.5, 31.0])
+
+    def test_seasonal_naive_repeats_last_week(self):
+        forecast = forecasting.seasonal_naive(self.series, 9, 7)
+        np.testing.assert_allclose(forecast[1], [5, 5, 5, 5, 5, 20, 20, 5, 5])
+
+    def test_holt_winters_tracks_trend_and_season(self):
+        forecast = forecasting.holt_winters(self.series, 7, 7)
+        np.testing.assert_allclose(forecast[0], 2.0 + 0.5 * np.arange(56, 63), atol=0.5)
+        np.testing.assert_allclose(forecast[1], [5, 5, 5, 5, 5, 20, 20], atol=0.5)
+
+
+class StoredForecastTest(APITestCase):
+    def setUp(self):
+        self.learner = User.objects.create_user(email="learner@ex.com", password="pass", role="Learner")
+        self.mentor = User.objects.create_user(email="mentor@ex.com", password="pass", role="Mentor")
+        now = timezone.now()
+        for day in range(1, 15):
+            AnalyticsEvent.objects.create(user=self.learner, event_type='login', timestamp=now - timezone.timedelta(days=day))
+            AnalyticsEvent.objects.create(user=self.mentor, event_type='forum_post', timestamp=now - timezone.timedelta(days=day))
+        forecasting.refresh_forecasts('day')
+        self.client.force_authenticate(user=self.learner)
+
+    def test_series_per_event_type_and_role(self):
+        _, counts = forecasting.load_series('day')
+        login, learner = forecasting.EVENT_TYPES.index('login'), forecasting.ROLES.index('Learner')
+        self.assertEqual(counts[login, learner, -14:].tolist(), [1.0] * 14)
+        self.assertEqual(counts.sum(), 28)
+        expected = len(forecasting.EVENT_TYPES) * (len(forecasting.ROLES) + 1) * len(forecasting.FORECAST_MODELS)
+        # Less the login series served from the trend sums
+        self.assertEqual(Forecast.objects.filter(granularity='day').count(), expected - 1)
+
+    def test_endpoint_reads_stored_forecast(self):
+        response = self.client.get(reverse('predictive'), {'event_type': 'forum_post', 'model': 'seasonal_naive', 'horizon': 3})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['points']), 3)
+        self.assertEqual(response.data['forecasted_engagement'], 1)
+
+    def test_login_linear_served_from_trend_sums(self):
+        AnalyticsEvent.objects.create(user=self.learner, event_type='login', timestamp=timezone.now())
+        response = self.client.get(reverse('predictive'), {'horizon': 1})
+        self.assertIsNone(response.data['generated_at'])
+        self.assertEqual(response.data['points'][0]['value'], round(trends.forecast('login', timezone.localdate()), 3))
+
+    def test_role_breakdown(self):
+        response = self.client.get(reverse('predictive'), {'event_type': 'forum_post', 'model': 'seasonal_naive', 'breakdown': 'role'})
+        values = {item['role']: item['forecasted_engagement'] for item in response.data['breakdown']}
+        self.assertEqual(values['Mentor'], 1)
+        self.assertEqual(values['Learner'], 0)
+
+    def test_invalid_model(self):
+        self.assertEqual(self.client.get(reverse('predictive'), {'model': 'arima'}).status_code, 400)
@@ -0,0 +1,73 @@
+import tempfile
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from accounts.models import ForumPost, JobListing, LearningResource, User
+from ai.embeddings import embed_resources
+from ai.hybrid_search import reciprocal_rank_fusion
+from ai.search_index import forum_index, job_index
+from ai.tests.tests_api import KeywordSentenceModel
+
+
+class ReciprocalRankFusionTest(SimpleTestCase):
+    def test_items_ranked_well_in_both_lists_win(self):
+        fused = reciprocal_rank_fusion([['a', 'b', 'c'], ['b', 'c', 'a']], k=60)
+        self.assertEqual([key for key, _ in fused], ['b', 'a', 'c'])
+
+    def test_single_list_keeps_order(self):
+        fused = reciprocal_rank_fusion([['x', 'y']])
+        self.assertEqual([key for key, _ in fused], ['x', 'y'])
+
+
+class HybridSearchTest(APITestCase):
+    def setUp(self):
+        index_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(index_dir.cleanup)
+        overrides = override_settings(AI_INDEX_DIR=index_dir.name)
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        model = KeywordSentenceModel()
+        for target in ('ai.search_index.get_sentence_model', 'ai.embedding_cache.get_sentence_model',
+                       'ai.embeddings.get_sentence_model'):
+            patcher = mock.patch(target, return_value=model)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        user = User.objects.create_user(email="hybrid@ex.com", password="pass", role="Learner")
+        self.post = ForumPost.objects.create(title="Django deployment", content="Tips for shipping apps", author=user)
+        self.job = JobListing.objects.create(title="Python developer", description="Backend work", company="Co")
+        JobListing.objects.create(title="Python lead", description="Closed role", company="Co", is_active=False)
+        self.resource = LearningResource.objects.create(title="Design basics", type="Course", content="Learn design")
+        embed_resources([self.resource])
+        forum_index.build()
+        job_index.build()
+        self.url = reverse('hybrid-search')
+
+    def test_searches_all_content_types(self):
+        response = self.client.get(self.url, {'query': 'python'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data[0]["type"], "job_listing")
+        self.assertEqual(response.data[0]["id"], self.job.id)
+        self.assertNotIn("Python lead", [hit["title"] for hit in response.data])
+
+    def test_title_matches_lexically(self):
+        response = self.client.get(self.url, {'query': 'deployment', 'type': 'forum_post', 'mode': 'lexical'})
+        self.assertEqual([hit["id"] for hit in response.data], [self.post.id])
+
+    def test_quoted_phrase_skips_embedding(self):
+        with mock.patch('ai.hybrid_search.encode_cached', side_effect=AssertionError("encoded")):
+            response = self.client.get(self.url, {'query': '"design basics"'})
+        self.assertEqual([(hit["type"], hit["id"]) for hit in response.data], [("learning_resource", self.resource.id)])
+
+    def test_backend_switch_falls_back_to_lexical(self):
+        with override_settings(AI_EMBEDDING_BACKEND='onnx-int8'), \
+                mock.patch('ai.embeddings.get_sentence_model', side_effect=AssertionError("encoded")):
+            response = self.client.get(self.url, {'query': 'design', 'type': 'learning_resource'})
+        self.assertEqual([hit["id"] for hit in response.data], [self.resource.id])
+
+    def test_unknown_type(self):
+        response = self.client.get(self.url, {'query': 'python', 'type': 'video'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
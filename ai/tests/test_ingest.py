@@ -0,0 +1,115 @@
+from unittest import mock
+
+from django.db import DataError, OperationalError
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from django_redis import get_redis_connection
+from rest_framework.test import APITestCase
+
+from accounts import counters
+from accounts.models import User
+from ai import ingest
+from ai.models import AnalyticsEvent, EventRollup, EventTrend
+
+
+class AnalyticsIngestTest(APITestCase):
+    def setUp(self):
+        redis = get_redis_connection('default')
+        redis.delete(ingest.BUFFER_KEY, ingest.DEAD_LETTER_KEY, counters.VIEWS_KEY, *ingest.COUNTER_KEYS.values(), *redis.keys('counters:active:*'))
+        self.user = User.objects.create_user(email="ingest@ex.com", password="pass", role="Mentor")
+        self.client.force_authenticate(user=self.user)
+
+    def test_track_buffers_without_db_write(self):
+        with self.assertNumQueries(0):
+            self.assertTrue(ingest.track(self.user.id, 'resource_view', {'resource_id': 3}))
+        self.assertEqual(ingest.stats()['pending'], 1)
+
+    def test_track_updates_live_counters(self):
+        ingest.track(self.user.id, 'resource_view', {'resource_id': 3})
+        self.assertEqual(counters.active_users()['daily_active_users'], 1)
+        self.assertEqual(counters.reconcile(), 1)
+
+    def test_track_many_accepts_a_generator(self):
+        ingest.track_many((self.user.id, 'resource_view', {}, None) for _ in range(2))
+        self.assertEqual(ingest.stats()['pending'], 2)
+        self.assertEqual(counters.active_users()['daily_active_users'], 1)
+
+    def test_flush_writes_events_trends_and_rollups(self):
+        yesterday = timezone.now() - timezone.timedelta(days=1)
+        ingest.track_many([
+            (self.user.id, 'resource_view', {}, None),
+            (self.user.id, 'resource_view', {}, None),
+            (self.user.id, 'login', {}, yesterday),
+            (999999, 'login', {}, None),  # unknown user
+        ])
+        self.assertEqual(ingest.flush(batch_size=3), 3)
+        self.assertEqual(AnalyticsEvent.objects.count(), 3)
+        self.assertEqual(EventTrend.objects.get(event_type='resource_view').total, 2)
+        self.assertEqual(EventRollup.objects.get(granularity='day', event_type='resource_view').count, 2)
+        self.assertEqual(EventRollup.objects.get(granularity='day', event_type='login').role, 'Mentor')
+        stats = ingest.stats()
+        self.assertEqual((stats['pending'], stats['flushed'], stats['invalid']), (0, 3, 1))
+
+    def test_first_flush_of_a_type_counts_each_event_once(self):
+        yesterday = timezone.now() - timezone.timedelta(days=1)
+        ingest.track_many([(self.user.id, 'login', {}, yesterday), (self.user.id, 'login', {}, None)])
+        ingest.flush()
+        trend = EventTrend.objects.get(event_type='login')
+        today = timezone.localdate()
+        self.assertEqual(trend.total, 2)
+        self.assertEqual(trend.day_total, today.toordinal() * 2 - 1)
+
+    @override_settings(ANALYTICS_BUFFER_MAX_LENGTH=2)
+    def test_back_pressure(self):
+        url = reverse('analytics-events')
+        for _ in range(2):
+            self.assertEqual(self.client.post(url, {'event_type': 'resource_view'}, format='json').status_code, 202)
+        response = self.client.post(url, {'event_type': 'resource_view'}, format='json')
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(ingest.stats()['dropped'], 1)
+
+    def test_batch_endpoint(self):
+        events = [{'event_type': 'forum_post', 'details': {'post_id': i}} for i in range(3)]
+        response = self.client.post(reverse('analytics-events-batch'), {'events': events}, format='json')
+        self.assertEqual(response.data, {'accepted': 3})
+        ingest.flush()
+        self.assertEqual(AnalyticsEvent.objects.filter(user=self.user, event_type='forum_post').count(), 3)
+
+    def test_invalid_event(self):
+        response = self.client.post(reverse('analytics-events-batch'), {'events': [{'event_type': 'click'}]}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(ingest.stats()['pending'], 0)
+
+    def test_nul_in_details_rejected(self):
+        response = self.client.post(
+            reverse('analytics-events'), {'event_type': 'login', 'details': {'agent': 'a\x00b'}}, format='json'
+        )
+        self.assertEqual(response.status_code, 400)
+        with self.assertRaises(ValueError):
+            ingest.track(self.user.id, 'login', {'agent': 'a\x00b'})
+
+    def test_refused_event_is_dead_lettered(self):
+        write = ingest._write
+
+        def refuse_forum_posts(events):
+            if any(e.event_type == 'forum_post' for e in events):
+                raise DataError("unsupported Unicode escape sequence")
+            return write(events)
+
+        ingest.track_many([(self.user.id, 'login', {}, None)] * 3 + [(self.user.id, 'forum_post', {}, None)])
+        with mock.patch('ai.ingest._write', side_effect=refuse_forum_posts):
+            self.assertEqual(ingest.flush(), 3)
+        stats = ingest.stats()
+        self.assertEqual((stats['pending'], stats['invalid'], stats['dead_lettered']), (0, 1, 1))
+        self.assertEqual(AnalyticsEvent.objects.count(), 3)
+
+    @override_settings(ANALYTICS_FLUSH_MAX_ATTEMPTS=2)
+    def test_failing_batch_retried_then_dead_lettered(self):
+        ingest.track(self.user.id, 'login')
+        with mock.patch('ai.ingest._write', side_effect=OperationalError("connection refused")):
+            for _ in range(2):
+                with self.assertRaises(OperationalError):
+                    ingest.flush()
+        stats = ingest.stats()
+        self.assertEqual((stats['pending'], stats['invalid'], stats['dead_lettered']), (0, 1, 1))
@@ -0,0 +1,80 @@
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from accounts.models import User
+from ai.tasks import run_ai_job
+from ai.tests.test_streaming import collect
+
+
+class AIJobsTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(email="jobs@ex.com", password="pass", role="Learner")
+        self.client.force_authenticate(user=self.user)
+        patcher = mock.patch('ai.tasks.run_ai_job.apply_async')
+        self.apply_async = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def submit(self, kind='career_coach', params=None):
+        return self.client.post(reverse('ai-jobs'), {'kind': kind, 'params': params or {'query': 'python careers'}}, format='json')
+
+    def test_submit_queues_on_ai_queue(self):
+        response = self.submit()
+        self.assertEqual(response.status_code, 202)
+        args, kwargs = self.apply_async.call_args
+        self.assertEqual(kwargs['queue'], 'ai')
+        self.assertEqual(kwargs['task_id'], response.data['id'])
+        self.assertEqual(kwargs['args'], ('career_coach', {'query': 'python careers', 'bypass_cache': False}, self.user.id))
+        self.assertEqual(response.data['status_url'], reverse('ai-job', args=[response.data['id']]))
+
+    def test_invalid_kind_and_params(self):
+        self.assertEqual(self.submit(kind='unknown').status_code, 400)
+        self.assertEqual(self.submit(kind='search', params={'query': 'x', 'k': 500}).status_code, 400)
+        self.apply_async.assert_not_called()
+
+    def test_result_only_visible_to_owner(self):
+        job_id = self.submit().data['id']
+        finished = mock.Mock(state='SUCCESS', result={'advice': 'Learn Django', 'cached': False})
+        with mock.patch('ai.jobs.AsyncResult', return_value=finished):
+            response = self.client.get(reverse('ai-job', args=[job_id]))
+            self.assertEqual(response.data['status'], 'success')
+            self.assertEqual(response.data['result']['advice'], 'Learn Django')
+
+            other = User.objects.create_user(email="other@ex.com", password="pass", role="Learner")
+            self.client.force_authenticate(user=other)
+            self.assertEqual(self.client.get(reverse('ai-job', args=[job_id])).status_code, 404)
+
+    def test_events_until_finished(self):
+        job_id = self.submit().data['id']
+        states = iter([mock.Mock(state='PENDING'), mock.Mock(state='STARTED'), mock.Mock(state='SUCCESS', result={'advice': 'ok'})])
+        with mock.patch('ai.jobs.AsyncResult', side_effect=lambda _: next(states)), self.settings(AI_JOB_POLL_INTERVAL=0):
+            response = self.client.get(reverse('ai-job-events', args=[job_id]))
+            body = "".join(chunk.decode() for chunk in async_to_sync(collect)(response.streaming_content))
+        self.assertIn('"status": "started"', body)
+        self.assertIn('"status": "success"', body)
+        self.assertTrue(body.rstrip().endswith("data: {}"))
+
+    def test_events_time_out_while_pending(self):
+        job_id = self.submit().data['id']
+        with mock.patch('ai.jobs.AsyncResult', return_value=mock.Mock(state='PENDING')), \
+                self.settings(AI_JOB_POLL_INTERVAL=0, AI_JOB_EVENTS_TIMEOUT=0):
+            response = self.client.get(reverse('ai-job-events', args=[job_id]))
+            body = "".join(chunk.decode() for chunk in async_to_sync(collect)(response.streaming_content))
+        self.assertIn('"status": "pending"', body)
+        self.assertIn("event: timeout", body)
+
+    def test_task_runs_service(self):
+        with mock.patch('ai.services.career_coach_queue.submit', return_value="Learn Django"):
+            result = run_ai_job('career_coach', {'query': 'python careers', 'bypass_cache': True}, self.user.id)
+        self.assertEqual(result, {'advice': 'Learn Django', 'cached': False})
+
+    def test_tasks_bound_to_project_app(self):
+        # Web processes must load the project app, not Celery's default amqp one
+        self.assertEqual(run_ai_job.app.main, 'adlm_skillhub_backend')
+        self.assertEqual(run_ai_job.app.conf.broker_url, settings.CELERY_BROKER_URL)
+        self.assertEqual(run_ai_job.app.conf.result_backend, settings.CELERY_RESULT_BACKEND)
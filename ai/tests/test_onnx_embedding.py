@@ -0,0 +1,56 @@
+import importlib.util
+import tempfile
+import unittest
+
+import numpy as np
+from django.conf import settings
+from django.test import SimpleTestCase
+
+from ai.onnx_embedding import OnnxSentenceEncoder, export_model, mean_pool
+
+HAS_ONNX = all(importlib.util.find_spec(name) for name in ('onnxruntime', 'torch', 'sentence_transformers'))
+
+SENTENCES = [
+    "How do I become a data scientist?",
+    "Django REST framework authentication with JWT",
+    "Structural design of reinforced concrete beams",
+    "python",
+]
+
+
+class MeanPoolTest(SimpleTestCase):
+    def test_padding_ignored_and_normalized(self):
+        tokens = np.array([[[1.0, 0.0], [3.0, 0.0], [100.0, 100.0]]], dtype=np.float32)
+        mask = np.array([[1, 1, 0]])
+        np.testing.assert_allclose(mean_pool(tokens, mask, normalize=False), [[2.0, 0.0]])
+        np.testing.assert_allclose(mean_pool(tokens, mask), [[1.0, 0.0]])
+
+
+@unittest.skipUnless(HAS_ONNX, "onnxruntime, torch and sentence-transformers are required")
+class OnnxParityTest(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        from sentence_transformers import SentenceTransformer
+
+        cls.tmp = tempfile.TemporaryDirectory()
+        export_model(settings.AI_EMBEDDING_MODEL, cls.tmp.name)
+        cls.expected = SentenceTransformer(settings.AI_EMBEDDING_MODEL, device='cpu').encode(SENTENCES)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+        super().tearDownClass()
+
+    def cosines(self, quantized):
+        encoded = OnnxSentenceEncoder(self.tmp.name, quantized=quantized).encode(SENTENCES, batch_size=2)
+        self.assertEqual(encoded.shape, self.expected.shape)
+        return (encoded * self.expected).sum(axis=1) / (
+            np.linalg.norm(encoded, axis=1) * np.linalg.norm(self.expected, axis=1)
+        )
+
+    def test_fp32_matches_pytorch(self):
+        self.assertGreater(self.cosines(quantized=False).min(), 0.9999)
+
+    def test_int8_close_to_pytorch(self):
+        self.assertGreater(self.cosines(quantized=True).min(), 0.98)
@@ -0,0 +1,60 @@
+from datetime import date, datetime, timezone as dt_timezone
+
+from django.db import connection
+from django.test import TestCase, override_settings
+
+from accounts.models import User
+from ai import partitions
+from ai.models import AnalyticsEvent
+
+
+def rows_in(table):
+    with connection.cursor() as cursor:
+        cursor.execute(f'SELECT COUNT(*) FROM "{table}"')
+        return cursor.fetchone()[0]
+
+
+class PartitionTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email="p@ex.com", password="pass", role="Learner")
+        self.old = datetime(2001, 3, 15, tzinfo=dt_timezone.utc)
+
+    def test_add_months(self):
+        self.assertEqual(partitions.add_months(date(2024, 11, 1), 3), date(2025, 2, 1))
+        self.assertEqual(partitions.add_months(date(2024, 1, 1), -1), date(2023, 12, 1))
+
+    def test_maintain_creates_upcoming_months(self):
+        result = partitions.maintain(ahead=2, retention_months=0)
+        with connection.cursor() as cursor:
+            existing = partitions.existing_partitions(cursor)
+        for month in result['created']:
+            self.assertIn(month, existing)
+        self.assertEqual(partitions.maintain(ahead=2, retention_months=0)['created'], [])
+
+    def test_partition_takes_rows_from_default(self):
+        AnalyticsEvent.objects.create(user=self.user, event_type='login', timestamp=self.old)
+        self.assertEqual(rows_in(partitions.DEFAULT_PARTITION), 1)
+        with connection.cursor() as cursor:
+            partitions.ensure_partitions(cursor, date(2001, 3, 1), date(2001, 3, 1))
+        self.assertEqual(rows_in(partitions.DEFAULT_PARTITION), 0)
+        self.assertEqual(rows_in(partitions.partition_name(date(2001, 3, 1))), 1)
+        self.assertEqual(AnalyticsEvent.objects.filter(timestamp=self.old).count(), 1)
+
+    @override_settings(ANALYTICS_PARTITIONS_AHEAD=1)
+    def test_retention_drops_old_partitions(self):
+        AnalyticsEvent.objects.create(user=self.user, event_type='login', timestamp=self.old)
+        AnalyticsEvent.objects.create(user=self.user, event_type='login')
+        with connection.cursor() as cursor:
+            partitions.ensure_partitions(cursor, date(2001, 3, 1), date(2001, 3, 1))
+        result = partitions.maintain(retention_months=12)
+        self.assertIn(date(2001, 3, 1), result['removed'])
+        self.assertEqual(AnalyticsEvent.objects.count(), 1)
+        self.assertFalse(AnalyticsEvent.objects.filter(timestamp=self.old).exists())
+
+    def test_retention_detach_keeps_table(self):
+        AnalyticsEvent.objects.create(user=self.user, event_type='login', timestamp=self.old)
+        with connection.cursor() as cursor:
+            partitions.ensure_partitions(cursor, date(2001, 3, 1), date(2001, 3, 1))
+        partitions.maintain(retention_months=12, detach=True)
+        self.assertFalse(AnalyticsEvent.objects.filter(timestamp=self.old).exists())
+        self.assertEqual(rows_in(partitions.partition_name(date(2001, 3, 1))), 1)
@@ -0,0 +1,45 @@
+import threading
+import time
+
+from django.test import SimpleTestCase
+
+from ai.registry import ModelRegistry
+
+
+class ModelRegistryTest(SimpleTestCase):
+    def setUp(self):
+        self.calls = 0
+        self.registry = ModelRegistry()
+
+        def loader():
+            time.sleep(0.01)
+            self.calls += 1
+            return object()
+
+        self.registry.register('dummy', loader)
+
+    def test_model_loaded_once(self):
+        first = self.registry.get('dummy')
+        second = self.registry.get('dummy')
+        self.assertIs(first, second)
+        self.assertEqual(self.calls, 1)
+        self.assertIn('dummy', self.registry.stats()['models'])
+
+    def test_concurrent_get_loads_once(self):
+        threads = [threading.Thread(target=self.registry.get, args=('dummy',)) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(self.calls, 1)
+
+    def test_unknown_model(self):
+        with self.assertRaises(KeyError):
+            self.registry.get('missing')
+
+    def test_unload(self):
+        self.registry.get('dummy')
+        self.registry.unload('dummy')
+        self.assertFalse(self.registry.is_loaded('dummy'))
+        self.registry.get('dummy')
+        self.assertEqual(self.calls, 2)
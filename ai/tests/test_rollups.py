@@ -0,0 +1,101 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from accounts.models import User
+from ai import rollups, trends
+from ai.models import AnalyticsEvent, EventRollup, EventTrend
+
+
+class EventRollupTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.learner = User.objects.create_user(email="roll@ex.com", password="pass", role="Learner")
+        self.mentor = User.objects.create_user(email="mentor@ex.com", password="pass", role="Mentor")
+        self.now = timezone.now()
+        self.old = self.now - timezone.timedelta(days=10)
+        for user, event_type, timestamp in [
+            (self.learner, 'login', self.now),
+            (self.learner, 'resource_view', self.now),
+            (self.mentor, 'resource_view', self.now),
+            (self.mentor, 'forum_post', self.old),
+        ]:
+            AnalyticsEvent.objects.create(user=user, event_type=event_type, timestamp=timestamp)
+
+    def snapshot(self):
+        return sorted(EventRollup.objects.values_list('granularity', 'bucket', 'event_type', 'role', 'count'))
+
+    def test_ingest_matches_rebuild(self):
+        incremental = self.snapshot()
+        self.assertEqual(len(incremental), 8)
+        rollups.rebuild('hour')
+        rollups.rebuild('day')
+        self.assertEqual(self.snapshot(), incremental)
+
+    def test_rebuild_leaves_open_buckets_to_increments(self):
+        current = EventRollup.objects.filter(granularity='hour', bucket=rollups.bucket_start('hour', self.now))
+        closed = EventRollup.objects.filter(granularity='hour', event_type='forum_post')
+        # An increment landing mid-rebuild, and a closed bucket that drifted
+        current.filter(event_type='login').update(count=5)
+        closed.update(count=7)
+        rollups.rebuild('hour')
+        self.assertEqual(current.get(event_type='login').count, 5)
+        self.assertEqual(closed.get().count, 1)
+
+    def test_delete_decrements(self):
+        AnalyticsEvent.objects.filter(event_type='login').delete()
+        self.assertEqual(rollups.summarize()['event_count'], 3)
+
+    def test_edit_moves_event_between_buckets_and_trends(self):
+        event = AnalyticsEvent.objects.get(event_type='forum_post')
+        event.event_type = 'login'
+        event.timestamp = self.now
+        event.save()
+        incremental = [row for row in self.snapshot() if row[-1]]
+        login_trend = EventTrend.objects.values_list('total', 'day_total').get(event_type='login')
+        self.assertEqual(EventTrend.objects.get(event_type='forum_post').total, 0)
+        rollups.rebuild('hour')
+        rollups.rebuild('day')
+        trends.rebuild('login')
+        self.assertEqual(self.snapshot(), incremental)
+        self.assertEqual(EventTrend.objects.values_list('total', 'day_total').get(event_type='login'), login_trend)
+
+    def test_user_delete_subtracts_events_in_bulk(self):
+        def delete_with(count):
+            user = User.objects.create_user(email=f"gone{count}@ex.com", password="pass", role="Mentor")
+            for _ in range(count):
+                AnalyticsEvent.objects.create(user=user, event_type='resource_view', timestamp=self.now)
+            with CaptureQueriesContext(connection) as queries:
+                user.delete()
+            return len(queries)
+
+        self.assertEqual(delete_with(2), delete_with(20))
+        incremental = [row for row in self.snapshot() if row[-1]]
+        trend = EventTrend.objects.values_list('total', 'day_total').get(event_type='resource_view')
+        rollups.rebuild('hour')
+        rollups.rebuild('day')
+        trends.rebuild('resource_view')
+        self.assertEqual(self.snapshot(), incremental)
+        self.assertEqual(EventTrend.objects.values_list('total', 'day_total').get(event_type='resource_view'), trend)
+
+    def test_summary_range(self):
+        self.client.force_authenticate(user=self.learner)
+        url = reverse('analytics-summary')
+        everything = self.client.get(url).data
+        self.assertEqual(everything['event_count'], 4)
+        self.assertEqual(everything['total_resources_viewed'], 2)
+
+        today = timezone.localdate(self.now).isoformat()
+        recent = self.client.get(url, {'from': today, 'to': today}).data
+        self.assertEqual(recent['event_count'], 3)
+        self.assertIn({'role': 'Mentor', 'count': 1}, recent['roles'])
+
+        hours = self.client.get(url, {'from': (self.old - timezone.timedelta(hours=1)).isoformat(), 'to': (self.old + timezone.timedelta(hours=1)).isoformat()}).data
+        self.assertEqual(hours['event_types'], [{'event_type': 'forum_post', 'count': 1}])
+
+    def test_invalid_range(self):
+        self.client.force_authenticate(user=self.learner)
+        self.assertEqual(self.client.get(reverse('analytics-summary'), {'from': 'last week'}).status_code, 400)
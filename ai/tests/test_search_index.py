@@ -0,0 +1,144 @@
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from accounts.models import ForumPost, User
+from ai.search_index import forum_index, index_description
+from ai.tests.tests_api import KeywordSentenceModel
+
+
+class VectorIndexTest(TestCase):
+    def setUp(self):
+        index_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(index_dir.cleanup)
+        overrides = override_settings(AI_INDEX_DIR=index_dir.name)
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        patcher = mock.patch('ai.search_index.get_sentence_model', return_value=KeywordSentenceModel())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.user = User.objects.create_user(email="index@ex.com", password="pass", role="Learner")
+        self.python_post = ForumPost.objects.create(title="Python", content="Python tips", author=self.user)
+        self.django_post = ForumPost.objects.create(title="Django", content="Django tips", author=self.user)
+
+    def search(self, text):
+        return forum_index.search(KeywordSentenceModel().encode([text]), k=1)[1]
+
+    def test_build_persists_and_searches_by_pk(self):
+        self.assertEqual(forum_index.build(), 2)
+        self.assertTrue(forum_index.path.exists())
+        self.assertEqual(self.search("django"), [self.django_post.pk])
+
+    def test_backends_use_separate_files(self):
+        forum_index.build()
+        with override_settings(AI_EMBEDDING_BACKEND='onnx-int8'):
+            self.assertFalse(forum_index.path.exists())
+
+    def test_incremental_upsert_and_remove(self):
+        forum_index.build()
+        design_post = ForumPost.objects.create(title="Design", content="Design tips", author=self.user)
+        forum_index.upsert([design_post])
+        self.assertEqual(forum_index.ntotal, 3)
+        self.assertEqual(self.search("design"), [design_post.pk])
+
+        design_post.content = "Python design"
+        forum_index.upsert([design_post])
+        self.assertEqual(forum_index.ntotal, 3)
+
+        forum_index.remove([design_post.pk])
+        self.assertEqual(forum_index.ntotal, 2)
+        self.assertNotIn(design_post.pk, self.search("design"))
+
+    def test_merge_applies_queued_changes_in_one_save(self):
+        forum_index.build()
+        design_post = ForumPost.objects.create(title="Design", content="Design tips", author=self.user)
+        forum_index.mark_changed([design_post.pk, self.python_post.pk])
+        self.python_post.delete()
+        with mock.patch.object(forum_index, '_save', wraps=forum_index._save) as save:
+            self.assertEqual(forum_index.merge(), 2)
+        save.assert_called_once()
+        self.assertEqual(forum_index.ntotal, 2)
+        self.assertEqual(self.search("design"), [design_post.pk])
+        self.assertEqual(forum_index.merge(), 0)
+
+    def test_missing_index_is_queued_not_built(self):
+        cache.delete(f"search_index:build:{forum_index.path.name}")
+        with mock.patch('ai.tasks.build_search_index.delay') as delay:
+            self.assertEqual(self.search("django"), [])
+            self.assertEqual(forum_index.ntotal, 0)
+        delay.assert_called_once_with('forum_posts')
+        self.assertFalse(forum_index.path.exists())
+
+    def test_empty_table_saves_empty_index(self):
+        ForumPost.objects.all().delete()
+        self.assertEqual(forum_index.build(), 0)
+        self.assertTrue(forum_index.path.exists())
+        post = ForumPost.objects.create(title="Django", content="Django tips", author=self.user)
+        forum_index.mark_changed([post.pk])
+        forum_index.merge()
+        self.assertEqual(self.search("django"), [post.pk])
+
+    def test_hnsw_index_filters_stale_vectors(self):
+        forum_index.build(index_type='hnsw')
+        self.python_post.content = "Design tips"
+        forum_index.upsert([self.python_post])
+        distances, ids = forum_index.search(KeywordSentenceModel().encode(["design"]), k=3, ef_search=16)
+        self.assertEqual(len(ids), len(set(ids)))
+        self.assertEqual(ids[0], self.python_post.pk)
+
+    def test_ivfpq_without_training_data_falls_back_to_flat(self):
+        self.assertEqual(index_description('ivfpq', 384, n_train=10), 'Flat')
+        self.assertEqual(index_description('ivfpq', 384, n_train=39000), 'IVF1000,PQ48')
+
+    def test_benchmark_command(self):
+        out = StringIO()
+        call_command('benchmark_search_index', '--synthetic', '300', '--queries', '20', '--k', '5',
+                     '--types', 'hnsw', '--ef-search', '16', stdout=out)
+        self.assertIn('recall@k', out.getvalue())
+        self.assertIn('HNSW', out.getvalue())
+
+
+class SearchPaginationTest(APITestCase):
+    def setUp(self):
+        index_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(index_dir.cleanup)
+        overrides = override_settings(AI_INDEX_DIR=index_dir.name)
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        model = KeywordSentenceModel()
+        for target in ('ai.search_index.get_sentence_model', 'ai.embedding_cache.get_sentence_model'):
+            patcher = mock.patch(target, return_value=model)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        user = User.objects.create_user(email="page@ex.com", password="pass", role="Learner")
+        self.posts = [
+            ForumPost.objects.create(title=f"Post {i}", content="Python tips" if i % 2 else "Django tips", author=user)
+            for i in range(6)
+        ]
+        forum_index.build()
+        self.url = reverse('search')
+
+    def test_pages_do_not_overlap(self):
+        first = self.client.get(self.url, {'query': 'python', 'k': 3, 'page': 1}).data
+        second = self.client.get(self.url, {'query': 'python', 'k': 3, 'page': 2}).data
+        self.assertEqual(len(first), 3)
+        self.assertEqual(len(second), 3)
+        self.assertFalse({r["id"] for r in first} & {r["id"] for r in second})
+        self.assertTrue(all(r["title"] in {"Post 1", "Post 3", "Post 5"} for r in first))
+
+    def test_titles_are_read_fresh(self):
+        self.client.get(self.url, {'query': 'python'})
+        ForumPost.objects.filter(pk=self.posts[1].pk).update(title="Renamed")
+        response = self.client.get(self.url, {'query': 'python', 'k': 6})
+        self.assertIn("Renamed", [r["title"] for r in response.data])
+
+    def test_invalid_k(self):
+        response = self.client.get(self.url, {'query': 'python', 'k': 0})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,70 @@
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from accounts.models import User
+from ai.streaming import stream_advice_events, stream_metrics
+
+
+async def collect(stream, limit=None):
+    chunks = []
+    async for chunk in stream:
+        chunks.append(chunk)
+        if limit and len(chunks) == limit:
+            break
+    return chunks
+
+
+class StreamAdviceEventsTest(SimpleTestCase):
+    def test_tokens_then_done(self):
+        with mock.patch('ai.streaming.start_generation', return_value=iter(["Learn", " Python"])):
+            chunks = async_to_sync(collect)(stream_advice_events("prompt"))
+        self.assertEqual(chunks[:2], ['data: {"token": "Learn"}\n\n', 'data: {"token": " Python"}\n\n'])
+        self.assertTrue(chunks[-1].startswith("event: done"))
+
+    def test_disconnect_cancels_generation(self):
+        events = []
+
+        def start_generation(prompt, cancel_event):
+            events.append(cancel_event)
+            return iter(["a", "b", "c"])
+
+        async def disconnect_after_first_token():
+            stream = stream_advice_events("prompt")
+            await collect(stream, limit=1)
+            await stream.aclose()
+
+        cancelled_before = stream_metrics.snapshot()['cancelled']
+        with mock.patch('ai.streaming.start_generation', side_effect=start_generation):
+            async_to_sync(disconnect_after_first_token)()
+        self.assertTrue(events[0].is_set())
+        self.assertEqual(stream_metrics.snapshot()['cancelled'], cancelled_before + 1)
+
+
+class CareerCoachStreamViewTest(APITestCase):
+    def setUp(self):
+        user = User.objects.create_user(email="stream@ex.com", password="pass", role="Learner")
+        self.client.force_authenticate(user=user)
+
+    def test_event_stream_response(self):
+        with mock.patch('ai.streaming.start_generation', return_value=iter(["Hi"])):
+            response = self.client.post(reverse('career-coach-stream'), {'query': 'data science'}, format='json')
+            self.assertEqual(response['Content-Type'], 'text/event-stream')
+            body = b"".join(async_to_sync(collect)(response.streaming_content)).decode()
+        self.assertIn('"token": "Hi"', body)
+
+    @override_settings(AI_STREAM_MAX_ACTIVE=1)
+    def test_streams_beyond_limit_rejected(self):
+        url = reverse('career-coach-stream')
+        with mock.patch('ai.streaming.start_generation', return_value=iter(["Hi"])):
+            first = self.client.post(url, {'query': 'data science'}, format='json')
+            second = self.client.post(url, {'query': 'data science'}, format='json')
+            self.assertEqual(second.status_code, 503)
+            async_to_sync(collect)(first.streaming_content)
+            third = self.client.post(url, {'query': 'data science'}, format='json')
+            self.assertEqual(third.status_code, 200)
+            third.close()
+        self.assertEqual(stream_metrics.snapshot()['active'], 0)
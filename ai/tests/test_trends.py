@@ -0,0 +1,53 @@
+import numpy as np
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from accounts.models import User
+from ai import rollups, trends
+from ai.models import AnalyticsEvent, EventRollup, EventTrend
+
+
+class EventTrendTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email="trend@ex.com", password="pass", role="Learner")
+        self.now = timezone.now()
+        # Daily login counts 5 days ago .. today, with a gap two days ago
+        self.counts = {5: 1, 4: 2, 3: 2, 1: 4, 0: 5}
+        for days_ago, count in self.counts.items():
+            for _ in range(count):
+                AnalyticsEvent.objects.create(user=self.user, event_type='login', timestamp=self.now - timezone.timedelta(days=days_ago))
+
+    def test_incremental_sums_match_rebuild(self):
+        incremental = EventTrend.objects.values('first_day', 'last_day', 'total', 'day_total').get(event_type='login')
+        trends.rebuild('login')
+        self.assertEqual(EventTrend.objects.values('first_day', 'last_day', 'total', 'day_total').get(event_type='login'), incremental)
+        self.assertEqual(incremental['total'], 14)
+
+    def test_forecast_matches_polyfit_over_zero_filled_days(self):
+        x = np.arange(-5, 1)
+        y = np.array([self.counts.get(-day, 0) for day in x])
+        slope, intercept = np.polyfit(x, y, 1)
+        self.assertAlmostEqual(trends.forecast('login'), slope * 1 + intercept, places=6)
+
+    def test_delete_and_backdated_event(self):
+        AnalyticsEvent.objects.filter(event_type='login').first().delete()
+        AnalyticsEvent.objects.create(user=self.user, event_type='login', timestamp=self.now - timezone.timedelta(days=30))
+        trend = EventTrend.objects.get(event_type='login')
+        self.assertEqual(trend.total, 14)
+        self.assertEqual(trend.first_day, timezone.localdate(self.now - timezone.timedelta(days=30)))
+
+    @override_settings(ANALYTICS_RETENTION_MONTHS=1)
+    def test_rebuild_keeps_days_of_dropped_partitions(self):
+        old = self.now - timezone.timedelta(days=90)
+        AnalyticsEvent.objects.create(user=self.user, event_type='login', timestamp=old)
+        before = EventTrend.objects.values('first_day', 'total', 'day_total').get(event_type='login')
+        # What dropping the partition does: the rows go without any signals
+        AnalyticsEvent.objects.filter(timestamp__lt=old + timezone.timedelta(days=1))._raw_delete(connection.alias)
+        rollups.rebuild('day')
+        trends.rebuild('login')
+        self.assertEqual(EventTrend.objects.values('first_day', 'total', 'day_total').get(event_type='login'), before)
+        self.assertTrue(EventRollup.objects.filter(granularity='day', bucket__lt=self.now - timezone.timedelta(days=60)).exists())
+
+    def test_no_data(self):
+        self.assertIsNone(trends.forecast('forum_post'))
@@ -1,9 +1,14 @@
 from datetime import timezone
+import tempfile
+from unittest import mock
+import numpy as np
 from rest_framework.test import APITestCase
 from rest_framework import status
 from django.urls import reverse
-from accounts.models import User, ForumPost
-from ai.models import AnalyticsEvent
+from accounts.models import User, ForumPost, LearningResource
+from ai.embeddings import embed_resources
+from ai.models import AnalyticsEvent, Recommendation
+from ai.search_index import forum_index
 from django.utils import timezone
 
 
@@ -13,8 +18,19 @@ class NaturalLanguageSearchTest(APITestCase):
         self.post1 = ForumPost.objects.create(title="Test Post 1", content="This is a test", author=self.user)
         self.post2 = ForumPost.objects.create(title="Test Post 2", content="Another test content", author=self.user)
         self.url = reverse('search')
+        index_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(index_dir.cleanup)
+        overrides = self.settings(AI_INDEX_DIR=index_dir.name)
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        model = KeywordSentenceModel()
+        for target in ('ai.search_index.get_sentence_model', 'ai.embedding_cache.get_sentence_model'):
+            patcher = mock.patch(target, return_value=model)
+            patcher.start()
+            self.addCleanup(patcher.stop)
 
     def test_search_valid_query(self):
+        forum_index.build()
         self.client.force_authenticate(user=self.user)
         response = self.client.get(self.url, {'query': 'test'})
         self.assertEqual(response.status_code, status.HTTP_200_OK)
@@ -41,4 +57,62 @@ class PredictiveAnalyticsTest(APITestCase):
         self.client.force_authenticate(user=self.user)
         response = self.client.get(self.url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertIn("forecasted_engagement", response.data)
\ No newline at end of file
+        self.assertIn("forecasted_engagement", response.data)
+
+
+class KeywordSentenceModel:
+    vocabulary = ["python", "django", "design"]
+
+    def encode(self, texts, **kwargs):
+        single = isinstance(texts, str)
+        texts = [texts] if single else texts
+        vectors = np.array([[float(word in text.lower()) for word in self.vocabulary] for text in texts], dtype=np.float32)
+        return vectors[0] if single else vectors
+
+
+class RecommendationEngineTest(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email="rec@ex.com", password="pass", role="Learner", skills=["Django"])
+        LearningResource.objects.create(title="Django Course", type="Course", content="Learn Django")
+        LearningResource.objects.create(title="Python Tutorial", type="Tutorial", content="Learn Python")
+        LearningResource.objects.create(title="Design Course", type="Course", content="Learn design")
+        model = KeywordSentenceModel()
+        for target in ('ai.embedding_cache.get_sentence_model', 'ai.embeddings.get_sentence_model'):
+            patcher = mock.patch(target, return_value=model)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        # What the embed_learning_resource task stores on commit
+        embed_resources(LearningResource.objects.all())
+        self.url = reverse('recommendations')
+
+    def test_top_k_sorted(self):
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(self.url, {'limit': 2})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 2)
+        self.assertEqual(response.data[0]["resource"], "Django Course")
+        self.assertGreaterEqual(response.data[0]["score"], response.data[1]["score"])
+
+    def test_type_filter(self):
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(self.url, {'type': 'Tutorial'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([r["resource"] for r in response.data], ["Python Tutorial"])
+
+    def test_invalid_limit(self):
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(self.url, {'limit': 'many'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_unembedded_resource_not_encoded_inline(self):
+        LearningResource.objects.create(title="Django Tutorial", type="Tutorial", content="More Django")
+        self.client.force_authenticate(user=self.user)
+        with mock.patch('ai.embeddings.get_sentence_model', side_effect=AssertionError("encoded")):
+            response = self.client.get(self.url)
+        self.assertNotIn("Django Tutorial", [r["resource"] for r in response.data])
+
+    def test_scores_upserted_once_per_resource(self):
+        self.client.force_authenticate(user=self.user)
+        self.client.get(self.url)
+        self.client.get(self.url)
+        self.assertEqual(Recommendation.objects.filter(user=self.user).count(), LearningResource.objects.count())
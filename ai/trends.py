@@ -0,0 +1,113 @@
+import logging
+from collections import Counter
+
+from django.db.models import Count, F, Sum, Value
+from django.db.models.functions import Greatest, Least, TruncDate, TruncDay
+from django.utils import timezone
+
+from . import partitions
+from .models import AnalyticsEvent, EventRollup, EventTrend
+
+logger = logging.getLogger(__name__)
+
+
+def rebuild(event_type):
+    """Recompute an event type's trend sums from daily counts in SQL.
+
+    Days before the retention window come from the daily rollups, since their
+    event partitions may already be dropped.
+    """
+    events = AnalyticsEvent.objects.filter(event_type=event_type)
+    days = Counter()
+    since = partitions.retained_since()
+    if since is not None:
+        events = events.filter(timestamp__gte=since)
+        history = (
+            EventRollup.objects.filter(granularity='day', event_type=event_type, bucket__lt=since)
+            .annotate(day=TruncDate('bucket'))
+            .values('day')
+            .annotate(count=Sum('count'))
+            .order_by()
+        )
+        days.update({row['day']: row['count'] for row in history})
+    daily = events.annotate(day=TruncDate('timestamp')).values('day').annotate(count=Count('id')).order_by()
+    days.update({row['day']: row['count'] for row in daily})
+    days = {day: count for day, count in days.items() if count}
+    if not days:
+        EventTrend.objects.filter(event_type=event_type).delete()
+        return None
+    trend, _ = EventTrend.objects.update_or_create(
+        event_type=event_type,
+        defaults={
+            'first_day': min(days),
+            'last_day': max(days),
+            'total': sum(days.values()),
+            'day_total': sum(day.toordinal() * count for day, count in days.items()),
+        },
+    )
+    return trend
+
+
+def record(event_type, timestamp, delta=1):
+    """Add (or with ``delta=-1`` remove) one event in a single UPDATE."""
+    day = timezone.localdate(timestamp)
+    updated = EventTrend.objects.filter(event_type=event_type).update(
+        total=F('total') + delta,
+        day_total=F('day_total') + delta * day.toordinal(),
+        first_day=Least('first_day', Value(day)),
+        last_day=Greatest('last_day', Value(day)),
+    )
+    if not updated:
+        # First event of this type (or sums never built): the aggregate already includes it
+        rebuild(event_type)
+
+
+def subtract(events):
+    """Remove a queryset of events with one UPDATE per type and day."""
+    rows = events.annotate(day=TruncDay('timestamp')).values('event_type', 'day').annotate(count=Count('id')).order_by()
+    for row in rows:
+        record(row['event_type'], row['day'], delta=-row['count'])
+
+
+def record_counts(counts):
+    """Add ``{(event_type, day): count}`` for events that are already inserted.
+
+    A type with no trend yet is rebuilt once instead, since the aggregate already
+    includes every one of its new events.
+    """
+    event_types = {event_type for event_type, _ in counts}
+    existing = set(EventTrend.objects.filter(event_type__in=event_types).values_list('event_type', flat=True))
+    for event_type in event_types - existing:
+        rebuild(event_type)
+    for (event_type, day), count in counts.items():
+        if event_type in existing:
+            record(event_type, day, delta=count)
+
+
+def linear_forecast(trend, day=None):
+    """Least-squares line through the daily counts, evaluated at ``day`` (default tomorrow)."""
+    today = timezone.localdate()
+    day = day or today + timezone.timedelta(days=1)
+    first = trend.first_day.toordinal()
+    last = max(trend.last_day, today).toordinal()
+    n = last - first + 1
+    # Closed forms for sum(x) and sum(x^2) over the contiguous day range; exact integers
+    sum_x = (first + last) * n // 2
+    sum_xx = _sum_squares(last) - _sum_squares(first - 1)
+    sum_y, sum_xy = trend.total, trend.day_total
+    denominator = n * sum_xx - sum_x * sum_x
+    slope = (n * sum_xy - sum_x * sum_y) / denominator if denominator else 0.0
+    # Evaluated around the mean day so the large ordinals do not cost precision
+    return max(0.0, sum_y / n + slope * (day.toordinal() - sum_x / n))
+
+
+def _sum_squares(k):
+    return k * (k + 1) * (2 * k + 1) // 6
+
+
+def forecast(event_type, day=None):
+    trend = EventTrend.objects.filter(event_type=event_type).first()
+    if trend is None:
+        return None
+    return linear_forecast(trend, day)
+
@@ -1,9 +1,17 @@
 from django.urls import path
-from .views import AICareerCoach, NaturalLanguageSearch, PredictiveAnalytics, RecommendationEngine
+from .views import AICareerCoach, AICareerCoachStream, AIJobDetail, AIJobEvents, AIJobs, AIMetrics, AnalyticsEventBatch, AnalyticsEvents, HybridSearch, NaturalLanguageSearch, PredictiveAnalytics, RecommendationEngine
 
 urlpatterns = [
     path('career-coach/', AICareerCoach.as_view(), name='career-coach'),
+    path('career-coach/stream/', AICareerCoachStream.as_view(), name='career-coach-stream'),
     path('recommendations/', RecommendationEngine.as_view(), name='recommendations'),
     path('search/', NaturalLanguageSearch.as_view(), name='search'),
+    path('hybrid-search/', HybridSearch.as_view(), name='hybrid-search'),
     path('predictive/', PredictiveAnalytics.as_view(), name='predictive'),
+    path('jobs/', AIJobs.as_view(), name='ai-jobs'),
+    path('jobs/<uuid:job_id>/', AIJobDetail.as_view(), name='ai-job'),
+    path('jobs/<uuid:job_id>/events/', AIJobEvents.as_view(), name='ai-job-events'),
+    path('events/', AnalyticsEvents.as_view(), name='analytics-events'),
+    path('events/batch/', AnalyticsEventBatch.as_view(), name='analytics-events-batch'),
+    path('metrics/', AIMetrics.as_view(), name='ai-metrics'),
 ]
\ No newline at end of file
@@ -4,134 +4,419 @@ from django.shortcuts import render
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from rest_framework.permissions import IsAuthenticated, AllowAny
-from transformers import pipeline
-from sentence_transformers import SentenceTransformer, util
-from .models import Recommendation, AnalyticsEvent
-from accounts.models import LearningResource, ForumPost
-import faiss
+from rest_framework.permissions import IsAuthenticated, AllowAny, IsAdminUser
+from . import advice_cache, forecasting, ingest, jobs, services, trends
+from .batching import career_coach_queue
+from .embedding_cache import embedding_cache
+from .hybrid_search import CONTENT_TYPES, hybrid_search
+from .models import EventTrend, Forecast
+from .registry import registry
+from .streaming import StreamsFull, job_stream_metrics, sse, stream_advice_events, stream_metrics
+from accounts.hashing import hash_pool
+from accounts.models import LearningResource
 from rest_framework import permissions
-from sklearn.linear_model import LinearRegression
-import numpy as np
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from django.urls import reverse
 from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from asgiref.sync import sync_to_async
 from django.db.models import QuerySet
 
+import asyncio
 import logging
 
 logger = logging.getLogger(__name__)
 
+
+def int_param(params, name, default, minimum, maximum):
+    value = params.get(name)
+    if value is None:
+        return default
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{name} must be an integer")
+    if not minimum <= value <= maximum:
+        raise ValueError(f"{name} must be between {minimum} and {maximum}")
+    return value
+
+
+def list_param(params, name):
+    if hasattr(params, 'getlist'):
+        return params.getlist(name)
+    value = params.get(name) or []
+    return [value] if isinstance(value, str) else list(value)
+
+
+# Each parser turns request parameters into keyword arguments for the matching
+# function in ai.services, raising ValueError with a client-facing message.
+# The synchronous views and /ai/jobs/ share them.
+
+def career_coach_params(params):
+    query = params.get('query')
+    if not query:
+        raise ValueError("Query is required")
+    bypass_cache = str(params.get('bypass_cache', '')).lower() in ('1', 'true', 'yes')
+    return {'query': query, 'bypass_cache': bypass_cache}
+
+
+RESOURCE_TYPES = [choice for choice, _ in LearningResource._meta.get_field('type').choices]
+
+
+def recommendation_params(params):
+    resource_type = params.get('type')
+    if resource_type and resource_type not in RESOURCE_TYPES:
+        raise ValueError(f"type must be one of {RESOURCE_TYPES}")
+    return {
+        'limit': int_param(params, 'limit', 10, 1, 100),
+        'offset': int_param(params, 'offset', 0, 0, 10000),
+        'resource_type': resource_type or None,
+    }
+
+
+def search_params(params):
+    query = params.get('query')
+    if not query:
+        raise ValueError("Query is required")
+    return {
+        'query': query,
+        'k': int_param(params, 'k', 5, 1, 50),
+        'page': int_param(params, 'page', 1, 1, 100),
+        # Recall/latency knobs for IVF (nprobe) and HNSW (ef_search) indexes
+        'nprobe': int_param(params, 'nprobe', None, 1, 4096),
+        'ef_search': int_param(params, 'ef_search', None, 1, 4096),
+    }
+
+
+HYBRID_MODES = ['hybrid', 'lexical', 'semantic']
+
+
+def hybrid_search_params(params):
+    query = (params.get('query') or '').strip()
+    if not query:
+        raise ValueError("Query is required")
+    limit = int_param(params, 'k', 10, 1, 50)
+    content_types = list_param(params, 'type') or list(CONTENT_TYPES)
+    if any(t not in CONTENT_TYPES for t in content_types):
+        raise ValueError(f"type must be one of {list(CONTENT_TYPES)}")
+    mode = params.get('mode', 'hybrid')
+    if mode not in HYBRID_MODES:
+        raise ValueError(f"mode must be one of {HYBRID_MODES}")
+    return {'query': query, 'content_types': content_types, 'limit': limit, 'mode': mode}
+
+
 class AICareerCoach(APIView):
     permission_classes = [IsAuthenticated]
 
     def post(self, request):
-        query = request.data.get('query')
-        if not query:
-            return Response({"error": "Query is required"}, status=status.HTTP_400_BAD_REQUEST)
-
         try:
-            # Use a prompt to guide the model
-            prompt = f"Provide a structured response to the following query about a career path: {query}"
-            generator = pipeline("text-generation", model="gpt2")
-            response = generator(
-                prompt,
-                max_length=200,  # Increase to allow more text
-                num_return_sequences=1,
-                truncation=True,  # Explicitly enable truncation
-                pad_token_id=generator.tokenizer.eos_token_id  # Ensure proper padding
-            )[0]['generated_text']
-            return Response({"advice": response})
+            params = career_coach_params(request.data)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            return Response(services.career_advice(**params))
         except Exception as e:
             logger.error(f"Error generating advice: {str(e)}")
             return Response({"error": "Failed to generate advice"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+def event_stream_response(events, metrics):
+    """Stream ``events`` in one of ``metrics``' slots, or 503 when they are all taken."""
+    try:
+        events = metrics.open(events)
+    except StreamsFull:
+        response = Response({"error": "Too many streams open, retry shortly"}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+        response['Retry-After'] = '5'
+        return response
+    response = StreamingHttpResponse(events, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # stop nginx from buffering the stream
+    return response
+
+
+class AICareerCoachStream(APIView):
+    """Career advice as Server-Sent Events, one ``data`` frame per generated token.
+
+    Tokens are only flushed as they arrive when served through core/asgi.py;
+    under WSGI Django buffers the whole stream.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        query = request.data.get('query')
+        if not query:
+            return Response({"error": "Query is required"}, status=status.HTTP_400_BAD_REQUEST)
+        return event_stream_response(stream_advice_events(services.career_coach_prompt(query)), stream_metrics)
+
+
 class RecommendationEngine(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        user = request.user
-        resources = LearningResource.objects.all()
-        model = SentenceTransformer('all-MiniLM-L6-v2')
-        user_skills = " ".join(user.skills) if user.skills else ""
-        user_embedding = model.encode(user_skills)
-        scores = []
-        for resource in resources:
-            resource_embedding = model.encode(resource.content)
-            score = util.cos_sim(user_embedding, resource_embedding)[0][0]
-            Recommendation.objects.update_or_create(user=user, resource=resource, defaults={'score': score})
-            scores.append({"resource": resource.title, "score": score})
-        return Response(scores)
+        try:
+            params = recommendation_params(request.query_params)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(services.recommend_resources(request.user, **params))
    
 # from sentence_transformers import SentenceTransformer
 
 class NaturalLanguageSearch(APIView):
     permission_classes = [AllowAny]
 
-    _model = SentenceTransformer('all-MiniLM-L6-v2')
-    _index = None
-    _post_embeddings = None
-    _posts = None
-
-    @classmethod
-    def initialize_index(cls):
-        if cls._index is None:
-            try:
-                posts = list(ForumPost.objects.all())
-                cls._posts = posts
-                post_contents = [post.content for post in posts]
-                if not post_contents:
-                    logger.warning("No posts available for indexing")
-                    return
-                cls._post_embeddings = cls._model.encode(post_contents)
-                logger.info(f"Generated embeddings for {len(post_contents)} posts")
-                cls._index = faiss.IndexFlatL2(cls._post_embeddings.shape[1])
-                cls._index.add(cls._post_embeddings)
-                logger.info("FAISS index created successfully")
-            except Exception as e:
-                logger.error(f"Index initialization failed: {str(e)}")
-                cls._index = None
-
     def get(self, request):
-        query = request.query_params.get('query')
-        if not query:
-            return Response({"error": "Query is required"}, status=400)
+        try:
+            params = search_params(request.query_params)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=400)
 
         try:
-            if self._index is None:
-                self.initialize_index()
-            if self._index is None or not self._posts:
+            results = services.search_forum(**params)
+            if results is None:
                 return Response({"error": "No posts available or index failed to initialize"}, status=404)
-
-            query_embedding = self._model.encode([query])
-            logger.info(f"Encoded query: {query}")
-            distances, indices = self._index.search(query_embedding, k=min(5, len(self._posts)))
-            result_posts = [self._posts[i] for i in indices[0] if i < len(self._posts)]
-            results = [
-                {
-                    "title": post.title,
-                    "content": post.content,
-                    "created_at": post.created_at.isoformat(),
-                    "distance": float(distances[0][j])
-                }
-                for j, post in enumerate(result_posts)
-            ]
             return Response(results)
         except Exception as e:
             logger.error(f"Search error: {str(e)}")
             return Response({"error": "Search failed"}, status=500)
 
+class HybridSearch(APIView):
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        try:
+            params = hybrid_search_params(request.query_params)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=400)
+
+        try:
+            return Response(hybrid_search(**params))
+        except Exception as e:
+            logger.error(f"Hybrid search error: {str(e)}")
+            return Response({"error": "Search failed"}, status=500)
+
+class AIJobs(APIView):
+    """Queue inference on the ``ai`` Celery workers instead of running it in the web process.
+
+    POST ``{"kind": ..., "params": {...}}`` returns 202 with a job id; the result is
+    read from ``/ai/jobs/<id>/`` or streamed from ``/ai/jobs/<id>/events/``.
+    """
+    permission_classes = [IsAuthenticated]
+
+    parsers = {
+        'career_coach': career_coach_params,
+        'recommendations': recommendation_params,
+        'search': search_params,
+        'hybrid_search': hybrid_search_params,
+    }
+
+    def post(self, request):
+        kind = request.data.get('kind')
+        if kind not in self.parsers:
+            return Response({"error": f"kind must be one of {list(self.parsers)}"}, status=status.HTTP_400_BAD_REQUEST)
+        params = request.data.get('params') or {}
+        if not isinstance(params, dict):
+            return Response({"error": "params must be an object"}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            params = self.parsers[kind](params)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            job_id = jobs.submit_job(kind, params, request.user)
+        except Exception as e:
+            logger.error(f"Could not queue {kind} job: {str(e)}")
+            return Response({"error": "Could not queue job"}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+        return Response({
+            "id": job_id,
+            "status": "pending",
+            "status_url": reverse('ai-job', args=[job_id]),
+            "events_url": reverse('ai-job-events', args=[job_id]),
+        }, status=status.HTTP_202_ACCEPTED)
+
+
+class AIJobDetail(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, job_id):
+        job = jobs.get_job(str(job_id), request.user)
+        if job is None:
+            return Response({"error": "Job not found"}, status=status.HTTP_404_NOT_FOUND)
+        return Response(job)
+
+
+class AIJobEvents(APIView):
+    """Server-Sent Events for one job: a ``status`` frame per state change, then ``done``,
+    or ``timeout`` after ``AI_JOB_EVENTS_TIMEOUT`` seconds.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, job_id):
+        job = jobs.get_job(str(job_id), request.user)
+        if job is None:
+            return Response({"error": "Job not found"}, status=status.HTTP_404_NOT_FOUND)
+        return event_stream_response(job_events(str(job_id), request.user), job_stream_metrics)
+
+
+async def job_events(job_id, user):
+    last_status = None
+    # A job stuck in PENDING (e.g. no worker on the queue) would otherwise hold the stream open forever
+    deadline = asyncio.get_running_loop().time() + settings.AI_JOB_EVENTS_TIMEOUT
+    while True:
+        job = await sync_to_async(jobs.get_job, thread_sensitive=False)(job_id, user)
+        if job is None:
+            yield sse({"error": "Job expired"}, event='error')
+            return
+        if job['status'] != last_status:
+            last_status = job['status']
+            yield sse(job, event='status')
+        if job['status'].upper() in jobs.FINISHED_STATES:
+            yield sse({}, event='done')
+            return
+        if asyncio.get_running_loop().time() >= deadline:
+            yield sse({"error": "Job still running, poll its status_url"}, event='timeout')
+            return
+        await asyncio.sleep(settings.AI_JOB_POLL_INTERVAL)
+
+def event_params(data, user):
+    """One ingested event as the ``(user_id, event_type, details, timestamp)`` tuple ``ingest.track_many`` takes."""
+    if not isinstance(data, dict):
+        raise ValueError("each event must be an object")
+    event_type = data.get('event_type')
+    if event_type not in ingest.EVENT_TYPES:
+        raise ValueError(f"event_type must be one of {sorted(ingest.EVENT_TYPES)}")
+    details = ingest.validate_details(data.get('details') or {})
+    timestamp = data.get('timestamp')
+    if timestamp:
+        timestamp = parse_datetime(str(timestamp))
+        if timestamp is None:
+            raise ValueError("timestamp must be an ISO datetime")
+        if timezone.is_naive(timestamp):
+            timestamp = timezone.make_aware(timestamp)
+    # Events are always attributed to the authenticated user
+    return (user.id, event_type, details, timestamp or None)
+
+
+def ingest_response(events):
+    accepted = ingest.track_many(events)
+    if accepted < len(events):
+        response = Response({"accepted": 0, "error": "Analytics buffer full, retry later"}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+        response['Retry-After'] = '5'
+        return response
+    return Response({"accepted": accepted}, status=status.HTTP_202_ACCEPTED)
+
+
+class AnalyticsEvents(APIView):
+    """Buffers one event in Redis; ``flush_analytics_events`` writes it to Postgres."""
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        try:
+            event = event_params(request.data, request.user)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return ingest_response([event])
+
+
+class AnalyticsEventBatch(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        events = request.data.get('events') if isinstance(request.data, dict) else request.data
+        if not isinstance(events, list) or not events:
+            return Response({"error": "events must be a non-empty list"}, status=status.HTTP_400_BAD_REQUEST)
+        if len(events) > settings.ANALYTICS_INGEST_MAX_BATCH:
+            return Response({"error": f"at most {settings.ANALYTICS_INGEST_MAX_BATCH} events per batch"}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            events = [event_params(event, request.user) for event in events]
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return ingest_response(events)
+
+
+def forecast_payload(event_type, role, granularity, model_name, horizon):
+    """Forecast for one series, or ``None`` if there is no data for it yet."""
+    config = forecasting.granularities()[granularity]
+    if (event_type, role, granularity, model_name) == forecasting.TREND_SERIES:
+        # Live from the login trend sums, which every recorded event keeps current
+        trend = EventTrend.objects.filter(event_type=event_type).first()
+        if trend is None:
+            return None
+        start = forecasting.current_period('day')
+        values = [
+            round(trends.linear_forecast(trend, timezone.localdate(start + i * config['step'])), 3)
+            for i in range(horizon)
+        ]
+        generated_at = None
+    else:
+        stored = Forecast.objects.filter(
+            event_type=event_type, role=role, granularity=granularity, model_name=model_name
+        ).first()
+        if stored is None:
+            return None
+        start, values, generated_at = stored.start, stored.values[:horizon], stored.generated_at.isoformat()
+    return {
+        "event_type": event_type,
+        "role": role or None,
+        "granularity": granularity,
+        "model": model_name,
+        "generated_at": generated_at,
+        "forecasted_engagement": int(round(values[0])) if values else 0,
+        "points": [
+            {"period": (start + i * config['step']).isoformat(), "value": value}
+            for i, value in enumerate(values)
+        ],
+    }
+
+
 class PredictiveAnalytics(APIView):
+    """Reads forecasts precomputed by the ``refresh_forecasts`` beat task.
+
+    The default daily linear login forecast is computed from the login trend sums instead.
+    ``breakdown=role`` returns one forecast per role instead of the all-roles series.
+    """
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        events = AnalyticsEvent.objects.filter(event_type='login').order_by('timestamp')
-        if not events:
+        params = request.query_params
+        event_type = params.get('event_type', 'login')
+        role = params.get('role', '')
+        granularity = params.get('granularity', 'day')
+        model_name = params.get('model', 'linear')
+        if event_type not in forecasting.EVENT_TYPES:
+            return Response({"error": f"event_type must be one of {forecasting.EVENT_TYPES}"}, status=400)
+        if role and role not in forecasting.ROLES:
+            return Response({"error": f"role must be one of {forecasting.ROLES}"}, status=400)
+        if granularity not in forecasting.granularities():
+            return Response({"error": f"granularity must be one of {list(forecasting.granularities())}"}, status=400)
+        if model_name not in forecasting.FORECAST_MODELS:
+            return Response({"error": f"model must be one of {list(forecasting.FORECAST_MODELS)}"}, status=400)
+        max_horizon = forecasting.granularities()[granularity]['horizon']
+        try:
+            horizon = int_param(params, 'horizon', max_horizon, 1, max_horizon)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=400)
+
+        if params.get('breakdown') == 'role':
+            results = [forecast_payload(event_type, r, granularity, model_name, horizon) for r in forecasting.ROLES]
+            return Response({"breakdown": [result for result in results if result is not None]})
+
+        result = forecast_payload(event_type, role, granularity, model_name, horizon)
+        if result is None:
             return Response({"forecast": "No data"})
-        timestamps = [event.timestamp.timestamp() for event in events]
-        X = np.array(timestamps).reshape(-1, 1)
-        y = np.arange(len(events))  # Sequential engagement
-        model = LinearRegression()
-        model.fit(X, y)
-        future_timestamp = (timezone.now() + timezone.timedelta(days=1)).timestamp()
-        forecast = model.predict([[future_timestamp]])
-        return Response({"forecasted_engagement": int(forecast[0])})
\ No newline at end of file
+        return Response(result)
+
+class AIMetrics(APIView):
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response({
+            "models": registry.stats(),
+            "career_coach_queue": dict(career_coach_queue.metrics.snapshot(), pending=career_coach_queue.pending()),
+            "embedding_cache": embedding_cache.stats(),
+            "career_coach_streams": stream_metrics.snapshot(),
+            "job_event_streams": job_stream_metrics.snapshot(),
+            "advice_cache": advice_cache.stats(),
+            "analytics_ingest": ingest.stats(),
+            "password_hashing": hash_pool.snapshot(),
+        })
@@ -14,3 +14,9 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
 
 application = get_asgi_application()
+
+# Warm the AI model registry before the first request when configured
+from ai.registry import preload_configured_models  # noqa: E402
+
+preload_configured_models()
+
@@ -1,7 +1,9 @@
 import os
+import sys
 from pathlib import Path
 from dotenv import load_dotenv
 from datetime import timedelta
+from celery.schedules import crontab
 load_dotenv()
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -25,6 +27,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'rest_framework',
     'rest_framework_simplejwt',
     'corsheaders',
@@ -151,10 +154,17 @@ LOGGING = {
 
 EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
 
+# Tests clear and rewrite cache keys, so they get their own Redis database
+TESTING = sys.argv[1:2] == ['test'] or 'pytest' in sys.modules
+if TESTING:
+    REDIS_CACHE_URL = os.getenv('REDIS_TEST_CACHE_URL', 'redis://127.0.0.1:6379/15')
+else:
+    REDIS_CACHE_URL = os.getenv('REDIS_CACHE_URL', 'redis://127.0.0.1:6379/1')
+
 CACHES = {
     'default': {
         'BACKEND': 'django_redis.cache.RedisCache',
-        'LOCATION': 'redis://127.0.0.1:6379/1',
+        'LOCATION': REDIS_CACHE_URL,
         'OPTIONS': {
             'CLIENT_CLASS': 'django_redis.client.DefaultClient',
         }
@@ -168,4 +178,152 @@ CELERY_ACCEPT_CONTENT = ['json']
 CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = 'UTC'  # Use TIME_ZONE if you want Django's timezone
-CELERY_ENABLE_UTC = True
\ No newline at end of file
+CELERY_ENABLE_UTC = True
+CELERY_BEAT_SCHEDULE = {
+    # Hourly so hour-granularity forecasts start at the current hour; run `celery -A accounts beat`
+    'refresh-forecasts': {
+        'task': 'ai.tasks.refresh_forecasts',
+        'schedule': crontab(minute=5),
+    },
+    'flush-analytics-events': {
+        'task': 'ai.tasks.flush_analytics_events',
+        'schedule': float(os.getenv('ANALYTICS_FLUSH_INTERVAL', '5')),
+    },
+    'refresh-event-rollups': {
+        'task': 'ai.tasks.refresh_rollups',
+        'schedule': crontab(minute='*/15'),
+    },
+    'flush-login-stats': {
+        'task': 'accounts.tasks.flush_login_stats',
+        'schedule': float(os.getenv('LOGIN_STATS_FLUSH_INTERVAL', '10')),
+    },
+    'reconcile-counters': {
+        'task': 'accounts.tasks.reconcile_counters',
+        'schedule': crontab(minute='*'),
+    },
+    'maintain-event-partitions': {
+        'task': 'ai.tasks.maintain_event_partitions',
+        'schedule': crontab(hour=3, minute=30),
+    },
+    # Forum post and job listing edits reach the FAISS indexes at this interval
+    'merge-search-indexes': {
+        'task': 'ai.tasks.merge_search_indexes',
+        'schedule': float(os.getenv('AI_INDEX_MERGE_INTERVAL', '30')),
+    },
+}
+
+# AI model configuration
+AI_TEXT_GENERATION_MODEL = os.getenv('AI_TEXT_GENERATION_MODEL', 'gpt2')
+AI_EMBEDDING_MODEL = os.getenv('AI_EMBEDDING_MODEL', 'all-MiniLM-L6-v2')
+# Comma-separated registry names loaded when a worker process starts,
+# e.g. "text-generation,sentence-embedding". Empty means load on first use.
+AI_PRELOAD_MODELS = [name for name in os.getenv('AI_PRELOAD_MODELS', '').split(',') if name]
+# How the sentence model runs: torch (sentence-transformers), onnx or onnx-int8.
+# The ONNX backends need `python manage.py export_embedding_model` first.
+AI_EMBEDDING_BACKEND = os.getenv('AI_EMBEDDING_BACKEND', 'torch')
+AI_ONNX_DIR = os.getenv('AI_ONNX_DIR', str(BASE_DIR / 'var' / 'onnx'))
+# ONNX Runtime intra-op threads per process; 0 lets it use every core
+AI_ONNX_THREADS = int(os.getenv('AI_ONNX_THREADS', '0'))
+
+# Career-coach generations arriving within AI_BATCH_MAX_WAIT_MS are run as one batch
+AI_BATCH_MAX_SIZE = int(os.getenv('AI_BATCH_MAX_SIZE', '8'))
+AI_BATCH_MAX_WAIT_MS = int(os.getenv('AI_BATCH_MAX_WAIT_MS', '20'))
+AI_BATCH_TIMEOUT = int(os.getenv('AI_BATCH_TIMEOUT', '60'))
+
+# Write recommendation scores from a Celery task instead of inside the request
+AI_RECOMMENDATIONS_ASYNC_WRITE = os.getenv('AI_RECOMMENDATIONS_ASYNC_WRITE', 'False').lower() == 'true'
+
+# Persisted FAISS search indexes (one file per index, memory-mapped by web workers)
+AI_INDEX_DIR = os.getenv('AI_INDEX_DIR', str(BASE_DIR / 'var' / 'indexes'))
+# flat (exact), ivfpq or hnsw; changing it takes effect on the next rebuild_search_index
+AI_INDEX_TYPE = os.getenv('AI_INDEX_TYPE', 'flat')
+AI_INDEX_TRAIN_SAMPLE = int(os.getenv('AI_INDEX_TRAIN_SAMPLE', '50000'))
+AI_INDEX_IVF_NLIST = int(os.getenv('AI_INDEX_IVF_NLIST', '1024'))
+AI_INDEX_PQ_M = int(os.getenv('AI_INDEX_PQ_M', '48'))
+AI_INDEX_HNSW_M = int(os.getenv('AI_INDEX_HNSW_M', '32'))
+# Defaults for the per-request nprobe / ef_search search parameters
+AI_INDEX_NPROBE = int(os.getenv('AI_INDEX_NPROBE', '16'))
+AI_INDEX_EF_SEARCH = int(os.getenv('AI_INDEX_EF_SEARCH', '64'))
+
+# Query embeddings: per-process LRU entries, and Redis TTL in seconds
+AI_EMBEDDING_CACHE_SIZE = int(os.getenv('AI_EMBEDDING_CACHE_SIZE', '4096'))
+AI_EMBEDDING_CACHE_TIMEOUT = int(os.getenv('AI_EMBEDDING_CACHE_TIMEOUT', str(60 * 60 * 24)))
+
+# Hybrid search: hits taken from each lexical/semantic ranking, and the RRF constant
+AI_HYBRID_CANDIDATES = int(os.getenv('AI_HYBRID_CANDIDATES', '50'))
+AI_HYBRID_RRF_K = int(os.getenv('AI_HYBRID_RRF_K', '60'))
+
+# Seconds to wait for the next streamed token before giving up on a generation
+AI_STREAM_TOKEN_TIMEOUT = int(os.getenv('AI_STREAM_TOKEN_TIMEOUT', '30'))
+# Streams open at once per process before new ones get a 503: career-coach streams
+# each run a generation thread, job event streams each poll the result backend
+AI_STREAM_MAX_ACTIVE = int(os.getenv('AI_STREAM_MAX_ACTIVE', '8'))
+AI_JOB_STREAM_MAX_ACTIVE = int(os.getenv('AI_JOB_STREAM_MAX_ACTIVE', '100'))
+
+# Career-coach answers cached by normalised query. A similarity threshold above 0
+# (e.g. 0.95) also serves answers to paraphrases of a cached question.
+AI_ADVICE_CACHE_TIMEOUT = int(os.getenv('AI_ADVICE_CACHE_TIMEOUT', str(60 * 60 * 24)))
+AI_ADVICE_CACHE_SIMILARITY = float(os.getenv('AI_ADVICE_CACHE_SIMILARITY', '0'))
+AI_ADVICE_CACHE_INDEX_SIZE = int(os.getenv('AI_ADVICE_CACHE_INDEX_SIZE', '500'))
+
+# Inference runs on model-holding workers consuming the "ai" queue:
+#   celery -A accounts worker -Q ai --pool threads --concurrency 4
+# Web processes then only enqueue work and never load the models themselves.
+AI_CELERY_QUEUE = os.getenv('AI_CELERY_QUEUE', 'ai')
+CELERY_TASK_ROUTES = {
+    'ai.tasks.run_ai_job': {'queue': AI_CELERY_QUEUE},
+    'ai.tasks.embed_learning_resource': {'queue': AI_CELERY_QUEUE},
+    'ai.tasks.update_search_index': {'queue': AI_CELERY_QUEUE},
+    'ai.tasks.remove_from_search_index': {'queue': AI_CELERY_QUEUE},
+    'ai.tasks.merge_search_indexes': {'queue': AI_CELERY_QUEUE},
+    'ai.tasks.build_search_index': {'queue': AI_CELERY_QUEUE},
+}
+CELERY_TASK_TRACK_STARTED = True
+# Seconds a submitted job's result can be fetched from /ai/jobs/<id>/
+AI_JOB_RESULT_TIMEOUT = int(os.getenv('AI_JOB_RESULT_TIMEOUT', str(60 * 60)))
+CELERY_RESULT_EXPIRES = AI_JOB_RESULT_TIMEOUT
+# Seconds between result checks on /ai/jobs/<id>/events/
+AI_JOB_POLL_INTERVAL = float(os.getenv('AI_JOB_POLL_INTERVAL', '0.5'))
+# Longest an events stream stays open before sending a timeout event
+AI_JOB_EVENTS_TIMEOUT = float(os.getenv('AI_JOB_EVENTS_TIMEOUT', '300'))
+
+# Stored forecasts for /ai/predictive/: history fitted and periods ahead, per granularity
+AI_FORECAST_HISTORY_DAYS = int(os.getenv('AI_FORECAST_HISTORY_DAYS', '180'))
+AI_FORECAST_HORIZON_DAYS = int(os.getenv('AI_FORECAST_HORIZON_DAYS', '28'))
+AI_FORECAST_HISTORY_HOURS = int(os.getenv('AI_FORECAST_HISTORY_HOURS', str(24 * 28)))
+AI_FORECAST_HORIZON_HOURS = int(os.getenv('AI_FORECAST_HORIZON_HOURS', '48'))
+
+# Platform-wide analytics summary: served from cache for the soft TTL, then served
+# stale while one worker refreshes it; dropped entirely after the hard TTL
+ANALYTICS_SUMMARY_SOFT_TTL = int(os.getenv('ANALYTICS_SUMMARY_SOFT_TTL', str(60 * 5)))
+ANALYTICS_SUMMARY_HARD_TTL = int(os.getenv('ANALYTICS_SUMMARY_HARD_TTL', str(60 * 60)))
+ANALYTICS_SUMMARY_LOCK_TIMEOUT = int(os.getenv('ANALYTICS_SUMMARY_LOCK_TIMEOUT', '30'))
+
+# Argon2id parameters for User passwords (argon2-cffi defaults); size them with
+# `manage.py benchmark_argon2`. Stored hashes are upgraded on the next successful login.
+ARGON2_TIME_COST = int(os.getenv('ARGON2_TIME_COST', '3'))
+ARGON2_MEMORY_COST = int(os.getenv('ARGON2_MEMORY_COST', '65536'))  # KiB
+ARGON2_PARALLELISM = int(os.getenv('ARGON2_PARALLELISM', '4'))
+# Register/login hash in this many threads per process; beyond the pending limit
+# (running plus queued) they answer 503 instead of queueing
+PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', '4'))
+PASSWORD_HASH_MAX_PENDING = int(os.getenv('PASSWORD_HASH_MAX_PENDING', '64'))
+
+# Buffer User.login_count/last_login_time increments in Redis and apply them from the
+# flush-login-stats beat task instead of updating accounts_user on every login
+LOGIN_STATS_BATCHING = os.getenv('LOGIN_STATS_BATCHING', 'False').lower() == 'true'
+
+# Buffered AnalyticsEvent ingestion (/ai/events/ and ai.ingest.track): events wait in a
+# Redis list until flush_analytics_events writes them; beyond the max length they are dropped
+ANALYTICS_BUFFER_MAX_LENGTH = int(os.getenv('ANALYTICS_BUFFER_MAX_LENGTH', '100000'))
+ANALYTICS_FLUSH_BATCH_SIZE = int(os.getenv('ANALYTICS_FLUSH_BATCH_SIZE', '1000'))
+ANALYTICS_INGEST_MAX_BATCH = int(os.getenv('ANALYTICS_INGEST_MAX_BATCH', '500'))
+# Batches that fail for reasons other than bad data are retried this many times before
+# their events move to the analytics:events:dead list
+ANALYTICS_FLUSH_MAX_ATTEMPTS = int(os.getenv('ANALYTICS_FLUSH_MAX_ATTEMPTS', '5'))
+
+# ai_analyticsevent is partitioned by month: keep this many future months created, and
+# retire partitions older than the retention window (0 keeps everything). Rollups and
+# trends are not affected, so summary history outlives the raw events.
+ANALYTICS_PARTITIONS_AHEAD = int(os.getenv('ANALYTICS_PARTITIONS_AHEAD', '3'))
+ANALYTICS_RETENTION_MONTHS = int(os.getenv('ANALYTICS_RETENTION_MONTHS', '24'))